@@ -5,8 +5,15 @@ from .models import RiskQuizResponse, UserProfile
 
 @admin.register(UserProfile)
 class UserProfileAdmin(admin.ModelAdmin):
-    list_display = ("user", "province", "preferred_language", "risk_profile_score", "onboarding_completed")
-    list_filter = ("province", "preferred_language", "onboarding_completed")
+    list_display = (
+        "user",
+        "province",
+        "preferred_language",
+        "base_currency",
+        "risk_profile_score",
+        "onboarding_completed",
+    )
+    list_filter = ("province", "preferred_language", "base_currency", "onboarding_completed")
     search_fields = ("user__email",)
 
 
@@ -11,10 +11,11 @@ TAILWIND_SELECT_CLASS = (
 class ProfileForm(forms.ModelForm):
     class Meta:
         model = UserProfile
-        fields = ["province", "preferred_language"]
+        fields = ["province", "preferred_language", "base_currency"]
         widgets = {
             "province": forms.Select(attrs={"class": TAILWIND_SELECT_CLASS}),
             "preferred_language": forms.Select(attrs={"class": TAILWIND_SELECT_CLASS}),
+            "base_currency": forms.Select(attrs={"class": TAILWIND_SELECT_CLASS}),
         }
 
 
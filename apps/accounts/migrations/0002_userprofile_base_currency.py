@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userprofile',
+            name='base_currency',
+            field=models.CharField(choices=[('CAD', 'CAD'), ('USD', 'USD')], default='CAD', help_text='Currency portfolios are valued in.', max_length=3),
+        ),
+    ]
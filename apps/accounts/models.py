@@ -2,6 +2,8 @@ from django.conf import settings
 from django.db import models
 from django.utils.translation import gettext_lazy as _
 
+from apps.market_data.models import Asset
+
 
 class UserProfile(models.Model):
     PROVINCE_CHOICES = [
@@ -41,6 +43,12 @@ class UserProfile(models.Model):
         choices=LANGUAGE_CHOICES,
         default="fr",
     )
+    base_currency = models.CharField(
+        max_length=3,
+        choices=Asset.CURRENCY_CHOICES,
+        default="CAD",
+        help_text=_("Currency portfolios are valued in."),
+    )
     risk_profile_score = models.PositiveSmallIntegerField(
         null=True,
         blank=True,
@@ -1,5 +1,12 @@
+import hashlib
+import json
+from functools import cache
+
+from django.utils import translation
 from django.utils.translation import gettext_lazy as _
 
+from apps.metrics.services import instrumented
+
 QUIZ_QUESTIONS = [
     {
         "key": "investment_knowledge",
@@ -64,6 +71,21 @@ QUIZ_QUESTIONS = [
 ]
 
 
+@cache
+def get_quiz_version(language_code):
+    """Digest of the risk quiz as shown in a language.
+
+    Keys the cached question fragments, so a reworded question or updated
+    translation takes effect on the next deploy without clearing caches.
+    """
+    with translation.override(language_code):
+        shown = [
+            [q["key"], str(q["text"]), [[value, str(label)] for value, label in q["choices"]]] for q in QUIZ_QUESTIONS
+        ]
+    return hashlib.sha256(json.dumps(shown).encode()).hexdigest()[:12]
+
+
+@instrumented
 def calculate_risk_score(responses):
     """Calculate a risk score from 1-10 based on quiz responses.
 
@@ -1,4 +1,6 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
 from django.test import TestCase
 
 from apps.accounts.models import RiskQuizResponse, UserProfile
@@ -37,7 +39,9 @@ class ProfileViewTest(TestCase):
 
     def test_profile_update(self):
         self.client.login(email="test@example.com", password="testpass123")
-        response = self.client.post("/accounts/profile/", {"province": "QC", "preferred_language": "fr"})
+        response = self.client.post(
+            "/accounts/profile/", {"province": "QC", "preferred_language": "fr", "base_currency": "CAD"}
+        )
         assert response.status_code == 200
         profile = UserProfile.objects.get(user=self.user)
         assert profile.province == "QC"
@@ -105,6 +109,22 @@ class RiskQuizViewTest(TestCase):
         profile = UserProfile.objects.get(user=self.user)
         assert profile.risk_profile_score is not None
 
+    def test_quiz_step_fragments_cached_without_csrf(self):
+        from apps.accounts.services import QUIZ_QUESTIONS, get_quiz_version
+
+        caches["template_fragments"].clear()
+        self.client.get("/accounts/risk-quiz/step/2/")
+        key = make_template_fragment_key(
+            "risk_quiz_step_choices", [QUIZ_QUESTIONS[1]["key"], 2, "fr", get_quiz_version("fr")]
+        )
+        fragment = caches["template_fragments"].get(key)
+        assert 'name="answer"' in fragment
+        assert "csrfmiddlewaretoken" not in fragment
+
+        response = self.client.get("/accounts/risk-quiz/step/2/")
+        self.assertContains(response, "csrfmiddlewaretoken")
+        self.assertContains(response, 'name="answer"', count=len(QUIZ_QUESTIONS[1]["choices"]))
+
     def test_quiz_results_page(self):
         RiskQuizResponse.objects.create(user=self.user, question_key="q1", answer_value=3)
         response = self.client.get("/accounts/risk-quiz/results/")
@@ -3,6 +3,7 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.http import Http404
 from django.shortcuts import redirect, render
+from django.utils.translation import get_language
 from django.utils.translation import gettext_lazy as _
 
 from apps.portfolio.services import create_sandbox_portfolio
@@ -12,6 +13,7 @@ from .models import RiskQuizResponse, UserProfile
 from .services import (
     QUIZ_QUESTIONS,
     calculate_risk_score,
+    get_quiz_version,
     get_risk_profile_description,
     get_risk_profile_label,
 )
@@ -111,7 +113,12 @@ def risk_quiz_view(request):
     return render(
         request,
         "accounts/risk_quiz.html",
-        {"question": QUIZ_QUESTIONS[0], "step": 1, "total": len(QUIZ_QUESTIONS)},
+        {
+            "question": QUIZ_QUESTIONS[0],
+            "step": 1,
+            "total": len(QUIZ_QUESTIONS),
+            "quiz_version": get_quiz_version(get_language()),
+        },
     )
 
 
@@ -141,6 +148,7 @@ def risk_quiz_step(request, step):
                     "question": questions[next_index],
                     "step": next_index + 1,
                     "total": total,
+                    "quiz_version": get_quiz_version(get_language()),
                 },
             )
         return risk_quiz_results(request)
@@ -149,7 +157,12 @@ def risk_quiz_step(request, step):
         return render(
             request,
             "accounts/partials/quiz_step.html",
-            {"question": questions[index], "step": step, "total": total},
+            {
+                "question": questions[index],
+                "step": step,
+                "total": total,
+                "quiz_version": get_quiz_version(get_language()),
+            },
         )
 
     return redirect("accounts:risk_quiz")
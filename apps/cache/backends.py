@@ -0,0 +1,247 @@
+"""A cache shared by every worker on one host, stored in SQLite.
+
+Gunicorn workers each get their own LocMemCache, so anything cached there
+is computed once per worker and lost on restart. SQLiteCache keeps entries
+in a single SQLite file in WAL mode instead: readers never block the
+writer, every worker and thread on the host sees the same entries, and
+nothing beyond the file is needed to run it.
+
+    "BACKEND": "apps.cache.backends.SQLiteCache",
+    "LOCATION": "/path/to/cache.sqlite3",
+    "OPTIONS": {"MAX_BYTES": 64 * 1024 * 1024},
+
+Entries expire after their timeout. When the stored keys and values go
+over MAX_BYTES, expired entries and then the least recently read ones are
+evicted down to CULL_TO of the budget. Read times are only rewritten when
+older than TOUCH_INTERVAL seconds, so hot keys don't turn reads into
+writes. Integers are stored as SQL integers, which makes ``incr`` a
+single atomic UPDATE; other numbers are added up in a write transaction.
+"""
+
+import os
+import pickle
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+
+# Seconds between rewrites of an entry's last-read time
+TOUCH_INTERVAL = 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entry (
+    key TEXT PRIMARY KEY,
+    value NOT NULL,
+    size INTEGER NOT NULL,
+    expires REAL,
+    accessed REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS cache_entry_accessed ON cache_entry (accessed);
+CREATE TABLE IF NOT EXISTS cache_usage (id INTEGER PRIMARY KEY CHECK (id = 0), bytes INTEGER NOT NULL);
+INSERT OR IGNORE INTO cache_usage VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS cache_entry_insert AFTER INSERT ON cache_entry BEGIN
+    UPDATE cache_usage SET bytes = bytes + new.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entry_update AFTER UPDATE OF size ON cache_entry BEGIN
+    UPDATE cache_usage SET bytes = bytes - old.size + new.size;
+END;
+CREATE TRIGGER IF NOT EXISTS cache_entry_delete AFTER DELETE ON cache_entry BEGIN
+    UPDATE cache_usage SET bytes = bytes - old.size;
+END;
+"""
+
+UPSERT = """
+INSERT INTO cache_entry (key, value, size, expires, accessed) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT (key) DO UPDATE SET
+    value = excluded.value, size = excluded.size, expires = excluded.expires, accessed = excluded.accessed
+"""
+
+
+def _encode(value):
+    # bool is an int subclass but must come back as a bool
+    if type(value) is int and -(2**63) <= value < 2**63:
+        return value, 8
+    blob = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+    return blob, len(blob)
+
+
+def _decode(stored):
+    return pickle.loads(stored) if isinstance(stored, bytes) else stored
+
+
+class SQLiteCache(BaseCache):
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.path = Path(location)
+        self.max_bytes = int(options.get("MAX_BYTES", 64 * 1024 * 1024))
+        self.cull_to = float(options.get("CULL_TO", 0.9))
+        self._local = threading.local()
+
+    def _connection(self):
+        """This thread's connection, reopened after a fork."""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            return conn
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+        conn.execute("PRAGMA journal_mode = WAL")
+        # WAL keeps the file consistent either way; a crash can only lose recent sets
+        conn.execute("PRAGMA synchronous = NORMAL")
+        conn.executescript(SCHEMA)
+        self._local.conn, self._local.pid = conn, os.getpid()
+        return conn
+
+    def _expiry(self, timeout):
+        expiry = self.get_backend_timeout(timeout)
+        return None if expiry is None else float(expiry)
+
+    def _evict(self, conn, now):
+        """Bring the stored size back under budget; call inside a write transaction."""
+        (used,) = conn.execute("SELECT bytes FROM cache_usage").fetchone()
+        if used <= self.max_bytes:
+            return
+        conn.execute("DELETE FROM cache_entry WHERE expires <= ?", (now,))
+        (used,) = conn.execute("SELECT bytes FROM cache_usage").fetchone()
+        excess = used - int(self.max_bytes * self.cull_to)
+        if excess <= 0:
+            return
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM cache_entry ORDER BY accessed"):
+            victims.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        conn.executemany("DELETE FROM cache_entry WHERE key = ?", victims)
+
+    def _write(self, rows):
+        """Upsert (key, value, timeout) rows in one transaction."""
+        now = time.time()
+        params = []
+        for key, value, timeout in rows:
+            stored, size = _encode(value)
+            params.append((key, stored, size + len(key), self._expiry(timeout), now))
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany(UPSERT, params)
+            self._evict(conn, now)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def _read(self, key, now):
+        row = (
+            self._connection()
+            .execute("SELECT value, expires, accessed FROM cache_entry WHERE key = ?", (key,))
+            .fetchone()
+        )
+        if row is None or (row[1] is not None and row[1] <= now):
+            return None
+        if now - row[2] > TOUCH_INTERVAL:
+            self._connection().execute("UPDATE cache_entry SET accessed = ? WHERE key = ?", (now, key))
+        return row
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        row = self._read(key, time.time())
+        return default if row is None else _decode(row[0])
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write([(self.make_and_validate_key(key, version=version), value, timeout)])
+
+    def set_many(self, data, timeout=DEFAULT_TIMEOUT, version=None):
+        self._write([(self.make_and_validate_key(key, version=version), value, timeout) for key, value in data.items()])
+        return []
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        stored, size = _encode(value)
+        now = time.time()
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Replaces an expired entry, never a live one
+            added = conn.execute(
+                UPSERT + " WHERE cache_entry.expires <= ?",
+                (key, stored, size + len(key), self._expiry(timeout), now, now),
+            ).rowcount
+            self._evict(conn, now)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return added == 1
+
+    def incr(self, key, delta=1, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        # fetchall, not fetchone: the statement has to run to completion to commit
+        rows = (
+            self._connection()
+            .execute(
+                "UPDATE cache_entry SET value = value + ? "
+                "WHERE key = ? AND typeof(value) = 'integer' AND (expires IS NULL OR expires > ?) "
+                "RETURNING value",
+                (delta, key, now),
+            )
+            .fetchall()
+        )
+        if rows:
+            return rows[0][0]
+
+        # Not stored as an SQL integer (a float, or an int too large for one):
+        # add in Python and write the sum back, keeping the entry's expiry
+        conn = self._connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                "SELECT value FROM cache_entry WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, now)
+            ).fetchone()
+            if row is None:
+                raise ValueError(f"Key '{key}' not found")
+            value = _decode(row[0]) + delta
+            stored, size = _encode(value)
+            conn.execute("UPDATE cache_entry SET value = ?, size = ? WHERE key = ?", (stored, size + len(key), key))
+            self._evict(conn, now)
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+        return value
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        now = time.time()
+        return (
+            self._connection()
+            .execute(
+                "UPDATE cache_entry SET expires = ? WHERE key = ? AND (expires IS NULL OR expires > ?)",
+                (self._expiry(timeout), key, now),
+            )
+            .rowcount
+            == 1
+        )
+
+    def has_key(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._read(key, time.time()) is not None
+
+    def delete(self, key, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        return self._connection().execute("DELETE FROM cache_entry WHERE key = ?", (key,)).rowcount == 1
+
+    def delete_many(self, keys, version=None):
+        self._connection().executemany(
+            "DELETE FROM cache_entry WHERE key = ?", [(self.make_and_validate_key(k, version=version),) for k in keys]
+        )
+
+    def clear(self):
+        self._connection().execute("DELETE FROM cache_entry")
+
+    def close(self, **kwargs):
+        # Connections are per thread and reused across requests, like the file handles of FileBasedCache
+        pass
@@ -0,0 +1,121 @@
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from django.test import SimpleTestCase
+
+from apps.cache import backends
+from apps.cache.backends import SQLiteCache
+
+
+class SQLiteCacheTest(SimpleTestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / "cache.sqlite3"
+        self.cache = self.open()
+
+    def open(self, **options):
+        return SQLiteCache(str(self.path), {"OPTIONS": options})
+
+    def test_round_trip(self):
+        self.cache.set("list", [1, "two", {"three": 3.0}])
+        self.cache.set("flag", True)
+        self.cache.set("count", 7)
+        assert self.cache.get("list") == [1, "two", {"three": 3.0}]
+        assert self.cache.get("flag") is True
+        assert self.cache.get("count") == 7
+        assert self.cache.get("missing", "default") == "default"
+        assert self.cache.get_many(["list", "count", "missing"]) == {"list": [1, "two", {"three": 3.0}], "count": 7}
+        assert self.cache.delete("list")
+        assert not self.cache.has_key("list")
+
+    def test_shared_between_instances(self):
+        # Another worker process opens the same file
+        self.cache.set("key", "value")
+        assert self.open().get("key") == "value"
+
+    def test_timeouts(self):
+        with mock.patch("time.time", return_value=1000.0):
+            self.cache.set("short", 1, timeout=10)
+            self.cache.set("forever", 1, timeout=None)
+            assert not self.cache.add("short", 2)
+        with mock.patch("time.time", return_value=1011.0):
+            assert self.cache.get("short") is None
+            assert self.cache.get("forever") == 1
+            assert self.cache.add("short", 2)
+            assert self.cache.get("short") == 2
+            assert not self.cache.touch("missing")
+            assert self.cache.touch("forever", 5)
+        with mock.patch("time.time", return_value=1020.0):
+            assert self.cache.get("forever") is None
+
+    def test_incr_is_atomic(self):
+        self.cache.set("version", 0)
+
+        def bump():
+            cache = self.open()
+            for _ in range(50):
+                cache.incr("version")
+
+        threads = [threading.Thread(target=bump) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert self.cache.get("version") == 200
+        assert self.cache.decr("version", 10) == 190
+
+    def test_incr_errors(self):
+        with self.assertRaises(ValueError):
+            self.cache.incr("missing")
+        self.cache.set("text", "a")
+        with self.assertRaises(TypeError):
+            self.cache.incr("text")
+
+    def test_incr_stores_non_integers(self):
+        self.cache.set("ratio", 1.5, timeout=60)
+        assert self.cache.incr("ratio") == 2.5
+        assert self.cache.get("ratio") == 2.5
+        self.cache.set("big", 2**70)
+        assert self.cache.decr("big") == 2**70 - 1
+        assert self.cache.get("big") == 2**70 - 1
+
+    def test_incr_keeps_expiry(self):
+        with mock.patch("time.time", return_value=1000.0):
+            self.cache.set("ratio", 1.5, timeout=60)
+            self.cache.incr("ratio")
+        with mock.patch("time.time", return_value=1061.0):
+            assert self.cache.get("ratio") is None
+
+    def test_evicts_least_recently_read_under_byte_budget(self):
+        cache = self.open(MAX_BYTES=5000, CULL_TO=0.5)
+        with mock.patch("time.time") as now:
+            for i in range(4):
+                now.return_value = 1000.0 + i * 100
+                cache.set(f"k{i}", b"x" * 1000, timeout=None)
+            # Read k0 again long enough after it was set to refresh it
+            now.return_value = 1000.0 + 4 * 100
+            assert cache.get("k0") is not None
+            now.return_value += backends.TOUCH_INTERVAL
+            cache.set("k4", b"x" * 1000, timeout=None)
+        assert cache.get("k4") is not None
+        assert cache.get("k0") is not None
+        assert cache.get("k1") is None
+        assert cache.get("k2") is None
+
+    def test_expired_entries_are_evicted_first(self):
+        cache = self.open(MAX_BYTES=3000)
+        with mock.patch("time.time", return_value=1000.0):
+            cache.set("old", b"x" * 1000)
+            cache.set("stale", b"x" * 1000, timeout=1)
+        with mock.patch("time.time", return_value=1010.0):
+            cache.set("new", b"x" * 1500)
+            assert cache.get("old") is not None
+            assert cache.get("new") is not None
+
+    def test_clear(self):
+        self.cache.set_many({"a": 1, "b": 2})
+        self.cache.clear()
+        assert self.cache.get_many(["a", "b"]) == {}
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import LessonProgress, QuizCompletion, QuizResponse
+from .models import LearningProgress, LessonProgress, QuizCompletion, QuizResponse
 
 
 @admin.register(LessonProgress)
@@ -22,3 +22,10 @@ class QuizCompletionAdmin(admin.ModelAdmin):
     list_display = ("user", "lesson_id", "score", "total", "completed_at")
     list_filter = ("lesson_id",)
     search_fields = ("user__email",)
+
+
+@admin.register(LearningProgress)
+class LearningProgressAdmin(admin.ModelAdmin):
+    list_display = ("user", "completed_count", "next_lesson_id", "updated_at")
+    search_fields = ("user__email",)
+    readonly_fields = ("layout", "completed", "level_counts", "quiz_scores")
@@ -1 +1,6 @@
 # Education forms
+from django import forms
+
+
+class SearchForm(forms.Form):
+    q = forms.CharField(max_length=100, required=False)
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.education.services import CURRICULUM_DIRS, build_lesson_cache
+
+
+class Command(BaseCommand):
+    help = "Compile every lesson (frontmatter + rendered HTML) into the curriculum cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            choices=sorted(CURRICULUM_DIRS),
+            action="append",
+            help="Only build this language (repeatable). Defaults to all.",
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        count = build_lesson_cache(options["language"])
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(f"Done — {count} lessons compiled in {elapsed:.2f}s."))
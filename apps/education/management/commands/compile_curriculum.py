@@ -0,0 +1,34 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.education.services import CURRICULUM_DIRS, get_bundle_path, write_curriculum_bundle
+
+
+class Command(BaseCommand):
+    help = "Compile each language's curriculum (index, lessons, quizzes, glossary) into a single bundle."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--language",
+            choices=sorted(CURRICULUM_DIRS),
+            action="append",
+            help="Only compile this language (repeatable). Defaults to all.",
+        )
+
+    def handle(self, *args, **options):
+        languages = options["language"] or list(CURRICULUM_DIRS)
+        if get_bundle_path(languages[0]) is None:
+            raise CommandError("CURRICULUM_BUNDLE_DIR is not set.")
+
+        for lang in languages:
+            started = time.perf_counter()
+            bundle = write_curriculum_bundle(lang)
+            path = get_bundle_path(lang)
+            self.stdout.write(
+                f"  {lang}: {len(bundle['lessons'])} lessons, {len(bundle['quizzes'])} quizzes, "
+                f"version {bundle['version']} → {path} ({path.stat().st_size // 1024} KiB, "
+                f"{time.perf_counter() - started:.2f}s)"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f"Done — {len(languages)} bundle(s) compiled."))
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('education', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LearningProgress',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='learning_progress', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('layout', models.CharField(max_length=12)),
+                ('completed', models.BinaryField(default=b'')),
+                ('completed_count', models.PositiveSmallIntegerField(default=0)),
+                ('next_lesson_id', models.CharField(blank=True, max_length=10)),
+                ('level_counts', models.JSONField(default=dict)),
+                ('quiz_scores', models.JSONField(default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'learning progress',
+                'verbose_name_plural': 'learning progress',
+            },
+        ),
+    ]
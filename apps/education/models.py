@@ -60,3 +60,42 @@ class QuizCompletion(models.Model):
 
     def __str__(self):
         return f"{self.user.email} — {self.lesson_id}: {self.score}/{self.total}"
+
+
+class LearningProgress(models.Model):
+    """Denormalized learning-path progress, updated as lessons are completed.
+
+    Completed lessons are a bitmap over positions in the curriculum layout
+    (every lesson in path order); ``layout`` identifies that order, and a
+    row laid out for another curriculum is rebuilt from LessonProgress.
+    """
+
+    user = models.OneToOneField(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="learning_progress",
+    )
+    layout = models.CharField(max_length=12)
+    completed = models.BinaryField(default=b"")
+    completed_count = models.PositiveSmallIntegerField(default=0)
+    next_lesson_id = models.CharField(max_length=10, blank=True)
+    level_counts = models.JSONField(default=dict)
+    quiz_scores = models.JSONField(default=dict)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = _("learning progress")
+        verbose_name_plural = _("learning progress")
+
+    def __str__(self):
+        return f"{self.user_id}: {self.completed_count} lessons"
+
+    @property
+    def mask(self):
+        """Completed lessons as an int; bit i is the i-th lesson of the layout."""
+        return int.from_bytes(bytes(self.completed), "big")
+
+    @mask.setter
+    def mask(self, value):
+        self.completed = value.to_bytes((value.bit_length() + 7) // 8, "big")
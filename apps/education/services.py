@@ -1,14 +1,29 @@
 import contextlib
+import hashlib
+import heapq
+import html
 import json
+import mmap
+import os
+import pickle
 import re
-from functools import lru_cache
+import unicodedata
+from bisect import bisect_left
+from functools import cache, lru_cache
 from pathlib import Path
 
 import markdown
 from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.html import strip_tags
 from django.utils.translation import get_language
 
-from .models import LessonProgress, QuizCompletion
+from apps.metrics.services import instrumented
+
+from .models import LearningProgress, LessonProgress, QuizCompletion, QuizResponse
 
 CURRICULUM_DIRS = {
     "en": Path(settings.BASE_DIR) / "instructions" / "Limpid_Crescendo_EN_v1",
@@ -28,16 +43,76 @@ def get_curriculum_path(language_code=None):
     return CURRICULUM_DIRS.get(lang, CURRICULUM_DIRS["en"])
 
 
+# Bumped whenever the bundle layout changes; older bundles are ignored
+BUNDLE_FORMAT = 3
+
+
+def get_bundle_path(language_code):
+    """Path of the compiled bundle for a language, or None if bundles are disabled."""
+    if not settings.CURRICULUM_BUNDLE_DIR:
+        return None
+    return Path(settings.CURRICULUM_BUNDLE_DIR) / f"curriculum_{language_code}.pickle"
+
+
+@cache
+def _read_bundle(path):
+    """Load a bundle with a single mapped read; None if it hasn't been compiled.
+
+    Bundles are written by compile_curriculum from our own sources, never
+    from user input, so unpickling them is safe.
+    """
+    try:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            bundle = pickle.loads(mapped)
+    except FileNotFoundError:
+        return None
+    return bundle if bundle.get("format") == BUNDLE_FORMAT else None
+
+
+def get_bundle(language_code):
+    """The compiled curriculum for a language, loaded once per process, or None."""
+    path = get_bundle_path(language_code)
+    return _read_bundle(str(path)) if path is not None else None
+
+
+def _source_files(language_code):
+    base = get_curriculum_path(language_code)
+    return sorted(path for pattern in ("*.json", "lessons/*.md", "quizzes/*.json") for path in base.glob(pattern))
+
+
+def get_curriculum_version(language_code=None):
+    """Opaque version of a language's curriculum content.
+
+    The bundle's content hash when one is loaded; otherwise derived from the
+    source files' mtimes and sizes, so edits change it in development too.
+    """
+    lang = language_code or _lang()
+    bundle = get_bundle(lang)
+    if bundle is not None:
+        return bundle["version"]
+    digest = hashlib.sha256()
+    for path in _source_files(lang):
+        stat = path.stat()
+        digest.update(f"{path.name}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.hexdigest()[:12]
+
+
 @lru_cache(maxsize=4)
-def load_curriculum_index(language_code):
-    """Parse and cache the curriculum_index.json."""
+def _load_index_file(language_code):
     path = get_curriculum_path(language_code) / "curriculum_index.json"
     return json.loads(path.read_text(encoding="utf-8"))
 
 
+def load_curriculum_index(language_code):
+    """Return the parsed curriculum_index.json."""
+    bundle = get_bundle(language_code)
+    if bundle is not None:
+        return bundle["index"]
+    return _load_index_file(language_code)
+
+
 @lru_cache(maxsize=4)
-def load_glossary(language_code):
-    """Parse and cache the glossary JSON."""
+def _load_glossary_file(language_code):
     base = get_curriculum_path(language_code)
     for name in [f"glossary_{language_code}.json", "glossary.json"]:
         path = base / name
@@ -46,6 +121,14 @@ def load_glossary(language_code):
     return []
 
 
+def load_glossary(language_code):
+    """Return the parsed glossary JSON."""
+    bundle = get_bundle(language_code)
+    if bundle is not None:
+        return bundle["glossary"]
+    return _load_glossary_file(language_code)
+
+
 def _parse_frontmatter(text):
     """Parse YAML-like frontmatter from markdown text.
 
@@ -85,82 +168,611 @@ def _parse_frontmatter(text):
     return metadata, body
 
 
-@lru_cache(maxsize=64)
-def _load_lesson_raw(lesson_id, language_code):
-    """Load and cache raw lesson file content."""
-    path = get_curriculum_path(language_code) / "lessons" / f"{lesson_id}.md"
-    if not path.exists():
-        return None
-    return path.read_text(encoding="utf-8")
+# Elements whose text is never linked to the glossary
+GLOSSARY_SKIP_TAGS = frozenset({"a", "button", "code", "h1", "h2", "h3", "h4", "h5", "h6", "pre"})
 
+_TAG = re.compile(r"(<[^>]*>)")
+_TAG_NAME = re.compile(r"<(/?)([a-zA-Z][a-zA-Z0-9]*)")
+_ALIASES = re.compile(r"^(.+?)\s*\((.+)\)$")
+_TOOLTIP = re.compile(r'<span[^>]* role="tooltip"[^>]*>.*?</span>', re.DOTALL)
 
-def load_lesson(lesson_id, language_code=None):
-    """Load a lesson: parse frontmatter + render markdown to HTML.
 
-    Returns dict with 'metadata' and 'content_html', or None if not found.
+def _fold_case(text):
+    """Lowercase ``text`` without changing its length, so offsets still line up."""
+    folded = text.lower()
+    if len(folded) == len(text):
+        return folded
+    return "".join(c.lower() if len(c.lower()) == 1 else c for c in text)
+
+
+class GlossaryLinker:
+    """Wraps glossary terms in rendered lesson HTML with their definition.
+
+    Every term, plus both halves of "TFSA (CELI)"-style terms, is compiled
+    into one Aho-Corasick automaton, so a pass is linear in the lesson's
+    length however many terms there are. Matches are case-insensitive,
+    whole-word and leftmost-longest; only the first occurrence of each
+    term in a lesson is linked.
     """
-    lang = language_code or _lang()
-    raw = _load_lesson_raw(lesson_id, lang)
-    if raw is None:
-        return None
 
-    metadata, body = _parse_frontmatter(raw)
+    def __init__(self, glossary):
+        self.glossary = [(entry["term"], entry["definition"]) for entry in glossary]
+        self.digest = hashlib.sha256(json.dumps(self.glossary).encode()).hexdigest()[:12]
+        # Automaton states: transitions, failure link, (length, entry) outputs
+        self.goto = [{}]
+        self.fail = [0]
+        self.out = [[]]
+        for i, (term, _) in enumerate(self.glossary):
+            match = _ALIASES.match(term)
+            for alias in {term, *(match.groups() if match else ())}:
+                self._add(_fold_case(alias.strip()), i)
+        self._link_failures()
+
+    def _add(self, pattern, entry):
+        state = 0
+        for c in pattern:
+            if c not in self.goto[state]:
+                self.goto.append({})
+                self.fail.append(0)
+                self.out.append([])
+                self.goto[state][c] = len(self.goto) - 1
+            state = self.goto[state][c]
+        self.out[state].append((len(pattern), entry))
+
+    def _link_failures(self):
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for c, child in self.goto[state].items():
+                fallback = self.fail[state]
+                while fallback and c not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[child] = self.goto[fallback].get(c, 0)
+                self.out[child] = self.out[child] + self.out[self.fail[child]]
+                queue.append(child)
+
+    def _matches(self, folded):
+        """Every (start, end, entry) occurrence in ``folded``, in one pass."""
+        state = 0
+        for i, c in enumerate(folded):
+            while state and c not in self.goto[state]:
+                state = self.fail[state]
+            state = self.goto[state].get(c, 0)
+            for length, entry in self.out[state]:
+                yield i + 1 - length, i + 1, entry
+
+    def _link_text(self, segment, linked):
+        text = html.unescape(segment)
+        folded = _fold_case(text)
+        pieces = []
+        position = 0
+        for start, end, entry in sorted(self._matches(folded), key=lambda m: (m[0], m[0] - m[1])):
+            if start < position or entry in linked:
+                continue
+            if (start and folded[start - 1].isalnum()) or (end < len(folded) and folded[end].isalnum()):
+                continue
+            term, definition = self.glossary[entry]
+            pieces.append(html.escape(text[position:start], quote=False))
+            pieces.append(
+                render_to_string(
+                    "components/glossary_term.html",
+                    {"id": f"glossary-{entry}", "text": text[start:end], "definition": definition},
+                ).strip()
+            )
+            linked.add(entry)
+            position = end
+        if not pieces:
+            return segment
+        pieces.append(html.escape(text[position:], quote=False))
+        return "".join(pieces)
+
+    def link(self, content_html):
+        """``content_html`` with glossary terms wrapped in their tooltip."""
+        if not self.glossary:
+            return content_html
+        parts = _TAG.split(content_html)
+        linked = set()
+        skipping = 0
+        for i, part in enumerate(parts):
+            if i % 2:
+                tag = _TAG_NAME.match(part)
+                if tag and tag.group(2).lower() in GLOSSARY_SKIP_TAGS:
+                    skipping += -1 if tag.group(1) else 1
+            elif part and not skipping:
+                parts[i] = self._link_text(part, linked)
+        return "".join(parts)
+
+
+# id(glossary) -> (glossary, linker), as for _layouts
+_linkers = {}
+
+
+def get_glossary_linker(language_code):
+    """The GlossaryLinker of a language's loaded glossary, built once per glossary."""
+    glossary = load_glossary(language_code)
+    entry = _linkers.get(id(glossary))
+    if entry is None or entry[0] is not glossary:
+        if len(_linkers) >= 8:
+            _linkers.clear()
+        entry = _linkers[id(glossary)] = (glossary, GlossaryLinker(glossary))
+    return entry[1]
+
+
+def compile_lesson(text, linker=None):
+    """Parse frontmatter and render the markdown body of a lesson file.
+
+    With a GlossaryLinker, glossary terms in the body are wrapped in their
+    tooltip as part of the compiled HTML.
+    """
+    metadata, body = _parse_frontmatter(text)
     content_html = markdown.markdown(
         body,
         extensions=["extra", "smarty"],
     )
+    if linker is not None:
+        content_html = linker.link(content_html)
     return {
         "metadata": metadata,
         "content_html": content_html,
     }
 
 
-@lru_cache(maxsize=64)
-def load_quiz(lesson_id, language_code=None):
-    """Load and cache a quiz JSON file. Returns dict or None."""
+@instrumented
+def load_lesson(lesson_id, language_code=None):
+    """Load a compiled lesson: parsed frontmatter + rendered HTML.
+
+    Served from the bundle when one is compiled. Otherwise compiled lessons
+    live in the "curriculum" cache, keyed by the source file's mtime and
+    size and by the glossary they were linked against, so editing a lesson
+    invalidates it and workers sharing the cache compile each version once.
+
+    Returns dict with 'metadata' and 'content_html', or None if not found.
+    """
     lang = language_code or _lang()
-    path = get_curriculum_path(lang) / "quizzes" / f"{lesson_id}.json"
+    bundle = get_bundle(lang)
+    if bundle is not None:
+        return bundle["lessons"].get(lesson_id)
+
+    path = get_curriculum_path(lang) / "lessons" / f"{lesson_id}.md"
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+
+    linker = get_glossary_linker(lang)
+    key = f"lesson:{lang}:{lesson_id}:{stat.st_mtime_ns}:{stat.st_size}:{linker.digest}"
+    lesson = caches["curriculum"].get(key)
+    if lesson is None:
+        lesson = compile_lesson(path.read_text(encoding="utf-8"), linker)
+        caches["curriculum"].set(key, lesson)
+    return lesson
+
+
+def build_lesson_cache(languages=None):
+    """Compile every lesson of the curriculum into the cache; returns the count."""
+    count = 0
+    for lang in languages or CURRICULUM_DIRS:
+        for level_data in load_curriculum_index(lang)["levels"]:
+            for lid in level_data["lessons"]:
+                if load_lesson(lid, lang) is not None:
+                    count += 1
+    return count
+
+
+@lru_cache(maxsize=64)
+def _load_quiz_file(lesson_id, language_code):
+    path = get_curriculum_path(language_code) / "quizzes" / f"{lesson_id}.json"
     if not path.exists():
         return None
     return json.loads(path.read_text(encoding="utf-8"))
 
 
-@lru_cache(maxsize=4)
+@instrumented
+def load_quiz(lesson_id, language_code=None):
+    """Load a quiz. Returns dict or None."""
+    lang = language_code or _lang()
+    bundle = get_bundle(lang)
+    if bundle is not None:
+        return bundle["quizzes"].get(lesson_id)
+    return _load_quiz_file(lesson_id, lang)
+
+
+@instrumented
 def get_lesson_titles(language_code):
     """Return a dict mapping lesson_id -> short title for all lessons."""
+    bundle = get_bundle(language_code)
+    if bundle is not None:
+        return bundle["titles"]
+    return _lesson_titles_from_sources(language_code)
+
+
+@lru_cache(maxsize=4)
+def _lesson_titles_from_sources(language_code):
     index = load_curriculum_index(language_code)
     titles = {}
     for level_data in index["levels"]:
         for lid in level_data["lessons"]:
-            raw = _load_lesson_raw(lid, language_code)
-            if raw:
-                meta, _ = _parse_frontmatter(raw)
-                titles[lid] = meta.get("title", lid)
-            else:
-                titles[lid] = lid
+            lesson = load_lesson(lid, language_code)
+            titles[lid] = lesson["metadata"].get("title", lid) if lesson else lid
     return titles
 
 
-def get_user_progress_summary(user, language_code=None):
-    """Build a progress summary for the learning path view."""
+def _coverage_of(index, get_lesson):
+    coverage = {}
+    for level_data in index["levels"]:
+        for lid in level_data["lessons"]:
+            lesson = get_lesson(lid)
+            asset_types = lesson["metadata"].get("asset_types", []) if lesson else []
+            for asset_type in [asset_types] if isinstance(asset_types, str) else asset_types:
+                coverage.setdefault(asset_type, []).append(lid)
+    return coverage
+
+
+def get_asset_type_coverage(language_code):
+    """Return a dict mapping asset_type -> ids of the lessons covering it.
+
+    Read from the ``asset_types`` frontmatter of each lesson, in path order.
+    """
+    bundle = get_bundle(language_code)
+    if bundle is not None:
+        return bundle["coverage"]
+    return _coverage_from_sources(language_code)
+
+
+@lru_cache(maxsize=4)
+def _coverage_from_sources(language_code):
+    return _coverage_of(load_curriculum_index(language_code), lambda lid: load_lesson(lid, language_code))
+
+
+# Relative weight of a word by where it appears
+SEARCH_WEIGHTS = {"title": 5, "body": 1}
+
+SEARCH_RESULTS = 8
+
+_WORD = re.compile(r"\w{2,}")
+
+
+def fold_words(text):
+    """Lowercase words of ``text`` with accents stripped, so "Épargne" matches "epargne"."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return _WORD.findall("".join(c for c in decomposed if not unicodedata.combining(c)))
+
+
+def _search_document(result, title, body=""):
+    """(result, word weights) for one searchable item."""
+    weights = {}
+    for field, text in (("title", title), ("body", body)):
+        for word in fold_words(text):
+            weights[word] = weights.get(word, 0) + SEARCH_WEIGHTS[field]
+    return result, weights
+
+
+def _lesson_search_documents(lesson_id, lesson):
+    if lesson is None:
+        return []
+    title = str(lesson["metadata"].get("title", lesson_id))
+    # Glossary definitions are indexed as terms, not as part of each lesson
+    body = html.unescape(strip_tags(_TOOLTIP.sub("", lesson["content_html"])))
+    return [_search_document({"kind": "lesson", "id": lesson_id, "title": title}, title, body)]
+
+
+def _glossary_search_documents(glossary):
+    return [
+        _search_document(
+            {"kind": "term", "title": entry["term"], "definition": entry["definition"]},
+            entry["term"],
+            entry["definition"],
+        )
+        for entry in glossary
+    ]
+
+
+class SearchIndex:
+    """Inverted index over lesson titles and bodies and glossary terms.
+
+    Postings map each folded word to {document: weight}. The vocabulary is
+    also kept sorted, so the last word of a query matches as a prefix while
+    the user is still typing it.
+    """
+
+    def __init__(self, documents):
+        self.results = []
+        self.postings = {}
+        for doc, (result, weights) in enumerate(documents):
+            self.results.append(result)
+            for word, weight in weights.items():
+                self.postings.setdefault(word, {})[doc] = weight
+        self.words = sorted(self.postings)
+
+    def _matches(self, word, prefix):
+        if not prefix:
+            return self.postings.get(word, {})
+        matches = {}
+        for i in range(bisect_left(self.words, word), len(self.words)):
+            if not self.words[i].startswith(word):
+                break
+            for doc, weight in self.postings[self.words[i]].items():
+                matches[doc] = max(matches.get(doc, 0), weight)
+        return matches
+
+    def search(self, query, limit=SEARCH_RESULTS):
+        """Best results containing every word of ``query``, the last one as a prefix."""
+        words = fold_words(query)
+        if not words:
+            return []
+        scores = None
+        for i, word in enumerate(words):
+            matches = self._matches(word, prefix=i == len(words) - 1)
+            if scores is None:
+                scores = dict(matches)
+            else:
+                scores = {doc: score + matches[doc] for doc, score in scores.items() if doc in matches}
+            if not scores:
+                return []
+        return [self.results[doc] for doc in heapq.nsmallest(limit, scores, key=lambda doc: (-scores[doc], doc))]
+
+
+# (language, source file) -> (stamp, documents), so a rebuild only re-reads changed files
+_search_documents = {}
+
+# language -> (curriculum version, SearchIndex)
+_search_indexes = {}
+
+
+def _source_search_documents(language_code, path, build):
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return []
+    stamp = (stat.st_mtime_ns, stat.st_size)
+    entry = _search_documents.get((language_code, path.name))
+    if entry is None or entry[0] != stamp:
+        entry = _search_documents[(language_code, path.name)] = (stamp, build())
+    return entry[1]
+
+
+def _search_index_from_sources(language_code):
+    base = get_curriculum_path(language_code)
+    documents = []
+    for level_data in load_curriculum_index(language_code)["levels"]:
+        for lid in level_data["lessons"]:
+            documents += _source_search_documents(
+                language_code,
+                base / "lessons" / f"{lid}.md",
+                lambda lid=lid: _lesson_search_documents(lid, load_lesson(lid, language_code)),
+            )
+    for name in [f"glossary_{language_code}.json", "glossary.json"]:
+        path = base / name
+        if path.exists():
+            documents += _source_search_documents(
+                language_code, path, lambda path=path: _glossary_search_documents(json.loads(path.read_text("utf-8")))
+            )
+            break
+    return SearchIndex(documents)
+
+
+def get_search_index(language_code):
+    """The SearchIndex of a language's curriculum.
+
+    Prebuilt in the bundle when one is compiled. From sources it is rebuilt
+    when the curriculum version changes, re-reading only the files that did.
+    """
+    bundle = get_bundle(language_code)
+    if bundle is not None:
+        return bundle["search"]
+    version = get_curriculum_version(language_code)
+    entry = _search_indexes.get(language_code)
+    if entry is None or entry[0] != version:
+        entry = _search_indexes[language_code] = (version, _search_index_from_sources(language_code))
+    return entry[1]
+
+
+@instrumented
+def search_curriculum(query, language_code):
+    """Lessons and glossary terms matching a typeahead query, best first."""
+    return get_search_index(language_code).search(query)
+
+
+def compile_curriculum_bundle(language_code):
+    """Build a language's bundle straight from its source files.
+
+    Holds the index, lesson titles, asset-type coverage, compiled lessons,
+    quizzes, glossary and search index, plus a content hash of the sources
+    as its version.
+    """
+    base = get_curriculum_path(language_code)
+    digest = hashlib.sha256()
+    for path in _source_files(language_code):
+        digest.update(path.relative_to(base).as_posix().encode())
+        digest.update(path.read_bytes())
+
+    index = _load_index_file.__wrapped__(language_code)
+    glossary = _load_glossary_file.__wrapped__(language_code)
+    linker = GlossaryLinker(glossary)
+    lessons = {
+        path.stem: compile_lesson(path.read_text(encoding="utf-8"), linker)
+        for path in sorted((base / "lessons").glob("*.md"))
+    }
+    quizzes = {
+        path.stem: json.loads(path.read_text(encoding="utf-8")) for path in sorted((base / "quizzes").glob("*.json"))
+    }
+    titles = {
+        lid: lessons[lid]["metadata"].get("title", lid) if lid in lessons else lid
+        for level_data in index["levels"]
+        for lid in level_data["lessons"]
+    }
+    search_documents = [
+        document
+        for level_data in index["levels"]
+        for lid in level_data["lessons"]
+        for document in _lesson_search_documents(lid, lessons.get(lid))
+    ]
+    return {
+        "format": BUNDLE_FORMAT,
+        "version": digest.hexdigest()[:12],
+        "language": language_code,
+        "index": index,
+        "titles": titles,
+        "coverage": _coverage_of(index, lessons.get),
+        "lessons": lessons,
+        "quizzes": quizzes,
+        "glossary": glossary,
+        "search": SearchIndex(search_documents + _glossary_search_documents(glossary)),
+    }
+
+
+def write_curriculum_bundle(language_code):
+    """Compile a language's bundle and atomically replace the one on disk."""
+    path = get_bundle_path(language_code)
+    bundle = compile_curriculum_bundle(language_code)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(".tmp")
+    tmp.write_bytes(pickle.dumps(bundle, protocol=pickle.HIGHEST_PROTOCOL))
+    os.replace(tmp, path)
+    _read_bundle.cache_clear()
+    return bundle
+
+
+class CurriculumLayout:
+    """Every lesson in path order, for bitmaps over curriculum positions.
+
+    Both languages share one layout; ``digest`` changes when lessons are
+    added, removed, reordered or moved between levels.
+    """
+
+    def __init__(self, index):
+        self.levels = [(level["level"], list(level["lessons"])) for level in index["levels"]]
+        self.lesson_ids = [lid for _, lesson_ids in self.levels for lid in lesson_ids]
+        self.positions = {lid: i for i, lid in enumerate(self.lesson_ids)}
+        self.level_of = {lid: level for level, lesson_ids in self.levels for lid in lesson_ids}
+        self.digest = hashlib.sha256(json.dumps(self.levels).encode()).hexdigest()[:12]
+
+    def mask_of(self, lesson_ids):
+        """Bitmap of the given lessons; ids not in the layout are ignored."""
+        mask = 0
+        for lid in lesson_ids:
+            if lid in self.positions:
+                mask |= 1 << self.positions[lid]
+        return mask
+
+    def lesson_ids_in(self, mask):
+        return [lid for i, lid in enumerate(self.lesson_ids) if mask >> i & 1]
+
+    def apply(self, progress, mask):
+        """Set the bitmap and everything derived from it on a LearningProgress."""
+        progress.mask = mask
+        progress.completed_count = mask.bit_count()
+        progress.next_lesson_id = next((lid for i, lid in enumerate(self.lesson_ids) if not mask >> i & 1), "")
+        progress.level_counts = {
+            str(level): sum(mask >> self.positions[lid] & 1 for lid in lesson_ids) for level, lesson_ids in self.levels
+        }
+        progress.layout = self.digest
+
+
+# id(index) -> (index, layout); the index is kept so its id can't be reused
+_layouts = {}
+
+
+def get_curriculum_layout(language_code=None):
+    """The CurriculumLayout of the loaded curriculum index, built once per index."""
+    index = load_curriculum_index(language_code or _lang())
+    entry = _layouts.get(id(index))
+    if entry is None or entry[0] is not index:
+        if len(_layouts) >= 8:
+            _layouts.clear()
+        entry = _layouts[id(index)] = (index, CurriculumLayout(index))
+    return entry[1]
+
+
+# id(coverage) -> (coverage, masks), as for _layouts
+_coverage_masks = {}
+
+
+def get_coverage_masks(language_code=None):
+    """Bitmap of the lessons each asset type requires, built once per coverage map."""
     lang = language_code or _lang()
-    index = load_curriculum_index(lang)
+    coverage = get_asset_type_coverage(lang)
+    entry = _coverage_masks.get(id(coverage))
+    if entry is None or entry[0] is not coverage:
+        if len(_coverage_masks) >= 8:
+            _coverage_masks.clear()
+        layout = get_curriculum_layout(lang)
+        masks = {asset_type: layout.mask_of(lesson_ids) for asset_type, lesson_ids in coverage.items()}
+        entry = _coverage_masks[id(coverage)] = (coverage, masks)
+    return entry[1]
+
+
+def rebuild_learning_progress(user, language_code=None):
+    """Recompute a user's LearningProgress from LessonProgress and QuizCompletion."""
+    layout = get_curriculum_layout(language_code)
+    progress = LearningProgress(
+        user=user,
+        quiz_scores=dict(QuizCompletion.objects.filter(user=user).values_list("lesson_id", "score")),
+    )
+    layout.apply(progress, layout.mask_of(LessonProgress.objects.filter(user=user).values_list("lesson_id", flat=True)))
+    LearningProgress.objects.bulk_create(
+        [progress],
+        update_conflicts=True,
+        unique_fields=["user"],
+        update_fields=[
+            "layout",
+            "completed",
+            "completed_count",
+            "next_lesson_id",
+            "level_counts",
+            "quiz_scores",
+            "updated_at",
+        ],
+    )
+    return progress
 
-    completed_ids = set(LessonProgress.objects.filter(user=user).values_list("lesson_id", flat=True))
-    quiz_scores = dict(QuizCompletion.objects.filter(user=user).values_list("lesson_id", "score"))
 
-    total = 0
-    completed = 0
-    by_level = []
+def get_learning_progress(user, language_code=None):
+    """The user's LearningProgress: one query, unless it has to be (re)built."""
+    layout = get_curriculum_layout(language_code)
+    progress = LearningProgress.objects.filter(user=user).first()
+    if progress is None or progress.layout != layout.digest:
+        progress = rebuild_learning_progress(user, language_code)
+    return progress
+
+
+@instrumented
+def update_learning_progress(user, lesson_id, completed=True, quiz_score=None, language_code=None):
+    """Apply one lesson's completion (or undoing it) and quiz score.
 
+    Call after LessonProgress/QuizCompletion have been written: a missing or
+    outdated row is rebuilt from them instead.
+    """
+    layout = get_curriculum_layout(language_code)
+    # No savepoint of its own when called inside a caller's transaction
+    with transaction.atomic(savepoint=False):
+        progress = LearningProgress.objects.select_for_update().filter(user=user).first()
+        if progress is None or progress.layout != layout.digest:
+            return rebuild_learning_progress(user, language_code)
+
+        position = layout.positions.get(lesson_id)
+        if position is not None:
+            bit = 1 << position
+            layout.apply(progress, progress.mask | bit if completed else progress.mask & ~bit)
+        if quiz_score is not None:
+            progress.quiz_scores[lesson_id] = quiz_score
+        progress.save()
+    return progress
+
+
+@instrumented
+def get_user_progress_summary(user, language_code=None):
+    """Build a progress summary for the learning path view."""
+    lang = language_code or _lang()
+    index = load_curriculum_index(lang)
+    layout = get_curriculum_layout(lang)
+    progress = get_learning_progress(user, lang)
     titles = get_lesson_titles(lang)
 
+    by_level = []
     for level_data in index["levels"]:
         lesson_ids = level_data["lessons"]
         level_total = len(lesson_ids)
-        level_completed = sum(1 for lid in lesson_ids if lid in completed_ids)
-        total += level_total
-        completed += level_completed
+        level_completed = progress.level_counts.get(str(level_data["level"]), 0)
         by_level.append(
             {
                 "level": level_data["level"],
@@ -172,31 +784,136 @@ def get_user_progress_summary(user, language_code=None):
             }
         )
 
+    total = len(layout.lesson_ids)
+    completed = progress.completed_count
     percentage = round(completed / total * 100) if total > 0 else 0
 
     return {
         "total": total,
         "completed": completed,
         "percentage": percentage,
-        "completed_ids": completed_ids,
-        "quiz_scores": quiz_scores,
+        "completed_ids": set(layout.lesson_ids_in(progress.mask)),
+        "quiz_scores": progress.quiz_scores,
         "by_level": by_level,
     }
 
 
-def get_next_lesson(user, language_code=None):
-    """Return the first uncompleted lesson as {id, title, level} or None."""
+@instrumented
+def get_next_lesson(user, language_code=None, progress=None):
+    """Return the first uncompleted lesson as {id, title, level} or None.
+
+    Pass the user's LearningProgress as ``progress`` if it is already loaded.
+    """
     lang = language_code or _lang()
-    index = load_curriculum_index(lang)
-    completed_ids = set(LessonProgress.objects.filter(user=user).values_list("lesson_id", flat=True))
-    titles = get_lesson_titles(lang)
+    lesson_id = (progress or get_learning_progress(user, lang)).next_lesson_id
+    if not lesson_id:
+        return None
+    return {
+        "id": lesson_id,
+        "title": get_lesson_titles(lang).get(lesson_id, lesson_id),
+        "level": get_curriculum_layout(lang).level_of[lesson_id],
+    }
 
-    for level_data in index["levels"]:
-        for lid in level_data["lessons"]:
-            if lid not in completed_ids:
-                return {
-                    "id": lid,
-                    "title": titles.get(lid, lid),
-                    "level": level_data["level"],
-                }
-    return None
+
+class QuizAttempt:
+    """A user's in-progress lesson quiz, kept in the "quiz_attempts" cache.
+
+    Answers accumulate in the cache and nothing touches the database until
+    finish(), which replaces the lesson's responses, completion and progress
+    in one transaction. With QUIZ_WRITE_THROUGH each answer is also saved as
+    it is given, and an attempt that dropped out of the cache is rebuilt
+    from those rows.
+    """
+
+    def __init__(self, user, lesson_id, answers=None):
+        self.user = user
+        self.lesson_id = lesson_id
+        # question_id -> (choice_id, is_correct)
+        self.answers = answers or {}
+
+    @property
+    def _key(self):
+        return f"quiz:{self.user.pk}:{self.lesson_id}"
+
+    @classmethod
+    def start(cls, user, lesson_id):
+        """Begin a fresh attempt; earlier results stay until it's finished."""
+        attempt = cls(user, lesson_id)
+        caches["quiz_attempts"].set(attempt._key, attempt.answers)
+        if settings.QUIZ_WRITE_THROUGH:
+            QuizResponse.objects.filter(user=user, lesson_id=lesson_id).delete()
+        return attempt
+
+    @classmethod
+    def load(cls, user, lesson_id):
+        """The current attempt, or an empty one if it expired."""
+        attempt = cls(user, lesson_id)
+        answers = caches["quiz_attempts"].get(attempt._key)
+        if answers is None and settings.QUIZ_WRITE_THROUGH:
+            answers = {
+                question_id: (choice_id, is_correct)
+                for question_id, choice_id, is_correct in QuizResponse.objects.filter(
+                    user=user, lesson_id=lesson_id
+                ).values_list("question_id", "choice_id", "is_correct")
+            }
+        attempt.answers = answers or {}
+        return attempt
+
+    def answer(self, question_id, choice_id, is_correct):
+        """Record (or change) the answer to one question."""
+        self.answers[question_id] = (choice_id or "", is_correct)
+        caches["quiz_attempts"].set(self._key, self.answers)
+        if settings.QUIZ_WRITE_THROUGH:
+            QuizResponse.objects.update_or_create(
+                user=self.user,
+                lesson_id=self.lesson_id,
+                question_id=question_id,
+                defaults={"choice_id": choice_id or "", "is_correct": is_correct},
+            )
+
+    @property
+    def score(self):
+        return sum(1 for _, is_correct in self.answers.values() if is_correct)
+
+    def finish(self, total):
+        """Persist the attempt and mark the lesson complete; returns the score.
+
+        Returns None and writes nothing unless all ``total`` questions are
+        answered: an attempt that expired from the cache or was never
+        started would otherwise replace the user's last result with a zero.
+        """
+        if len(self.answers) < total:
+            return None
+        score = self.score
+        with transaction.atomic():
+            QuizResponse.objects.filter(user=self.user, lesson_id=self.lesson_id).delete()
+            QuizResponse.objects.bulk_create(
+                QuizResponse(
+                    user=self.user,
+                    lesson_id=self.lesson_id,
+                    question_id=question_id,
+                    choice_id=choice_id,
+                    is_correct=is_correct,
+                )
+                for question_id, (choice_id, is_correct) in self.answers.items()
+            )
+            QuizCompletion.objects.bulk_create(
+                [
+                    QuizCompletion(
+                        user=self.user,
+                        lesson_id=self.lesson_id,
+                        score=score,
+                        total=total,
+                        completed_at=timezone.now(),
+                    )
+                ],
+                update_conflicts=True,
+                unique_fields=["user", "lesson_id"],
+                update_fields=["score", "total", "completed_at"],
+            )
+            LessonProgress.objects.bulk_create(
+                [LessonProgress(user=self.user, lesson_id=self.lesson_id)], ignore_conflicts=True
+            )
+            update_learning_progress(self.user, self.lesson_id, quiz_score=score)
+        caches["quiz_attempts"].delete(self._key)
+        return score
@@ -0,0 +1,368 @@
+import os
+import re
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.education import services
+from apps.education.models import LearningProgress, LessonProgress, QuizCompletion, QuizResponse
+from apps.education.services import (
+    GlossaryLinker,
+    QuizAttempt,
+    build_lesson_cache,
+    fold_words,
+    get_asset_type_coverage,
+    get_bundle,
+    get_coverage_masks,
+    get_curriculum_layout,
+    get_curriculum_version,
+    get_learning_progress,
+    get_lesson_titles,
+    get_next_lesson,
+    get_user_progress_summary,
+    load_curriculum_index,
+    load_glossary,
+    load_lesson,
+    load_quiz,
+    rebuild_learning_progress,
+    search_curriculum,
+    update_learning_progress,
+)
+
+LESSON = """---
+id: T-01
+title: "Test lesson"
+level: 0
+tags:
+  - basics
+---
+# Heading
+
+Some *markdown*.
+"""
+
+
+class LessonCacheTest(TestCase):
+    def setUp(self):
+        caches["curriculum"].clear()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = Path(tmp.name)
+        (self.root / "lessons").mkdir()
+        self.lesson_path = self.root / "lessons" / "T-01.md"
+        self.lesson_path.write_text(LESSON, encoding="utf-8")
+        patcher = mock.patch.dict(services.CURRICULUM_DIRS, {"en": self.root})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        # Lessons are linked against the glossary, which is read once per language
+        services._load_glossary_file.cache_clear()
+        self.addCleanup(services._load_glossary_file.cache_clear)
+
+    def test_compiles_once(self):
+        with mock.patch.object(services, "compile_lesson", wraps=services.compile_lesson) as compile_lesson:
+            first = load_lesson("T-01", "en")
+            second = load_lesson("T-01", "en")
+        assert compile_lesson.call_count == 1
+        assert first == second
+        assert first["metadata"]["title"] == "Test lesson"
+        assert first["metadata"]["tags"] == ["basics"]
+        assert "<em>markdown</em>" in first["content_html"]
+
+    def test_edit_invalidates(self):
+        load_lesson("T-01", "en")
+        self.lesson_path.write_text(LESSON.replace("Test lesson", "Edited lesson"), encoding="utf-8")
+        stat = self.lesson_path.stat()
+        os.utime(self.lesson_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert load_lesson("T-01", "en")["metadata"]["title"] == "Edited lesson"
+
+    def test_missing_lesson(self):
+        assert load_lesson("T-99", "en") is None
+
+    def test_source_version_follows_edits(self):
+        before = get_curriculum_version("en")
+        assert get_curriculum_version("en") == before
+        stat = self.lesson_path.stat()
+        os.utime(self.lesson_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+        assert get_curriculum_version("en") != before
+
+
+class BuildCurriculumTest(TestCase):
+    def setUp(self):
+        caches["curriculum"].clear()
+        services._lesson_titles_from_sources.cache_clear()
+
+    def test_build_warms_every_lesson(self):
+        assert build_lesson_cache(["en"]) == 17
+        with mock.patch.object(services, "compile_lesson") as compile_lesson:
+            titles = get_lesson_titles("en")
+        compile_lesson.assert_not_called()
+        assert len(titles) == 17
+        assert all(title != lesson_id for lesson_id, title in titles.items())
+
+    def test_command(self):
+        out = StringIO()
+        call_command("build_curriculum", stdout=out)
+        assert "34 lessons compiled" in out.getvalue()
+
+
+class CurriculumBundleTest(TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(CURRICULUM_BUNDLE_DIR=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(services._read_bundle.cache_clear)
+        call_command("compile_curriculum", stdout=StringIO())
+
+    def test_loaders_read_the_bundle(self):
+        bundle = get_bundle("fr")
+        assert bundle["language"] == "fr"
+        with (
+            mock.patch.object(services, "compile_lesson") as compile_lesson,
+            mock.patch.object(services, "_load_quiz_file") as load_quiz_file,
+        ):
+            assert load_curriculum_index("fr") is bundle["index"]
+            assert load_glossary("fr") is bundle["glossary"]
+            assert load_lesson("L0-01", "fr")["metadata"]["id"] == "L0-01"
+            assert load_quiz("L0-01", "fr")["questions"]
+            assert get_lesson_titles("fr")["L0-01"] == load_lesson("L0-01", "fr")["metadata"]["title"]
+            assert load_lesson("L9-99", "fr") is None
+        compile_lesson.assert_not_called()
+        load_quiz_file.assert_not_called()
+
+    def test_matches_sources(self):
+        def loaded():
+            return (
+                load_lesson("L1-01", "en"),
+                load_quiz("L1-01", "en"),
+                get_asset_type_coverage("en"),
+                search_curriculum("frais ges", "fr"),
+            )
+
+        with override_settings(CURRICULUM_BUNDLE_DIR=None):
+            from_sources = loaded()
+        assert loaded() == from_sources
+
+    def test_version_is_a_content_hash(self):
+        version = get_curriculum_version("en")
+        assert version == get_bundle("en")["version"]
+        assert version != get_curriculum_version("fr")
+        call_command("compile_curriculum", "--language", "en", stdout=StringIO())
+        assert get_curriculum_version("en") == version
+
+    def test_ignores_other_formats(self):
+        with mock.patch.object(services, "BUNDLE_FORMAT", 0):
+            services._read_bundle.cache_clear()
+            assert get_bundle("en") is None
+
+
+class GlossaryLinkerTest(TestCase):
+    def setUp(self):
+        self.linker = GlossaryLinker(
+            [
+                {"term": "Risk", "definition": "Uncertainty."},
+                {"term": "TFSA (CELI)", "definition": "Tax-free account."},
+                {"term": "Risk budget", "definition": "How much you can lose."},
+                {"term": "Allocation d’actifs", "definition": "Répartition."},
+            ]
+        )
+
+    def linked(self, content_html):
+        return re.findall(r'aria-describedby="glossary-(\d)">([^<]*)</button>', self.linker.link(content_html))
+
+    def test_first_whole_word_occurrence(self):
+        content_html = "<h2>Risk</h2><p>Risky? Risk budget, then risk and Risk.</p>"
+        assert self.linked(content_html) == [("2", "Risk budget"), ("0", "risk")]
+
+    def test_aliases_and_skipped_elements(self):
+        content_html = '<p>Open a <a href="#">TFSA</a> or a <code>TFSA</code>, i.e. a CELI.</p>'
+        assert self.linked(content_html) == [("1", "CELI")]
+
+    def test_entities(self):
+        html = self.linker.link("<p>L&rsquo;allocation d&rsquo;actifs &amp; co.</p>")
+        assert "&amp; co." in html
+        assert "allocation d’actifs</button>" in html
+        assert 'role="tooltip"' in html
+
+    def test_bundle_and_sources_both_link(self):
+        assert 'role="tooltip"' in load_lesson("L0-01", "fr")["content_html"]
+
+
+class SearchIndexTest(TestCase):
+    def test_fold_words(self):
+        assert fold_words("Épargne, l’ÉTÉ") == ["epargne", "ete"]
+
+    def test_accent_insensitive(self):
+        assert search_curriculum("epargne", "fr") == search_curriculum("Épargne", "fr")
+        assert search_curriculum("epargne", "fr")
+
+    def test_last_word_is_a_prefix(self):
+        results = search_curriculum("diversif", "en")
+        assert results[0]["kind"] == "lesson"
+        assert {"kind": "term", "title": "Diversification"} in [
+            {"kind": r["kind"], "title": r["title"]} for r in results
+        ]
+
+    def test_every_word_must_match(self):
+        assert search_curriculum("diversification", "en")
+        assert search_curriculum("diversification zzzz", "en") == []
+        assert search_curriculum("  ", "en") == []
+
+    def test_rebuild_rereads_changed_files_only(self):
+        search_curriculum("etf", "en")
+        with (
+            mock.patch.dict(services._search_indexes, clear=True),
+            mock.patch.object(services, "load_lesson", wraps=services.load_lesson) as load,
+        ):
+            services._search_documents["en", "L1-02.md"] = ((0, 0), [])
+            assert search_curriculum("etf", "en")[0]["id"] == "L1-02"
+        load.assert_called_once_with("L1-02", "en")
+
+
+class QuizAttemptTest(TestCase):
+    def setUp(self):
+        caches["quiz_attempts"].clear()
+        self.user = get_user_model().objects.create_user(username="quizzer", email="q@example.com", password="x")
+
+    def test_answers_are_cached_not_written(self):
+        with self.assertNumQueries(0):
+            QuizAttempt.start(self.user, "L0-01")
+            QuizAttempt.load(self.user, "L0-01").answer("q1", "A", True)
+            QuizAttempt.load(self.user, "L0-01").answer("q2", "C", False)
+        assert QuizAttempt.load(self.user, "L0-01").score == 1
+
+    def test_changing_an_answer(self):
+        attempt = QuizAttempt.start(self.user, "L0-01")
+        attempt.answer("q1", "A", False)
+        attempt.answer("q1", "B", True)
+        assert QuizAttempt.load(self.user, "L0-01").answers == {"q1": ("B", True)}
+
+    def test_finish_writes_everything_in_one_transaction(self):
+        QuizResponse.objects.create(
+            user=self.user, lesson_id="L0-01", question_id="old", choice_id="A", is_correct=True
+        )
+        attempt = QuizAttempt.start(self.user, "L0-01")
+        attempt.answer("q1", "A", True)
+        attempt.answer("q2", "C", False)
+
+        rebuild_learning_progress(self.user)
+        # Savepoint pair + delete, responses, completion upsert, lesson progress
+        # insert, then the learning-progress aggregate's locked read and update
+        with self.assertNumQueries(8):
+            score = QuizAttempt.load(self.user, "L0-01").finish(total=2)
+
+        assert score == 1
+        assert set(QuizResponse.objects.values_list("question_id", flat=True)) == {"q1", "q2"}
+        completion = QuizCompletion.objects.get(user=self.user, lesson_id="L0-01")
+        assert (completion.score, completion.total) == (1, 2)
+        assert LessonProgress.objects.filter(user=self.user, lesson_id="L0-01").exists()
+        assert QuizAttempt.load(self.user, "L0-01").answers == {}
+
+    def test_finish_again_updates_completion(self):
+        attempt = QuizAttempt.start(self.user, "L0-01")
+        attempt.answer("q1", "A", False)
+        attempt.finish(total=1)
+        attempt = QuizAttempt.start(self.user, "L0-01")
+        attempt.answer("q1", "A", True)
+        attempt.finish(total=1)
+        assert QuizCompletion.objects.get(user=self.user, lesson_id="L0-01").score == 1
+        assert LessonProgress.objects.filter(user=self.user).count() == 1
+
+    def test_incomplete_attempt_is_not_saved(self):
+        attempt = QuizAttempt.start(self.user, "L0-01")
+        attempt.answer("q1", "A", True)
+        with self.assertNumQueries(0):
+            assert attempt.finish(total=2) is None
+            # Expired from the cache, or never started
+            assert QuizAttempt.load(self.user, "L0-02").finish(total=2) is None
+        assert not QuizCompletion.objects.exists()
+        assert not LessonProgress.objects.exists()
+
+    @override_settings(QUIZ_WRITE_THROUGH=True)
+    def test_write_through_rebuilds_an_evicted_attempt(self):
+        attempt = QuizAttempt.start(self.user, "L0-01")
+        attempt.answer("q1", "A", True)
+        assert QuizResponse.objects.filter(user=self.user, question_id="q1").exists()
+
+        caches["quiz_attempts"].clear()
+        assert QuizAttempt.load(self.user, "L0-01").answers == {"q1": ("A", True)}
+
+
+class LearningProgressTest(TestCase):
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username="learner", email="l@example.com", password="x")
+        self.layout = get_curriculum_layout("en")
+
+    def test_rebuild_from_rows(self):
+        LessonProgress.objects.create(user=self.user, lesson_id="L0-01")
+        LessonProgress.objects.create(user=self.user, lesson_id="L1-02")
+        QuizCompletion.objects.create(user=self.user, lesson_id="L0-01", score=4, total=5)
+
+        progress = rebuild_learning_progress(self.user, "en")
+        assert self.layout.lesson_ids_in(progress.mask) == ["L0-01", "L1-02"]
+        assert progress.completed_count == 2
+        assert progress.next_lesson_id == "L0-02"
+        assert progress.level_counts["0"] == 1
+        assert progress.level_counts["1"] == 1
+        assert progress.quiz_scores == {"L0-01": 4}
+
+    def test_incremental_updates(self):
+        rebuild_learning_progress(self.user, "en")
+        update_learning_progress(self.user, "L0-01", language_code="en")
+        update_learning_progress(self.user, "L0-02", quiz_score=3, language_code="en")
+        progress = LearningProgress.objects.get(user=self.user)
+        assert progress.next_lesson_id == "L1-01"
+        assert progress.level_counts["0"] == 2
+        assert progress.quiz_scores == {"L0-02": 3}
+
+        update_learning_progress(self.user, "L0-01", completed=False, language_code="en")
+        progress = LearningProgress.objects.get(user=self.user)
+        assert progress.next_lesson_id == "L0-01"
+        assert progress.completed_count == 1
+
+    def test_new_layout_rebuilds(self):
+        LessonProgress.objects.create(user=self.user, lesson_id="L0-01")
+        rebuild_learning_progress(self.user, "en")
+        LearningProgress.objects.filter(user=self.user).update(layout="old", completed=b"")
+
+        progress = get_learning_progress(self.user, "en")
+        assert progress.layout == self.layout.digest
+        assert progress.completed_count == 1
+
+    def test_reads_are_one_query(self):
+        rebuild_learning_progress(self.user, "en")
+        with self.assertNumQueries(1):
+            summary = get_user_progress_summary(self.user, "en")
+        assert summary["total"] == len(self.layout.lesson_ids)
+        with self.assertNumQueries(1):
+            assert get_next_lesson(self.user, "en")["id"] == "L0-01"
+
+    def test_all_done(self):
+        LessonProgress.objects.bulk_create(
+            LessonProgress(user=self.user, lesson_id=lid) for lid in self.layout.lesson_ids
+        )
+        rebuild_learning_progress(self.user, "en")
+        assert get_next_lesson(self.user, "en") is None
+        assert get_user_progress_summary(self.user, "en")["percentage"] == 100
+
+    def test_coverage_masks(self):
+        coverage = get_asset_type_coverage("en")
+        assert coverage["cash"] == ["L0-01"]
+        assert coverage["gic"] == coverage["bond"]
+        masks = get_coverage_masks("en")
+        assert masks["cash"] == 1
+        assert masks["gic"] == self.layout.mask_of(coverage["gic"])
+        assert get_coverage_masks("en") is masks
+
+    def test_mask_beyond_64_lessons(self):
+        progress = LearningProgress(user=self.user)
+        progress.mask = 1 << 100 | 1
+        progress.save()
+        assert LearningProgress.objects.get(user=self.user).mask == 1 << 100 | 1
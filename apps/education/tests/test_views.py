@@ -1 +1,153 @@
 # Education view tests
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.core.cache.utils import make_template_fragment_key
+from django.test import TestCase
+
+from apps.education.models import LearningProgress, LessonProgress, QuizCompletion, QuizResponse
+from apps.education.services import QuizAttempt, get_curriculum_version, load_quiz
+
+User = get_user_model()
+
+
+class QuizFragmentCacheTest(TestCase):
+    def setUp(self):
+        caches["template_fragments"].clear()
+        caches["quiz_attempts"].clear()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(email="test@example.com", password="testpass123")
+        self.version = get_curriculum_version("fr")
+
+    def test_question_fragments_exclude_csrf(self):
+        response = self.client.get("/learn/L0-01/quiz/1/")
+        self.assertContains(response, "csrfmiddlewaretoken")
+
+        head = caches["template_fragments"].get(
+            make_template_fragment_key("quiz_question", ["L0-01", 1, "fr", self.version])
+        )
+        choices = caches["template_fragments"].get(
+            make_template_fragment_key("quiz_question_choices", ["L0-01", 1, "fr", self.version])
+        )
+        assert "<form" in head
+        assert 'name="choice"' in choices
+        assert "csrfmiddlewaretoken" not in head + choices
+
+    def test_each_user_gets_their_own_token(self):
+        first = self.client.get("/learn/L0-01/quiz/1/").context["csrf_token"]
+        other = self.client_class()
+        User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        other.login(email="other@example.com", password="testpass123")
+        response = other.get("/learn/L0-01/quiz/1/")
+        self.assertContains(response, str(response.context["csrf_token"]))
+        assert str(response.context["csrf_token"]) != str(first)
+
+    def test_new_curriculum_version_rerenders(self):
+        self.client.get("/learn/L0-01/quiz/1/")
+        with patch("apps.education.views.get_curriculum_version", return_value="next"):
+            self.client.get("/learn/L0-01/quiz/1/")
+        key = make_template_fragment_key("quiz_question", ["L0-01", 1, "fr", "next"])
+        assert caches["template_fragments"].get(key) is not None
+
+    def test_feedback_keyed_on_choice(self):
+        self.client.post("/learn/L0-01/quiz/1/", {"choice": "A"})
+        self.client.post("/learn/L0-01/quiz/1/", {"choice": "B"})
+        for choice in ("A", "B"):
+            key = make_template_fragment_key("quiz_feedback", ["L0-01", 1, choice, "fr", self.version])
+            assert caches["template_fragments"].get(key) is not None
+
+    def test_unknown_choice_is_normalized(self):
+        response = self.client.post("/learn/L0-01/quiz/1/", {"choice": "Z" * 50})
+        assert response.status_code == 200
+        assert response.context["choice_id"] is None
+        assert QuizAttempt.load(self.user, "L0-01").answers == {"q1": ("", False)}
+
+
+class QuizFlowTest(TestCase):
+    def setUp(self):
+        caches["quiz_attempts"].clear()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(email="test@example.com", password="testpass123")
+        self.questions = load_quiz("L0-01", "fr")["questions"]
+
+    def _answer_all(self):
+        for step, question in enumerate(self.questions, start=1):
+            self.client.post(f"/learn/L0-01/quiz/{step}/", {"choice": question["answer"]})
+
+    def test_answers_stay_out_of_the_database_until_the_end(self):
+        self.client.get("/learn/L0-01/quiz/")
+        self._answer_all()
+        assert not QuizResponse.objects.exists()
+
+        response = self.client.get(f"/learn/L0-01/quiz/{len(self.questions)}/next/")
+        assert response.context["score"] == len(self.questions)
+        assert QuizResponse.objects.filter(user=self.user, is_correct=True).count() == len(self.questions)
+        completion = QuizCompletion.objects.get(user=self.user, lesson_id="L0-01")
+        assert (completion.score, completion.total) == (len(self.questions), len(self.questions))
+        assert LessonProgress.objects.filter(user=self.user, lesson_id="L0-01").exists()
+
+    def test_restart_keeps_previous_result_until_finished(self):
+        self.client.get("/learn/L0-01/quiz/")
+        self._answer_all()
+        self.client.get(f"/learn/L0-01/quiz/{len(self.questions)}/next/")
+
+        self.client.get("/learn/L0-01/quiz/")
+        assert QuizCompletion.objects.filter(user=self.user, lesson_id="L0-01").exists()
+        for step in range(1, len(self.questions) + 1):
+            self.client.post(f"/learn/L0-01/quiz/{step}/", {"choice": "none"})
+        self.client.get(f"/learn/L0-01/quiz/{len(self.questions)}/next/")
+
+        completion = QuizCompletion.objects.get(user=self.user, lesson_id="L0-01")
+        assert completion.score == 0
+        assert QuizResponse.objects.filter(user=self.user, is_correct=False).count() == len(self.questions)
+
+    def test_expired_attempt_restarts_the_quiz(self):
+        self.client.get("/learn/L0-01/quiz/")
+        self._answer_all()
+        self.client.get(f"/learn/L0-01/quiz/{len(self.questions)}/next/")
+
+        self.client.get("/learn/L0-01/quiz/")
+        self._answer_all()
+        caches["quiz_attempts"].clear()
+        response = self.client.get(f"/learn/L0-01/quiz/{len(self.questions)}/next/", headers={"hx-request": "true"})
+
+        assert response["HX-Redirect"] == "/learn/L0-01/quiz/"
+        completion = QuizCompletion.objects.get(user=self.user, lesson_id="L0-01")
+        assert completion.score == len(self.questions)
+        assert QuizResponse.objects.filter(user=self.user, is_correct=True).count() == len(self.questions)
+        response = self.client.get(f"/learn/L0-01/quiz/{len(self.questions)}/next/", follow=True)
+        self.assertRedirects(response, "/learn/L0-01/quiz/")
+        self.assertContains(response, "expir")
+
+
+class MarkLessonCompleteTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(email="test@example.com", password="testpass123")
+
+    def test_toggle_updates_learning_progress(self):
+        self.client.post("/learn/L0-01/complete/")
+        assert LearningProgress.objects.get(user=self.user).next_lesson_id == "L0-02"
+
+        self.client.post("/learn/L0-01/complete/")
+        assert LearningProgress.objects.get(user=self.user).next_lesson_id == "L0-01"
+
+
+class SearchViewTest(TestCase):
+    def setUp(self):
+        User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(email="test@example.com", password="testpass123")
+
+    def test_typeahead_results(self):
+        # Session language is French; no accents needed
+        response = self.client.get("/learn/search/", {"q": "epar"})
+        self.assertTemplateUsed(response, "education/partials/search_results.html")
+        assert response.context["results"]
+        self.assertContains(response, "/learn/")
+
+    def test_empty_and_invalid_queries(self):
+        response = self.client.get("/learn/search/", {"q": ""})
+        assert response.context["results"] == []
+        self.assertNotContains(response, "<ul")
+        assert self.client.get("/learn/search/", {"q": "x" * 101}).status_code == 400
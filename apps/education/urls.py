@@ -6,6 +6,7 @@ app_name = "education"
 
 urlpatterns = [
     path("", views.learning_path, name="path"),
+    path("search/", views.search, name="search"),
     path("<str:lesson_id>/", views.lesson_detail, name="lesson"),
     path("<str:lesson_id>/complete/", views.mark_lesson_complete, name="lesson_complete"),
     path("<str:lesson_id>/quiz/", views.quiz_start, name="quiz_start"),
@@ -1,13 +1,22 @@
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.http import Http404
+from django.http import Http404, HttpResponseBadRequest
 from django.shortcuts import redirect, render
+from django.urls import reverse
 from django.utils.translation import get_language
+from django.utils.translation import gettext as _
+from django_htmx.http import HttpResponseClientRedirect
 
-from .models import LessonProgress, QuizCompletion, QuizResponse
+from .forms import SearchForm
+from .models import LessonProgress, QuizCompletion
 from .services import (
+    QuizAttempt,
+    get_curriculum_version,
     get_user_progress_summary,
     load_lesson,
     load_quiz,
+    search_curriculum,
+    update_learning_progress,
 )
 
 
@@ -24,6 +33,18 @@ def learning_path(request):
     return render(request, "education/path.html", {"summary": summary})
 
 
+@login_required
+def search(request):
+    """HTMX GET: typeahead results over lessons and the glossary."""
+    form = SearchForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest()
+
+    query = form.cleaned_data["q"]
+    results = search_curriculum(query, _lang()) if query else []
+    return render(request, "education/partials/search_results.html", {"query": query, "results": results})
+
+
 @login_required
 def lesson_detail(request, lesson_id):
     """Render a single lesson."""
@@ -63,6 +84,7 @@ def mark_lesson_complete(request, lesson_id):
         is_completed = False
     else:
         is_completed = True
+    update_learning_progress(request.user, lesson_id, completed=is_completed)
 
     return render(
         request,
@@ -73,7 +95,7 @@ def mark_lesson_complete(request, lesson_id):
 
 @login_required
 def quiz_start(request, lesson_id):
-    """Quiz shell page — clears previous responses for a fresh attempt."""
+    """Quiz shell page — starts a fresh attempt."""
     lang = _lang()
     quiz = load_quiz(lesson_id, lang)
     if quiz is None:
@@ -81,9 +103,7 @@ def quiz_start(request, lesson_id):
 
     lesson = load_lesson(lesson_id, lang)
 
-    # Clear previous responses for fresh attempt
-    QuizResponse.objects.filter(user=request.user, lesson_id=lesson_id).delete()
-    QuizCompletion.objects.filter(user=request.user, lesson_id=lesson_id).delete()
+    QuizAttempt.start(request.user, lesson_id)
 
     question = quiz["questions"][0]
     total = len(quiz["questions"])
@@ -97,6 +117,7 @@ def quiz_start(request, lesson_id):
             "question": question,
             "step": 1,
             "total": total,
+            "curriculum_version": get_curriculum_version(lang),
         },
     )
 
@@ -120,14 +141,12 @@ def quiz_step(request, lesson_id, step):
 
     if request.method == "POST":
         choice_id = request.POST.get("choice")
+        if choice_id not in {choice["id"] for choice in question["choices"]}:
+            # Keeps the feedback fragment cache keyed on known choices only
+            choice_id = None
         is_correct = choice_id == question["answer"]
 
-        QuizResponse.objects.update_or_create(
-            user=request.user,
-            lesson_id=lesson_id,
-            question_id=question["id"],
-            defaults={"choice_id": choice_id or "", "is_correct": is_correct},
-        )
+        QuizAttempt.load(request.user, lesson_id).answer(question["id"], choice_id, is_correct)
 
         return render(
             request,
@@ -139,6 +158,7 @@ def quiz_step(request, lesson_id, step):
                 "is_correct": is_correct,
                 "step": step,
                 "total": total,
+                "curriculum_version": get_curriculum_version(lang),
             },
         )
 
@@ -151,6 +171,7 @@ def quiz_step(request, lesson_id, step):
             "question": question,
             "step": step,
             "total": total,
+            "curriculum_version": get_curriculum_version(lang),
         },
     )
 
@@ -177,21 +198,17 @@ def quiz_next(request, lesson_id, step):
                 "question": question,
                 "step": next_step,
                 "total": total,
+                "curriculum_version": get_curriculum_version(lang),
             },
         )
 
-    # Quiz complete — calculate score
-    responses = QuizResponse.objects.filter(user=request.user, lesson_id=lesson_id)
-    score = responses.filter(is_correct=True).count()
-
-    QuizCompletion.objects.update_or_create(
-        user=request.user,
-        lesson_id=lesson_id,
-        defaults={"score": score, "total": total},
-    )
-
-    # Auto-mark lesson as complete
-    LessonProgress.objects.get_or_create(user=request.user, lesson_id=lesson_id)
+    # Quiz complete — save the attempt and auto-mark the lesson as complete
+    score = QuizAttempt.load(request.user, lesson_id).finish(total)
+    if score is None:
+        messages.warning(request, _("Your quiz session expired. Please start the quiz again."))
+        url = reverse("education:quiz_start", args=[lesson_id])
+        # Leave the swapped-in fragment for the whole quiz page
+        return HttpResponseClientRedirect(url) if request.htmx else redirect(url)
 
     percentage = round(score / total * 100) if total > 0 else 0
 
@@ -0,0 +1,11 @@
+from django.contrib import admin
+
+from .models import Job
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ["kind", "user", "status", "created_at", "finished_at"]
+    list_filter = ["status", "kind"]
+    search_fields = ["kind", "user__email"]
+    readonly_fields = ["result", "error"]
@@ -0,0 +1,231 @@
+"""Bounded process pool for CPU-heavy numeric work.
+
+Gunicorn runs each web worker with a handful of threads; NumPy-heavy code in
+a request thread holds the GIL and stalls every other request on that
+worker. Work submitted here runs in a small per-worker pool of spawned
+processes instead. Job state is kept on the Job model so polls can land on
+any web worker.
+
+Each job gets a timer for its deadline. A job still queued then is
+dropped; one still running has its process killed by restarting the pool,
+so a runaway job can't hold the pool past JOBS_TIMEOUT.
+"""
+
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import wait as wait_futures
+from concurrent.futures.process import BrokenProcessPool
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connections
+from django.utils import timezone
+
+from .models import Job
+
+# Finished jobs are purged on submit once they are this old
+JOB_RETENTION = timedelta(days=1)
+
+_executor = None
+_inflight = {}
+_lock = threading.Lock()
+
+
+class JobQueueFull(Exception):
+    """Raised when this worker already has JOBS_MAX_PENDING jobs in flight."""
+
+
+def _init_worker():
+    import django
+
+    django.setup()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        # Spawned, not forked: forking a threaded gunicorn worker can copy held locks
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.JOBS_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+        )
+    return _executor
+
+
+def _finish(job_id, status, **fields):
+    """Record the outcome unless the job was already cancelled or timed out."""
+    return Job.objects.filter(pk=job_id, status__in=Job.ACTIVE_STATUSES).update(
+        status=status, finished_at=timezone.now(), **fields
+    )
+
+
+def _execute(job_id, func, args):
+    """Claim the job, run it and record the outcome."""
+    claimed = Job.objects.filter(pk=job_id, status=Job.PENDING, deadline__gt=timezone.now()).update(status=Job.RUNNING)
+    if not claimed:
+        # Cancelled (left as is) or expired while queued
+        _finish(job_id, Job.FAILED, error="Timed out waiting for a free worker.")
+        return
+    try:
+        result = func(*args)
+    except Exception as exc:
+        _finish(job_id, Job.FAILED, error=f"{type(exc).__name__}: {exc}")
+    else:
+        _finish(job_id, Job.SUCCESS, result=result)
+
+
+def _run_in_pool(job_id, func, args):
+    """Pool entry point: _execute with request-style connection handling."""
+    close_old_connections()
+    try:
+        _execute(job_id, func, args)
+    finally:
+        close_old_connections()
+
+
+def _release(job_id):
+    with _lock:
+        _inflight.pop(job_id, None)
+
+
+def _pool_processes(executor):
+    """The pool's worker processes, or none if they can't be found.
+
+    ProcessPoolExecutor has no public way to stop a call that is running,
+    so this reads its private ``_processes`` mapping (None once the pool is
+    shut down). PoolProcessesTest fails if a Python release renames it;
+    until then a timed-out job's process would only be left to finish.
+    """
+    return list((getattr(executor, "_processes", None) or {}).values())
+
+
+def _expire(job_id):
+    """Stop a job of this worker that is still in the pool at its deadline.
+
+    A running job's process can only be stopped by killing the pool, which
+    also fails every other job in it; the next submit starts a fresh pool.
+    """
+    global _executor
+    with _lock:
+        future = _inflight.get(job_id)
+        if future is None or future.done():
+            return
+        if future.cancel():
+            stopped, others = None, []
+        else:
+            stopped, _executor = _executor, None
+            others = [other for other in _inflight if other != job_id]
+
+    if future.cancelled():
+        _finish(job_id, Job.FAILED, error="Timed out waiting for a free worker.")
+        return
+    if stopped is not None:
+        for process in _pool_processes(stopped):
+            process.terminate()
+        stopped.shutdown(wait=False, cancel_futures=True)
+    _finish(job_id, Job.FAILED, error="Timed out while running.")
+    for other in others:
+        _finish(other, Job.FAILED, error="Stopped when the worker pool was restarted.")
+
+
+def _on_deadline(job_id):
+    try:
+        _expire(job_id)
+    finally:
+        # Timer threads don't outlive the call; neither should their connections
+        connections.close_all()
+
+
+def _watch(job_id, future, timeout):
+    """Expire the job after ``timeout`` seconds unless it finishes first."""
+    timer = threading.Timer(timeout, _on_deadline, [job_id])
+    timer.daemon = True
+    timer.start()
+
+    def done(_):
+        timer.cancel()
+        _release(job_id)
+
+    future.add_done_callback(done)
+
+
+def submit_job(user, func, args=(), *, template, timeout=None):
+    """Queue ``func(*args)`` in the process pool and return its Job.
+
+    func must be a module-level function and its result JSON-serializable;
+    on success the result is used as the context for ``template``. Raises
+    JobQueueFull when this worker is at capacity, so callers can shed load
+    instead of piling up requests behind the pool.
+    """
+    with _lock:
+        if len(_inflight) >= settings.JOBS_MAX_PENDING:
+            raise JobQueueFull
+
+    now = timezone.now()
+    timeout = timeout or settings.JOBS_TIMEOUT
+    Job.objects.filter(created_at__lt=now - JOB_RETENTION).delete()
+    job = Job.objects.create(
+        user=user,
+        kind=f"{func.__module__}.{func.__qualname__}",
+        template=template,
+        deadline=now + timedelta(seconds=timeout),
+    )
+
+    if settings.JOBS_EAGER:
+        _execute(job.pk, func, args)
+        job.refresh_from_db()
+        return job
+
+    global _executor
+    with _lock:
+        try:
+            future = _get_executor().submit(_run_in_pool, job.pk, func, args)
+        except BrokenProcessPool:
+            # A pool process died (e.g. OOM); start a fresh pool
+            _executor = None
+            future = _get_executor().submit(_run_in_pool, job.pk, func, args)
+        _inflight[job.pk] = future
+    _watch(job.pk, future, timeout)
+    return job
+
+
+def get_job(user, job_id):
+    """Fetch the user's job, failing it first if it ran past its deadline."""
+    job = Job.objects.get(pk=job_id, user=user)
+    if job.is_active and job.deadline <= timezone.now():
+        with _lock:
+            future = _inflight.get(job.pk)
+        if future is not None:
+            future.cancel()
+        _finish(job.pk, Job.FAILED, error="Timed out while running.")
+        job.refresh_from_db()
+    return job
+
+
+def wait_for_job(job, timeout):
+    """Block up to ``timeout`` seconds for a job submitted by this worker."""
+    with _lock:
+        future = _inflight.get(job.pk)
+    if future is not None:
+        wait_futures([future], timeout=timeout)
+    job.refresh_from_db()
+    return job
+
+
+def cancel_job(user, job_id):
+    """Cancel a job that hasn't finished.
+
+    A job still queued here is dropped from the pool; one already running
+    keeps its process busy until it returns or its deadline timer stops the
+    pool, but its result is discarded.
+    """
+    job = Job.objects.get(pk=job_id, user=user)
+    with _lock:
+        future = _inflight.get(job.pk)
+    if future is not None:
+        future.cancel()
+    _finish(job.pk, Job.CANCELLED)
+    job.refresh_from_db()
+    return job
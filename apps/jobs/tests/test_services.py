@@ -0,0 +1,170 @@
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+
+from apps.jobs import services
+from apps.jobs.models import Job
+from apps.jobs.services import JobQueueFull, _execute, _expire, _pool_processes, cancel_job, get_job, submit_job
+
+User = get_user_model()
+
+
+def add(a, b):
+    return {"total": a + b}
+
+
+def explode():
+    raise ValueError("boom")
+
+
+class SubmitJobTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+
+    def test_eager_success(self):
+        job = submit_job(self.user, add, (2, 3), template="jobs/result.html")
+        assert job.status == Job.SUCCESS
+        assert job.result == {"total": 5}
+        assert job.kind == "apps.jobs.tests.test_services.add"
+        assert job.finished_at is not None
+
+    def test_eager_failure(self):
+        job = submit_job(self.user, explode, template="jobs/result.html")
+        assert job.status == Job.FAILED
+        assert job.error == "ValueError: boom"
+
+    @override_settings(JOBS_MAX_PENDING=0)
+    def test_rejects_when_full(self):
+        with self.assertRaises(JobQueueFull):
+            submit_job(self.user, add, (1, 1), template="jobs/result.html")
+        assert not Job.objects.exists()
+
+    def test_purges_old_jobs(self):
+        old = submit_job(self.user, add, (1, 1), template="jobs/result.html")
+        Job.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=2))
+        submit_job(self.user, add, (1, 1), template="jobs/result.html")
+        assert not Job.objects.filter(pk=old.pk).exists()
+
+
+class JobLifecycleTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.job = Job.objects.create(
+            user=self.user,
+            kind="test",
+            template="jobs/result.html",
+            deadline=timezone.now() + timedelta(seconds=30),
+        )
+
+    def test_expired_in_queue_is_not_run(self):
+        Job.objects.filter(pk=self.job.pk).update(deadline=timezone.now() - timedelta(seconds=1))
+        _execute(self.job.pk, add, (1, 2))
+        self.job.refresh_from_db()
+        assert self.job.status == Job.FAILED
+        assert self.job.result is None
+
+    def test_poll_fails_overdue_job(self):
+        Job.objects.filter(pk=self.job.pk).update(status=Job.RUNNING, deadline=timezone.now())
+        job = get_job(self.user, self.job.pk)
+        assert job.status == Job.FAILED
+        assert job.error == "Timed out while running."
+
+    def test_cancelled_job_result_is_discarded(self):
+        cancel_job(self.user, self.job.pk)
+        _execute(self.job.pk, add, (1, 2))
+        self.job.refresh_from_db()
+        assert self.job.status == Job.CANCELLED
+        assert self.job.result is None
+
+    def test_cancel_does_not_touch_finished_job(self):
+        _execute(self.job.pk, add, (1, 2))
+        assert cancel_job(self.user, self.job.pk).status == Job.SUCCESS
+
+    def test_other_users_job(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        with self.assertRaises(Job.DoesNotExist):
+            get_job(other, self.job.pk)
+
+
+class FakeProcess:
+    def __init__(self):
+        self.terminated = False
+
+    def terminate(self):
+        self.terminated = True
+
+
+class FakeExecutor:
+    def __init__(self):
+        self._processes = {1: FakeProcess()}
+        self.shut_down = False
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+class DeadlineTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.executor = FakeExecutor()
+        services._executor = self.executor
+        self.addCleanup(setattr, services, "_executor", None)
+        self.addCleanup(services._inflight.clear)
+
+    def _job(self, status=Job.PENDING):
+        job = Job.objects.create(
+            user=self.user, kind="test", template="jobs/result.html", status=status, deadline=timezone.now()
+        )
+        future = Future()
+        if status == Job.RUNNING:
+            future.set_running_or_notify_cancel()
+        services._inflight[job.pk] = future
+        return job, future
+
+    def test_queued_job_is_dropped(self):
+        job, future = self._job()
+        _expire(job.pk)
+        assert future.cancelled()
+        assert services._executor is self.executor
+        job.refresh_from_db()
+        assert job.status == Job.FAILED
+        assert job.error == "Timed out waiting for a free worker."
+
+    def test_running_job_restarts_the_pool(self):
+        job, _future = self._job(Job.RUNNING)
+        other, _ = self._job(Job.RUNNING)
+        _expire(job.pk)
+        assert self.executor._processes[1].terminated
+        assert self.executor.shut_down
+        assert services._executor is None
+        job.refresh_from_db()
+        other.refresh_from_db()
+        assert job.error == "Timed out while running."
+        assert other.status == Job.FAILED
+
+    def test_finished_job_is_left_alone(self):
+        job, future = self._job(Job.RUNNING)
+        future.set_result(None)
+        Job.objects.filter(pk=job.pk).update(status=Job.SUCCESS)
+        _expire(job.pk)
+        assert services._executor is self.executor
+        job.refresh_from_db()
+        assert job.status == Job.SUCCESS
+
+
+class PoolProcessesTest(SimpleTestCase):
+    def test_finds_the_workers_of_a_real_pool(self):
+        # _expire relies on this to stop a running job; a Python release
+        # that renames ProcessPoolExecutor's internals must fail here
+        executor = ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context("spawn"))
+        try:
+            pid = executor.submit(os.getpid).result(timeout=30)
+            assert [process.pid for process in _pool_processes(executor)] == [pid]
+        finally:
+            executor.shutdown()
+        assert _pool_processes(executor) == []
@@ -0,0 +1,53 @@
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.jobs.models import Job
+
+User = get_user_model()
+
+
+class JobViewTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(email="test@example.com", password="testpass123")
+        self.job = Job.objects.create(
+            user=self.user,
+            kind="test",
+            template="jobs/partials/queue_full.html",
+            deadline=timezone.now() + timedelta(seconds=30),
+        )
+        self.url = f"/jobs/{self.job.pk}/"
+
+    def test_pending_job_polls(self):
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+        self.assertTemplateUsed(response, "jobs/partials/job_status.html")
+        self.assertContains(response, 'hx-trigger="every 1s"')
+
+    def test_finished_job_renders_its_template(self):
+        Job.objects.filter(pk=self.job.pk).update(status=Job.SUCCESS, result={"retry_after": 7})
+        response = self.client.get(self.url)
+        self.assertTemplateUsed(response, "jobs/partials/queue_full.html")
+        self.assertContains(response, "delay:7s")
+
+    def test_failed_job(self):
+        Job.objects.filter(pk=self.job.pk).update(status=Job.FAILED, error="ValueError: boom")
+        response = self.client.get(self.url)
+        self.assertNotContains(response, "hx-trigger")
+        self.assertNotContains(response, "boom")
+
+    def test_cancel(self):
+        assert self.client.get(f"{self.url}cancel/").status_code == 405
+        response = self.client.post(f"{self.url}cancel/")
+        assert response.status_code == 200
+        self.job.refresh_from_db()
+        assert self.job.status == Job.CANCELLED
+
+    def test_other_users_job_404(self):
+        User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        self.client.login(email="other@example.com", password="testpass123")
+        assert self.client.get(self.url).status_code == 404
+        assert self.client.post(f"{self.url}cancel/").status_code == 404
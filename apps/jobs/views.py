@@ -0,0 +1,45 @@
+from django.contrib.auth.decorators import login_required
+from django.http import Http404
+from django.shortcuts import render
+from django.views.decorators.http import require_POST
+
+from .models import Job
+from .services import cancel_job, get_job
+
+# How often the pending partial polls, in seconds
+POLL_INTERVAL = 1
+
+
+def render_job(request, job):
+    """Render a job: its result template once done, a polling partial until then."""
+    if job.status == Job.SUCCESS:
+        return render(request, job.template, job.result)
+    return render(request, "jobs/partials/job_status.html", {"job": job, "poll_interval": POLL_INTERVAL})
+
+
+def render_queue_full(request):
+    """503 partial for when the pool is saturated; HTMX swaps it in and retries."""
+    response = render(request, "jobs/partials/queue_full.html", {"retry_after": POLL_INTERVAL * 2}, status=503)
+    response["Retry-After"] = str(POLL_INTERVAL * 2)
+    return response
+
+
+@login_required
+def job_status(request, job_id):
+    """HTMX GET: poll a job."""
+    try:
+        job = get_job(request.user, job_id)
+    except Job.DoesNotExist:
+        raise Http404 from None
+    return render_job(request, job)
+
+
+@login_required
+@require_POST
+def job_cancel(request, job_id):
+    """HTMX POST: cancel a job."""
+    try:
+        job = cancel_job(request.user, job_id)
+    except Job.DoesNotExist:
+        raise Http404 from None
+    return render_job(request, job)
@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Asset
+from .models import Asset, FxRate, PriceBar
 
 
 @admin.register(Asset)
@@ -8,3 +8,19 @@ class AssetAdmin(admin.ModelAdmin):
     list_display = ["ticker", "name", "asset_type", "currency", "current_price"]
     list_filter = ["asset_type", "currency", "geography"]
     search_fields = ["ticker", "name"]
+
+
+@admin.register(PriceBar)
+class PriceBarAdmin(admin.ModelAdmin):
+    list_display = ["asset", "date", "open", "high", "low", "close", "volume"]
+    list_filter = ["asset__asset_type"]
+    search_fields = ["asset__ticker"]
+    date_hierarchy = "date"
+    raw_id_fields = ["asset"]
+
+
+@admin.register(FxRate)
+class FxRateAdmin(admin.ModelAdmin):
+    list_display = ["currency", "date", "rate"]
+    list_filter = ["currency"]
+    date_hierarchy = "date"
@@ -0,0 +1,57 @@
+import csv
+from datetime import date
+from decimal import Decimal
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Q
+
+from apps.market_data.models import Asset, FxRate
+from apps.market_data.services import PIVOT_CURRENCY, ingest_fx_rates
+from apps.portfolio.models import Portfolio
+from apps.portfolio.services import refresh_portfolio_valuations
+
+
+class Command(BaseCommand):
+    help = (
+        "Load daily exchange rates (date, currency, rate in CAD per unit) from CSV files "
+        "and revalue the portfolios they affect."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", type=Path)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rates upserted per batch.")
+
+    def handle(self, *args, paths, chunk_size, **options):
+        known = {code for code, _label in Asset.CURRENCY_CHOICES} - {PIVOT_CURRENCY}
+        currencies = set()
+        skipped = set()
+        rates = []
+
+        for path in paths:
+            if not path.exists():
+                raise CommandError(f"File not found: {path}")
+            with open(path, newline="", encoding="utf-8") as f:
+                for r in csv.DictReader(f):
+                    currency = r["currency"].strip().upper()
+                    if currency not in known:
+                        skipped.add(currency)
+                        continue
+                    rates.append(
+                        FxRate(currency=currency, date=date.fromisoformat(r["date"][:10]), rate=Decimal(r["rate"]))
+                    )
+                    currencies.add(currency)
+
+        with transaction.atomic():
+            written = ingest_fx_rates(rates, batch_size=chunk_size)
+            # Portfolios holding one of these currencies, or valued in one
+            affected = Portfolio.objects.filter(
+                Q(holdings__asset__currency__in=currencies) | Q(user__profile__base_currency__in=currencies)
+            ).values_list("pk", flat=True)
+            refreshed = refresh_portfolio_valuations(affected.distinct())
+
+        if skipped:
+            self.stdout.write(self.style.WARNING(f"  Skipped currencies: {', '.join(sorted(skipped))}"))
+        self.stdout.write(f"  {len(refreshed)} portfolio valuations refreshed.")
+        self.stdout.write(self.style.SUCCESS(f"Done — {written} exchange rates."))
@@ -0,0 +1,106 @@
+import csv
+import time
+from datetime import date
+from itertools import islice
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from apps.market_data.models import Asset, PriceBar
+from apps.market_data.services import ingest_price_bars, update_current_prices, warm_price_series
+from apps.portfolio.models import Holding, Transaction
+from apps.portfolio.services import refresh_portfolio_valuations
+
+PARQUET_SUFFIXES = {".parquet", ".pq"}
+
+
+def _float(value):
+    if value is None or value == "":
+        return None
+    return float(value)
+
+
+def _date(value):
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+
+def _csv_chunks(path, chunk_size):
+    with open(path, newline="", encoding="utf-8") as f:
+        reader = csv.DictReader(f)
+        while chunk := list(islice(reader, chunk_size)):
+            yield chunk
+
+
+def _parquet_chunks(path, chunk_size):
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as exc:
+        raise CommandError("Parquet input requires pyarrow (pip install pyarrow).") from exc
+
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=chunk_size):
+        yield batch.to_pylist()
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream daily quotes (ticker, date, open, high, low, close, volume) from CSV or Parquet files "
+        "into the price history and update current prices."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", type=Path)
+        parser.add_argument("--chunk-size", type=int, default=5000, help="Rows read and upserted per batch.")
+
+    def handle(self, *args, paths, chunk_size, **options):
+        started = time.perf_counter()
+        asset_ids = {}
+        unknown = set()
+        touched = set()
+        rows = 0
+
+        for path in paths:
+            if not path.exists():
+                raise CommandError(f"File not found: {path}")
+            chunks = _parquet_chunks if path.suffix.lower() in PARQUET_SUFFIXES else _csv_chunks
+
+            for chunk in chunks(path, chunk_size):
+                new_tickers = {r["ticker"] for r in chunk} - asset_ids.keys() - unknown
+                if new_tickers:
+                    asset_ids.update(Asset.objects.filter(ticker__in=new_tickers).values_list("ticker", "pk"))
+                    unknown |= new_tickers - asset_ids.keys()
+
+                bars = []
+                for r in chunk:
+                    asset_id = asset_ids.get(r["ticker"])
+                    if asset_id is None:
+                        continue
+                    bars.append(
+                        PriceBar(
+                            asset_id=asset_id,
+                            date=_date(r["date"]),
+                            open=_float(r.get("open")),
+                            high=_float(r.get("high")),
+                            low=_float(r.get("low")),
+                            close=float(r["close"]),
+                            volume=int(_float(r.get("volume")) or 0),
+                        )
+                    )
+                    touched.add(asset_id)
+
+                rows += ingest_price_bars(bars, batch_size=chunk_size)
+
+        with transaction.atomic():
+            update_current_prices(touched)
+            portfolio_ids = Holding.objects.filter(asset_id__in=touched).values_list("portfolio_id", flat=True)
+            refreshed = refresh_portfolio_valuations(portfolio_ids.distinct())
+        # So the first performance chart after the update doesn't read the history
+        traded = Transaction.objects.filter(asset_id__in=touched).values_list("asset_id", flat=True)
+        warm_price_series(traded.distinct())
+
+        elapsed = time.perf_counter() - started
+        rate = rows / elapsed if elapsed else 0
+        if unknown:
+            self.stdout.write(self.style.WARNING(f"  Skipped unknown tickers: {', '.join(sorted(unknown))}"))
+        self.stdout.write(f"  {len(touched)} assets repriced, {len(refreshed)} portfolio valuations refreshed.")
+        self.stdout.write(self.style.SUCCESS(f"Done — {rows} bars in {elapsed:.2f}s ({rate:,.0f} rows/sec)."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('market_data', '0003_fxrate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='asset',
+            name='prices_updated_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
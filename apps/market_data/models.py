@@ -25,6 +25,8 @@ class Asset(models.Model):
     current_price = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     previous_close = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     description = models.TextField(blank=True, default="")
+    # Set by ingest_price_bars; versions the cached price series
+    prices_updated_at = models.DateTimeField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name = _("asset")
@@ -45,3 +47,56 @@ class Asset(models.Model):
         if self.previous_close:
             return (self.daily_change / self.previous_close) * 100
         return 0
+
+
+class PriceBar(models.Model):
+    """Daily OHLC bar for an asset.
+
+    Prices are stored as double precision: history only feeds analytics
+    (charts, risk, simulations), never displayed money amounts, and fixed
+    8-byte columns keep decades of bars for hundreds of tickers compact.
+    The (asset, date) unique index serves every range query, so the
+    foreign key does not get an index of its own.
+    """
+
+    asset = models.ForeignKey(
+        Asset,
+        on_delete=models.CASCADE,
+        related_name="price_bars",
+        db_index=False,
+    )
+    date = models.DateField()
+    open = models.FloatField(null=True, blank=True)
+    high = models.FloatField(null=True, blank=True)
+    low = models.FloatField(null=True, blank=True)
+    close = models.FloatField()
+    volume = models.BigIntegerField(default=0)
+
+    class Meta:
+        verbose_name = _("price bar")
+        verbose_name_plural = _("price bars")
+        unique_together = [("asset", "date")]
+
+    def __str__(self):
+        return f"{self.asset_id} {self.date}: {self.close}"
+
+
+class FxRate(models.Model):
+    """Daily exchange rate, in Canadian dollars per unit of ``currency``.
+
+    Every rate is quoted against CAD; converting between two other
+    currencies goes through it (see services.get_conversion_rates). The
+    (currency, date) unique index serves the latest-rate lookups.
+    """
+
+    currency = models.CharField(max_length=3, choices=Asset.CURRENCY_CHOICES)
+    date = models.DateField()
+    rate = models.DecimalField(max_digits=12, decimal_places=6)
+
+    class Meta:
+        verbose_name = _("exchange rate")
+        verbose_name_plural = _("exchange rates")
+        unique_together = [("currency", "date")]
+
+    def __str__(self):
+        return f"{self.currency}/CAD {self.date}: {self.rate}"
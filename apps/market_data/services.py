@@ -1 +1,285 @@
-# Market data services
+from decimal import Decimal
+from itertools import islice
+
+import numpy as np
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import CharField, F, Window
+from django.db.models.functions import Cast, RowNumber
+from django.utils import timezone
+
+from apps.metrics.services import instrumented
+
+from .models import Asset, FxRate, PriceBar
+
+PRICE_BAR_FIELDS = ["open", "high", "low", "close", "volume"]
+
+# FxRate.rate is quoted in this currency
+PIVOT_CURRENCY = "CAD"
+
+# Conversion rates are ints of 10**-RATE_PLACES: stored rates have six
+# places, the extra ones keep cross rates (1 / rate) exact to well under a
+# cent on any portfolio
+RATE_PLACES = 12
+RATE_SCALE = 10**RATE_PLACES
+
+# Cached rates are keyed by as-of date and by the last FX ingest, which
+# moves the key forward; the TTL only evicts dates nobody asks for.
+FX_CACHE_TIMEOUT = 60 * 60 * 24
+FX_GENERATION_KEY = "market_data:fx:generation"
+
+# Cached price series are keyed by the asset's prices_updated_at, which each
+# ingest moves forward; the TTL only evicts series nobody asks for.
+PRICE_SERIES_CACHE_TIMEOUT = 60 * 60 * 24 * 2
+
+
+class MissingExchangeRate(LookupError):
+    pass
+
+
+def ingest_price_bars(bars, batch_size=5000):
+    """Upsert daily bars in batches.
+
+    bars: iterable of unsaved PriceBar instances (consumed lazily, so
+    generators over large files are fine). Existing (asset, date) rows are
+    overwritten, and the assets' prices_updated_at is moved forward so
+    their cached series are read again. Returns the number of bars written.
+    """
+    bars = iter(bars)
+    written = 0
+    touched = set()
+    while batch := list(islice(bars, batch_size)):
+        PriceBar.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=["asset", "date"],
+            update_fields=PRICE_BAR_FIELDS,
+        )
+        written += len(batch)
+        touched.update(bar.asset_id for bar in batch)
+    if touched:
+        Asset.objects.filter(pk__in=touched).update(prices_updated_at=timezone.now())
+    return written
+
+
+def update_current_prices(asset_ids):
+    """Set current_price/previous_close from the two latest stored bars.
+
+    One windowed query reads the latest two closes per asset and one upsert
+    writes them back, so it stays cheap for a full-market file. Assets
+    without bars are left untouched. Returns the updated Asset instances.
+    """
+    latest = (
+        PriceBar.objects.filter(asset_id__in=asset_ids)
+        .annotate(rank=Window(RowNumber(), partition_by=F("asset_id"), order_by=F("date").desc()))
+        .filter(rank__lte=2)
+        .values_list("asset_id", "rank", "close")
+    )
+    closes = {}
+    for asset_id, rank, close in latest:
+        closes.setdefault(asset_id, [None, None])[rank - 1] = Decimal(str(close)).quantize(Decimal("0.01"))
+
+    tickers = dict(Asset.objects.filter(pk__in=closes).values_list("pk", "ticker"))
+    assets = [
+        Asset(pk=asset_id, ticker=tickers[asset_id], current_price=current, previous_close=previous or current)
+        for asset_id, (current, previous) in closes.items()
+    ]
+    Asset.objects.bulk_create(
+        assets,
+        update_conflicts=True,
+        unique_fields=["ticker"],
+        update_fields=["current_price", "previous_close"],
+    )
+    return assets
+
+
+def _invalidate_fx_cache():
+    cache.set(FX_GENERATION_KEY, timezone.now().timestamp(), None)
+
+
+def ingest_fx_rates(rates, batch_size=5000):
+    """Upsert daily exchange rates in batches, like ingest_price_bars.
+
+    rates: iterable of unsaved FxRate instances. Cached conversion rates
+    are invalidated now, so valuations refreshed in the same transaction
+    see the new rates, and again on commit, dropping anything cached from
+    the old rows meanwhile. Returns the number of rates written.
+    """
+    rates = iter(rates)
+    written = 0
+    while batch := list(islice(rates, batch_size)):
+        FxRate.objects.bulk_create(
+            batch,
+            update_conflicts=True,
+            unique_fields=["currency", "date"],
+            update_fields=["rate"],
+        )
+        written += len(batch)
+    _invalidate_fx_cache()
+    transaction.on_commit(_invalidate_fx_cache)
+    return written
+
+
+def _pivot_rates(as_of):
+    """{currency: CAD per unit} from the latest rate on or before ``as_of``: one query."""
+    latest = (
+        FxRate.objects.filter(date__lte=as_of)
+        .annotate(rank=Window(RowNumber(), partition_by=F("currency"), order_by=F("date").desc()))
+        .filter(rank=1)
+        .values_list("currency", "rate")
+    )
+    return {PIVOT_CURRENCY: Decimal(1), **dict(latest)}
+
+
+def get_conversion_rates(base, currencies, as_of=None):
+    """Rates converting each of ``currencies`` into ``base``, as of a date.
+
+    Returns {currency: int}, each rate in units of 10**-RATE_PLACES (so
+    ``base`` itself maps to RATE_SCALE), from the latest stored rates on or
+    before ``as_of`` (today by default). The whole vector is cached per
+    base currency and date, so callers converting many amounts pay one
+    cache read. Raises MissingExchangeRate for a currency with no rate.
+    """
+    as_of = as_of or timezone.localdate()
+    generation = cache.get_or_set(FX_GENERATION_KEY, 0, None)
+
+    def build():
+        pivot = _pivot_rates(as_of)
+        if base not in pivot:
+            return {base: RATE_SCALE}
+        return {
+            currency: int((rate / pivot[base]).scaleb(RATE_PLACES).quantize(Decimal(1)))
+            for currency, rate in pivot.items()
+        }
+
+    rates = cache.get_or_set(f"market_data:fx:{generation}:{base}:{as_of.isoformat()}", build, FX_CACHE_TIMEOUT)
+    missing = set(currencies) - rates.keys()
+    if missing:
+        raise MissingExchangeRate(f"No {', '.join(sorted(missing))} to {base} exchange rate on or before {as_of}")
+    return {currency: rates[currency] for currency in currencies}
+
+
+def _bar_columns(asset_ids, start, end, field):
+    """Read (asset_id, date, value) columns as NumPy arrays.
+
+    Dates are selected as ISO text and parsed by NumPy in one call, which
+    is far cheaper than building a ``datetime.date`` per row.
+    """
+    qs = PriceBar.objects.filter(asset_id__in=asset_ids)
+    if start is not None:
+        qs = qs.filter(date__gte=start)
+    if end is not None:
+        qs = qs.filter(date__lte=end)
+    # Plain cursor rows: no converters or per-row iterable overhead apply to
+    # these int/text/float columns.
+    sql, params = qs.values_list("asset_id", Cast("date", output_field=CharField()), field).query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        rows = cursor.fetchall()
+    if not rows:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype="datetime64[D]"), np.empty(0)
+
+    ids, dates, values = zip(*rows, strict=True)
+    return (
+        np.array(ids, dtype=np.int64),
+        np.array(dates, dtype="datetime64[D]"),
+        np.array(values, dtype=np.float64),
+    )
+
+
+def forward_fill(matrix):
+    """Carry the last non-NaN value forward along each row.
+
+    Leading NaNs (before an asset's first bar) are left as NaN.
+    """
+    mask = np.isnan(matrix)
+    idx = np.where(mask, 0, np.arange(matrix.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    return matrix[np.arange(matrix.shape[0])[:, None], idx]
+
+
+def get_price_history(asset_id, start=None, end=None, field="close"):
+    """Return (dates, values) NumPy arrays for one asset, oldest first.
+
+    dates is datetime64[D], values is float64. No model instances are built.
+    """
+    _ids, dates, values = _bar_columns([asset_id], start, end, field)
+    order = np.argsort(dates)
+    return dates[order], values[order]
+
+
+@instrumented
+def get_price_matrix(asset_ids, start=None, end=None, field="close"):
+    """Return (dates, matrix) for several assets over a date range.
+
+    dates is the sorted union of trading days seen for any of the assets.
+    matrix has shape (len(asset_ids), len(dates)); row i holds asset_ids[i],
+    forward-filled over days it did not trade and NaN before its first bar.
+    """
+    asset_ids = np.asarray(list(asset_ids), dtype=np.int64)
+    return _assemble_matrix(asset_ids, *_bar_columns(asset_ids.tolist(), start, end, field))
+
+
+def _assemble_matrix(asset_ids, ids, raw_dates, values):
+    order = np.argsort(asset_ids)
+    asset_idx = order[np.searchsorted(asset_ids, ids, sorter=order)]
+    dates, date_idx = np.unique(raw_dates, return_inverse=True)
+
+    matrix = np.full((len(asset_ids), len(dates)), np.nan)
+    matrix[asset_idx, date_idx] = values
+    return dates, forward_fill(matrix)
+
+
+def _series_key(asset_id, stamp):
+    return f"market_data:series:{asset_id}:{stamp.timestamp() if stamp else 0}"
+
+
+def get_close_series(stamps):
+    """Full closing-price history of several assets, served from the cache.
+
+    stamps maps asset id to its prices_updated_at. Returns {asset_id:
+    (dates, closes)}, oldest first. Assets missing from the cache are read
+    in one query and cached.
+    """
+    keys = {asset_id: _series_key(asset_id, stamp) for asset_id, stamp in stamps.items()}
+    cached = cache.get_many(keys.values())
+    series = {asset_id: cached[key] for asset_id, key in keys.items() if key in cached}
+
+    missing = [asset_id for asset_id in keys if asset_id not in series]
+    if missing:
+        ids, dates, values = _bar_columns(missing, None, None, "close")
+        order = np.lexsort((dates, ids))
+        ids, dates, values = ids[order], dates[order], values[order]
+        bounds = np.searchsorted(ids, missing, side="left"), np.searchsorted(ids, missing, side="right")
+        fresh = {asset_id: (dates[lo:hi], values[lo:hi]) for asset_id, lo, hi in zip(missing, *bounds, strict=True)}
+        cache.set_many({keys[asset_id]: fresh[asset_id] for asset_id in missing}, PRICE_SERIES_CACHE_TIMEOUT)
+        series.update(fresh)
+    return series
+
+
+@instrumented
+def get_cached_price_matrix(stamps, start=None, end=None):
+    """get_price_matrix of closes for the assets in ``stamps``, built from cached series.
+
+    Each asset's history is forward-filled from before ``start``, so a
+    price set before the range still counts on its first days.
+    """
+    asset_ids = np.fromiter(stamps, dtype=np.int64, count=len(stamps))
+    series = get_close_series(stamps)
+    ids = np.repeat(asset_ids, [len(series[asset_id][0]) for asset_id in stamps])
+    raw_dates = np.concatenate([series[asset_id][0] for asset_id in stamps] or [np.empty(0, "datetime64[D]")])
+    values = np.concatenate([series[asset_id][1] for asset_id in stamps] or [np.empty(0)])
+    if end is not None:
+        keep = raw_dates <= np.datetime64(end, "D")
+        ids, raw_dates, values = ids[keep], raw_dates[keep], values[keep]
+
+    dates, matrix = _assemble_matrix(asset_ids, ids, raw_dates, values)
+    if start is not None:
+        first = np.searchsorted(dates, np.datetime64(start, "D"))
+        dates, matrix = dates[first:], matrix[:, first:]
+    return dates, matrix
+
+
+def warm_price_series(asset_ids):
+    """Cache the closing-price series of ``asset_ids``, e.g. right after an ingest."""
+    get_close_series(dict(Asset.objects.filter(pk__in=asset_ids).values_list("pk", "prices_updated_at")))
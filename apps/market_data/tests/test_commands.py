@@ -0,0 +1,141 @@
+from datetime import date
+from decimal import Decimal
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.accounts.models import UserProfile
+from apps.market_data.models import Asset, FxRate, PriceBar
+from apps.market_data.services import get_close_series
+from apps.portfolio.models import Holding, Portfolio, PortfolioValuation, Transaction
+
+User = get_user_model()
+
+CSV = """ticker,date,open,high,low,close,volume
+XEQT.TO,2024-01-03,28.40,28.60,28.30,28.55,1000
+XEQT.TO,2024-01-02,28.00,28.20,27.90,28.10,900
+RY.TO,2024-01-02,,,,144.80,
+UNKNOWN,2024-01-02,1,1,1,1,1
+RY.TO,2024-01-03,145.00,145.50,144.50,145.30,2000
+"""
+
+
+class IngestPricesCommandTest(TestCase):
+    def setUp(self):
+        self.xeqt = Asset.objects.create(ticker="XEQT.TO", name="XEQT", asset_type="etf", current_price=Decimal("1"))
+        self.ry = Asset.objects.create(ticker="RY.TO", name="RY", asset_type="stock", current_price=Decimal("1"))
+        self.tmp = TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "quotes.csv"
+        self.path.write_text(CSV, encoding="utf-8")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ingests_history_and_current_prices(self):
+        out = StringIO()
+        call_command("ingest_prices", str(self.path), "--chunk-size", "2", stdout=out)
+
+        assert PriceBar.objects.count() == 4
+        bar = PriceBar.objects.get(asset=self.ry, date=date(2024, 1, 2))
+        assert bar.open is None
+        assert bar.volume == 0
+
+        self.xeqt.refresh_from_db()
+        assert self.xeqt.current_price == Decimal("28.55")
+        assert self.xeqt.previous_close == Decimal("28.10")
+        assert self.xeqt.name == "XEQT"
+        assert "UNKNOWN" in out.getvalue()
+        assert "rows/sec" in out.getvalue()
+
+    def test_reingest_is_idempotent(self):
+        call_command("ingest_prices", str(self.path), stdout=StringIO())
+        call_command("ingest_prices", str(self.path), stdout=StringIO())
+        assert PriceBar.objects.count() == 4
+
+    def test_refreshes_portfolio_valuations(self):
+        user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        portfolio = Portfolio.objects.create(user=user, name="Test")
+        Holding.objects.create(portfolio=portfolio, asset=self.ry, quantity=Decimal("10"), average_cost=Decimal("100"))
+
+        call_command("ingest_prices", str(self.path), stdout=StringIO())
+
+        assert PortfolioValuation.objects.get(portfolio=portfolio).total_value == Decimal("1453")
+
+    def test_warms_traded_price_series(self):
+        cache.clear()
+        user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        portfolio = Portfolio.objects.create(user=user, name="Test")
+        Transaction.objects.create(
+            portfolio=portfolio,
+            asset=self.ry,
+            transaction_type="buy",
+            quantity=Decimal("1"),
+            price=Decimal("100"),
+            executed_at=timezone.now(),
+        )
+
+        call_command("ingest_prices", str(self.path), stdout=StringIO())
+
+        stamps = dict(Asset.objects.filter(pk=self.ry.pk).values_list("pk", "prices_updated_at"))
+        with self.assertNumQueries(0):
+            closes = get_close_series(stamps)[self.ry.pk][1]
+        assert list(closes) == [144.80, 145.30]
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command("ingest_prices", str(Path(self.tmp.name) / "missing.csv"), stdout=StringIO())
+
+
+FX_CSV = """date,currency,rate
+2024-01-02,USD,1.3300
+2024-01-03,usd,1.3400
+2024-01-03,EUR,1.4600
+"""
+
+
+class IngestFxRatesCommandTest(TestCase):
+    def setUp(self):
+        self.tmp = TemporaryDirectory()
+        self.path = Path(self.tmp.name) / "fx.csv"
+        self.path.write_text(FX_CSV, encoding="utf-8")
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.portfolio = Portfolio.objects.create(user=self.user, name="Test")
+        spy = Asset.objects.create(
+            ticker="SPY", name="SPY", asset_type="etf", currency="USD", current_price=Decimal("500")
+        )
+        FxRate.objects.create(currency="USD", date=date(2024, 1, 1), rate=Decimal("1.2"))
+        Holding.objects.create(portfolio=self.portfolio, asset=spy, quantity=Decimal("2"), average_cost=Decimal("400"))
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_ingests_rates_and_refreshes_valuations(self):
+        assert PortfolioValuation.objects.get(portfolio=self.portfolio).total_value == Decimal("1200")
+        out = StringIO()
+        call_command("ingest_fx_rates", str(self.path), stdout=out)
+
+        assert FxRate.objects.count() == 3
+        assert FxRate.objects.get(date=date(2024, 1, 3)).rate == Decimal("1.34")
+        assert PortfolioValuation.objects.get(portfolio=self.portfolio).total_value == Decimal("1340")
+        assert "EUR" in out.getvalue()
+
+    def test_refreshes_portfolios_valued_in_the_currency(self):
+        UserProfile.objects.create(user=self.user, base_currency="USD")
+        cad = Asset.objects.create(ticker="RY.TO", name="RY", asset_type="stock", current_price=Decimal("134"))
+        other = Portfolio.objects.create(user=self.user, name="Other")
+        Holding.objects.create(portfolio=other, asset=cad, quantity=Decimal("1"), average_cost=Decimal("100"))
+
+        call_command("ingest_fx_rates", str(self.path), stdout=StringIO())
+
+        valuation = PortfolioValuation.objects.get(portfolio=other)
+        assert (valuation.currency, valuation.total_value) == ("USD", Decimal("100"))
+
+    def test_missing_file(self):
+        with self.assertRaises(CommandError):
+            call_command("ingest_fx_rates", str(Path(self.tmp.name) / "missing.csv"), stdout=StringIO())
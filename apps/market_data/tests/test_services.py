@@ -0,0 +1,153 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.market_data.models import Asset, FxRate, PriceBar
+from apps.market_data.services import (
+    MissingExchangeRate,
+    forward_fill,
+    get_cached_price_matrix,
+    get_conversion_rates,
+    get_price_history,
+    get_price_matrix,
+    ingest_fx_rates,
+    ingest_price_bars,
+    warm_price_series,
+)
+
+
+class PriceHistoryTest(TestCase):
+    def setUp(self):
+        self.xeqt = Asset.objects.create(ticker="XEQT.TO", name="XEQT", asset_type="etf", current_price=Decimal("30"))
+        self.ry = Asset.objects.create(ticker="RY.TO", name="RY", asset_type="stock", current_price=Decimal("100"))
+        ingest_price_bars(
+            [
+                PriceBar(asset=self.xeqt, date=date(2024, 1, 2), close=28.0),
+                PriceBar(asset=self.xeqt, date=date(2024, 1, 3), close=28.5),
+                PriceBar(asset=self.xeqt, date=date(2024, 1, 5), close=29.0),
+                PriceBar(asset=self.ry, date=date(2024, 1, 3), close=100.0),
+                PriceBar(asset=self.ry, date=date(2024, 1, 4), close=101.0),
+            ]
+        )
+
+    def test_ingest_upserts(self):
+        written = ingest_price_bars([PriceBar(asset=self.xeqt, date=date(2024, 1, 2), close=27.5, volume=10)])
+        assert written == 1
+        assert PriceBar.objects.count() == 5
+        bar = PriceBar.objects.get(asset=self.xeqt, date=date(2024, 1, 2))
+        assert bar.close == 27.5
+        assert bar.volume == 10
+
+    def test_ingest_batches(self):
+        bars = (PriceBar(asset=self.ry, date=date(2023, 1, 1 + i), close=90.0 + i) for i in range(7))
+        assert ingest_price_bars(bars, batch_size=3) == 7
+        assert PriceBar.objects.filter(asset=self.ry).count() == 9
+
+    def test_price_history_returns_arrays(self):
+        dates, closes = get_price_history(self.xeqt.pk, start=date(2024, 1, 3))
+        assert dates.dtype == np.dtype("datetime64[D]")
+        assert list(dates.astype(str)) == ["2024-01-03", "2024-01-05"]
+        np.testing.assert_array_equal(closes, [28.5, 29.0])
+
+    def test_price_matrix_aligns_and_forward_fills(self):
+        dates, matrix = get_price_matrix([self.xeqt.pk, self.ry.pk])
+        assert list(dates.astype(str)) == ["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]
+        np.testing.assert_array_equal(matrix[0], [28.0, 28.5, 28.5, 29.0])
+        np.testing.assert_array_equal(matrix[1], [np.nan, 100.0, 101.0, 101.0])
+
+    def test_price_matrix_single_query(self):
+        with self.assertNumQueries(1):
+            get_price_matrix([self.xeqt.pk, self.ry.pk], end=date(2024, 1, 3))
+
+    def test_price_matrix_empty(self):
+        dates, matrix = get_price_matrix([self.xeqt.pk], start=date(2030, 1, 1))
+        assert dates.size == 0
+        assert matrix.shape == (1, 0)
+
+
+class CachedPriceMatrixTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.xeqt = Asset.objects.create(ticker="XEQT.TO", name="XEQT", asset_type="etf")
+        self.ry = Asset.objects.create(ticker="RY.TO", name="RY", asset_type="stock")
+        ingest_price_bars(
+            [
+                PriceBar(asset=self.xeqt, date=date(2024, 1, 2), close=28.0),
+                PriceBar(asset=self.xeqt, date=date(2024, 1, 5), close=29.0),
+                PriceBar(asset=self.ry, date=date(2024, 1, 3), close=100.0),
+                PriceBar(asset=self.ry, date=date(2024, 1, 4), close=101.0),
+            ]
+        )
+
+    def _stamps(self):
+        return dict(Asset.objects.order_by("pk").values_list("pk", "prices_updated_at"))
+
+    def test_ingest_stamps_assets(self):
+        assert all(self._stamps().values())
+
+    def test_matches_price_matrix(self):
+        dates, matrix = get_cached_price_matrix(self._stamps())
+        expected_dates, expected = get_price_matrix([self.xeqt.pk, self.ry.pk])
+        np.testing.assert_array_equal(dates, expected_dates)
+        np.testing.assert_array_equal(matrix, expected)
+
+    def test_fills_from_before_start(self):
+        dates, matrix = get_cached_price_matrix(self._stamps(), start=date(2024, 1, 3), end=date(2024, 1, 4))
+        assert list(dates.astype(str)) == ["2024-01-03", "2024-01-04"]
+        np.testing.assert_array_equal(matrix, [[28.0, 28.0], [100.0, 101.0]])
+
+    def test_warmed_series_need_no_query(self):
+        warm_price_series([self.xeqt.pk, self.ry.pk])
+        stamps = self._stamps()
+        with self.assertNumQueries(0):
+            get_cached_price_matrix(stamps)
+
+    def test_ingest_moves_the_key(self):
+        get_cached_price_matrix(self._stamps())
+        ingest_price_bars([PriceBar(asset=self.ry, date=date(2024, 1, 5), close=102.0)])
+        _dates, matrix = get_cached_price_matrix(self._stamps())
+        assert matrix[1, -1] == 102.0
+
+
+class ForwardFillTest(TestCase):
+    def test_forward_fill(self):
+        matrix = np.array([[np.nan, 1.0, np.nan, 3.0], [2.0, np.nan, np.nan, np.nan]])
+        np.testing.assert_array_equal(forward_fill(matrix), [[np.nan, 1.0, 1.0, 3.0], [2.0, 2.0, 2.0, 2.0]])
+
+
+class ConversionRatesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        ingest_fx_rates(
+            [
+                FxRate(currency="USD", date=date(2024, 1, 2), rate=Decimal("1.330000")),
+                FxRate(currency="USD", date=date(2024, 1, 4), rate=Decimal("1.340000")),
+            ]
+        )
+
+    def test_latest_rate_on_or_before(self):
+        assert get_conversion_rates("CAD", ["USD", "CAD"], date(2024, 1, 3)) == {"USD": 133 * 10**10, "CAD": 10**12}
+        assert get_conversion_rates("CAD", ["USD"], date(2024, 1, 9)) == {"USD": 134 * 10**10}
+
+    def test_cross_rate(self):
+        # 1 / 1.34, rounded to twelve places
+        assert get_conversion_rates("USD", ["CAD", "USD"], date(2024, 1, 4)) == {"CAD": 746268656716, "USD": 10**12}
+
+    def test_missing_rate(self):
+        with self.assertRaises(MissingExchangeRate):
+            get_conversion_rates("CAD", ["USD"], date(2024, 1, 1))
+        assert get_conversion_rates("USD", ["USD"], date(2024, 1, 1)) == {"USD": 10**12}
+
+    def test_cached_per_date(self):
+        get_conversion_rates("CAD", ["USD"], date(2024, 1, 4))
+        with self.assertNumQueries(0):
+            assert get_conversion_rates("CAD", ["USD"], date(2024, 1, 4)) == {"USD": 134 * 10**10}
+
+    def test_ingest_invalidates_cache(self):
+        get_conversion_rates("CAD", ["USD"], date(2024, 1, 4))
+        ingest_fx_rates([FxRate(currency="USD", date=date(2024, 1, 4), rate=Decimal("1.350000"))])
+        assert FxRate.objects.count() == 2
+        assert get_conversion_rates("CAD", ["USD"], date(2024, 1, 4)) == {"USD": 135 * 10**10}
@@ -0,0 +1,14 @@
+from django.apps import AppConfig
+from django.conf import settings
+
+
+class MetricsConfig(AppConfig):
+    default_auto_field = "django.db.models.BigAutoField"
+    name = "apps.metrics"
+    label = "metrics"
+
+    def ready(self):
+        from .services import install_hooks
+
+        if settings.METRICS_SAMPLE_RATE > 0:
+            install_hooks()
@@ -0,0 +1,30 @@
+import pstats
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = "Merge the request profiles in PROFILING_DIR and print the most expensive functions."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--view", help="Only profiles of this view name, e.g. education:lesson.")
+        parser.add_argument("--sort", choices=["cumulative", "tottime", "ncalls"], default="cumulative")
+        parser.add_argument("--limit", type=int, default=25)
+        parser.add_argument(
+            "--filter",
+            default="apps/",
+            help="Regex the printed rows must match (default: project code). Empty for everything.",
+        )
+
+    def handle(self, *args, **options):
+        pattern = f"*-{options['view'].replace(':', '.')}-*.prof" if options["view"] else "*.prof"
+        paths = sorted(Path(settings.PROFILING_DIR).glob(pattern))
+        if not paths:
+            raise CommandError(f"No profiles matching {pattern} in {settings.PROFILING_DIR}.")
+
+        stats = pstats.Stats(*(str(path) for path in paths), stream=self.stdout)
+        self.stdout.write(f"{len(paths)} profiles\n")
+        restrictions = [options["filter"]] if options["filter"] else []
+        stats.sort_stats(options["sort"]).print_stats(*restrictions, options["limit"])
@@ -0,0 +1,139 @@
+import cProfile
+import itertools
+import random
+import threading
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from .services import dump_profile, end_request, record_request, start_request
+
+# Staff send "X-Profile: 1" to profile a request; the response names the dump
+PROFILE_HEADER = "X-Profile"
+
+# Only one cProfile can run per process at a time
+_profiling = threading.Lock()
+
+
+class MetricsMiddleware:
+    """Time sampled requests and report their costs.
+
+    Sampled responses carry a Server-Timing header (total, db, tpl, cache)
+    and are added to the per-view aggregates of this worker process, served
+    by the metrics endpoint. Unsampled requests pass straight through, and
+    with METRICS_SAMPLE_RATE at 0 the middleware isn't loaded at all. Runs
+    under gunicorn (WSGI) or uvicorn (ASGI); in the latter, async views
+    aren't moved back onto a thread to get here.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = settings.METRICS_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return random.random() < self.sample_rate
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        metrics, token = start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, metrics)
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        metrics, token = start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            end_request(token)
+        return self._finish(request, response, metrics)
+
+    def _finish(self, request, response, metrics):
+        duration = time.perf_counter() - metrics.started
+        match = request.resolver_match
+        record_request(match.view_name if match else "unresolved", duration, metrics)
+        response["Server-Timing"] = metrics.server_timing(duration)
+        return response
+
+
+class ProfilingMiddleware:
+    """cProfile one in PROFILING_SAMPLE_EVERY requests, and staff requests
+    sending ``X-Profile: 1``, dumping each run to PROFILING_DIR.
+
+    Must sit after AuthenticationMiddleware. A request arriving while
+    another is being profiled in this process runs unprofiled.
+
+    For async views the profiler runs on the request's sync thread, where
+    the ORM, templates and cards loaded with thread_sensitive=True do their
+    work; awaiting on the event loop isn't profiled.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.every = settings.PROFILING_SAMPLE_EVERY
+        self.counter = itertools.count(1)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def _wanted(self, request):
+        """Whether to profile ``request``; True means the caller holds the lock."""
+        requested = request.headers.get(PROFILE_HEADER) == "1" and request.user.is_staff
+        sampled = self.every > 0 and next(self.counter) % self.every == 0
+        return (requested or sampled) and _profiling.acquire(blocking=False)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self._wanted(request):
+            return self.get_response(request)
+
+        profile = cProfile.Profile()
+        try:
+            response = profile.runcall(self.get_response, request)
+        finally:
+            _profiling.release()
+        return self._finish(request, response, profile)
+
+    async def __acall__(self, request):
+        # request.user is lazy and may query the database
+        if not await sync_to_async(self._wanted)(request):
+            return await self.get_response(request)
+
+        profile = cProfile.Profile()
+        try:
+            await sync_to_async(profile.enable)()
+            try:
+                response = await self.get_response(request)
+            finally:
+                await sync_to_async(profile.disable)()
+        finally:
+            _profiling.release()
+        return self._finish(request, response, profile)
+
+    def _finish(self, request, response, profile):
+        match = request.resolver_match
+        path = dump_profile(profile, match.view_name if match else "unresolved")
+        if request.headers.get(PROFILE_HEADER) == "1" and request.user.is_staff:
+            response[f"{PROFILE_HEADER}-File"] = path.name
+        return response
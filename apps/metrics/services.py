@@ -0,0 +1,324 @@
+"""Per-request cost accounting and an in-process Prometheus registry.
+
+MetricsMiddleware opens a RequestMetrics for each sampled request; the DB,
+template and cache hooks add to whichever one is current and cost a single
+context-variable read when the request isn't sampled. With
+METRICS_SAMPLE_RATE at 0, the default, neither the hooks nor the middleware
+are installed. Finished requests are
+folded into per-view histograms held in this process: each worker process
+of the web server (gunicorn by default, uvicorn if the ASGI command is
+used) keeps its own, so a scrape reports the worker that served it.
+
+Service functions decorated with @instrumented add their call counts and
+cumulative time to the same registry. ProfilingMiddleware dumps cProfile
+runs of sampled requests to PROFILING_DIR; see `profile_report`.
+"""
+
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from pathlib import Path
+from uuid import uuid4
+
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.utils.module_loading import import_string
+
+# Upper bounds of the request latency histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Upper bounds of the queries-per-request histogram
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100)
+
+# Oldest profile dumps beyond this many are deleted
+PROFILES_KEPT = 200
+
+_current = ContextVar("request_metrics", default=None)
+_stats = {}
+_services = {}
+_lock = threading.Lock()
+
+
+class RequestMetrics:
+    """Costs accumulated while serving one request.
+
+    Template time is wall time inside top-level renders, so it includes any
+    queries the template triggers lazily; those are also counted under db.
+    Cards loaded with CONCURRENT_CARDS report from their own threads, so the
+    counters are only updated through the add_* methods, under a lock.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.queries += 1
+            self.db_time += seconds
+
+    def add_render(self, seconds):
+        with self._lock:
+            self.template_time += seconds
+
+    def add_cache_read(self, hit):
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def server_timing(self, duration):
+        """Value for the Server-Timing response header."""
+        return ", ".join(
+            [
+                f"total;dur={duration * 1000:.1f}",
+                f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries"',
+                f"tpl;dur={self.template_time * 1000:.1f}",
+                f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            ]
+        )
+
+
+def start_request():
+    """Make a fresh RequestMetrics current; returns it with the reset token."""
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def end_request(token):
+    _current.reset(token)
+
+
+def record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper hook counting queries and their time."""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.add_query(time.perf_counter() - started)
+
+
+def _wrap_connection(sender, connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+def _timed_render(render):
+    @wraps(render)
+    def wrapper(self, *args, **kwargs):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, *args, **kwargs)
+        started = time.perf_counter()
+        try:
+            return render(self, *args, **kwargs)
+        finally:
+            metrics.add_render(time.perf_counter() - started)
+
+    wrapper.metrics_hook = True
+    return wrapper
+
+
+def _counted_get(get):
+    @wraps(get)
+    def wrapper(self, key, default=None, version=None):
+        value = get(self, key, default, version)
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.add_cache_read(value is not default)
+        return value
+
+    wrapper.metrics_hook = True
+    return wrapper
+
+
+def install_hooks():
+    """Wrap queries, template rendering and cache reads of every configured backend.
+
+    Queries are counted on every connection as it opens, whichever thread
+    opens it, so work a request hands to other threads is counted too.
+    Only ``get`` is wrapped: the base get_many and get_or_set go through it,
+    so every hit or miss is counted once. Safe to call more than once.
+    """
+    from django.template.backends.django import Template
+
+    connection_created.connect(_wrap_connection, dispatch_uid="metrics.record_query")
+    for connection in connections.all(initialized_only=True):
+        _wrap_connection(None, connection)
+
+    if not getattr(Template.render, "metrics_hook", False):
+        Template.render = _timed_render(Template.render)
+
+    for config in settings.CACHES.values():
+        backend = import_string(config["BACKEND"])
+        if not getattr(backend.get, "metrics_hook", False):
+            backend.get = _counted_get(backend.get)
+
+
+class Histogram:
+    """Prometheus-style histogram; counts are per bucket, not cumulative."""
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+    def cumulative(self):
+        """(upper bound, count) pairs as exposed, ending with +Inf."""
+        running = 0
+        pairs = []
+        for bound, count in zip((*self.buckets, "+Inf"), self.counts, strict=True):
+            running += count
+            pairs.append((bound, running))
+        return pairs
+
+
+class ViewStats:
+    """Everything recorded for one view in this process."""
+
+    def __init__(self):
+        self.duration = Histogram(DURATION_BUCKETS)
+        self.queries = Histogram(QUERY_BUCKETS)
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+
+def record_request(view, duration, metrics):
+    """Fold a finished request into the per-view aggregates."""
+    with _lock:
+        stats = _stats.get(view)
+        if stats is None:
+            stats = _stats[view] = ViewStats()
+        stats.duration.observe(duration)
+        stats.queries.observe(metrics.queries)
+        stats.db_time += metrics.db_time
+        stats.template_time += metrics.template_time
+        stats.cache_hits += metrics.cache_hits
+        stats.cache_misses += metrics.cache_misses
+
+
+class ServiceStats:
+    """Calls to one instrumented function in this process."""
+
+    def __init__(self):
+        self.calls = 0
+        self.seconds = 0.0
+
+
+def instrumented(func):
+    """Count calls to ``func`` and their cumulative wall time.
+
+    Time is inclusive, like cProfile's cumtime: an instrumented function
+    calling another counts the inner call's time in both.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    stats = _services.setdefault(name, ServiceStats())
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - started
+            with _lock:
+                stats.calls += 1
+                stats.seconds += elapsed
+
+    return wrapper
+
+
+def reset_metrics():
+    """Drop everything recorded so far in this process."""
+    with _lock:
+        _stats.clear()
+        for stats in _services.values():
+            stats.calls = 0
+            stats.seconds = 0.0
+
+
+def dump_profile(profile, view):
+    """Write a finished cProfile run to PROFILING_DIR and return its path.
+
+    File names sort by time; only the newest PROFILES_KEPT are kept.
+    """
+    directory = Path(settings.PROFILING_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    stamp = datetime.now().strftime("%Y%m%dT%H%M%S%f")
+    path = directory / f"{stamp}-{view.replace(':', '.')}-{uuid4().hex[:6]}.prof"
+    profile.dump_stats(path)
+    for stale in sorted(directory.glob("*.prof"))[:-PROFILES_KEPT]:
+        stale.unlink(missing_ok=True)
+    return path
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _histogram_lines(name, rows):
+    lines = []
+    for view, histogram in rows:
+        for bound, count in histogram.cumulative():
+            lines.append(f'{name}_bucket{{view="{_label(view)}",le="{bound}"}} {count}')
+        lines.append(f'{name}_sum{{view="{_label(view)}"}} {histogram.sum}')
+        lines.append(f'{name}_count{{view="{_label(view)}"}} {histogram.count}')
+    return lines
+
+
+def render_prometheus():
+    """This process's metrics in the Prometheus text exposition format."""
+    with _lock:
+        views = sorted(_stats.items())
+        lines = [
+            "# HELP limpid_request_duration_seconds Wall time per request, by view.",
+            "# TYPE limpid_request_duration_seconds histogram",
+            *_histogram_lines("limpid_request_duration_seconds", [(v, s.duration) for v, s in views]),
+            "# HELP limpid_request_queries Database queries per request, by view.",
+            "# TYPE limpid_request_queries histogram",
+            *_histogram_lines("limpid_request_queries", [(v, s.queries) for v, s in views]),
+            "# HELP limpid_db_duration_seconds_total Time spent in database queries, by view.",
+            "# TYPE limpid_db_duration_seconds_total counter",
+            *(f'limpid_db_duration_seconds_total{{view="{_label(v)}"}} {s.db_time}' for v, s in views),
+            "# HELP limpid_template_duration_seconds_total Time spent rendering templates, by view.",
+            "# TYPE limpid_template_duration_seconds_total counter",
+            *(f'limpid_template_duration_seconds_total{{view="{_label(v)}"}} {s.template_time}' for v, s in views),
+            "# HELP limpid_cache_requests_total Cache reads, by view and result.",
+            "# TYPE limpid_cache_requests_total counter",
+        ]
+        for view, stats in views:
+            lines.append(f'limpid_cache_requests_total{{view="{_label(view)}",result="hit"}} {stats.cache_hits}')
+            lines.append(f'limpid_cache_requests_total{{view="{_label(view)}",result="miss"}} {stats.cache_misses}')
+        services = sorted(_services.items())
+        lines += [
+            "# HELP limpid_service_calls_total Calls to instrumented service functions.",
+            "# TYPE limpid_service_calls_total counter",
+            *(f'limpid_service_calls_total{{function="{name}"}} {s.calls}' for name, s in services),
+            "# HELP limpid_service_duration_seconds_total Cumulative time in instrumented service functions.",
+            "# TYPE limpid_service_duration_seconds_total counter",
+            *(f'limpid_service_duration_seconds_total{{function="{name}"}} {s.seconds}' for name, s in services),
+        ]
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,83 @@
+from asgiref.sync import iscoroutinefunction
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import TestCase, override_settings
+
+from apps.metrics.middleware import MetricsMiddleware, ProfilingMiddleware
+from apps.metrics.services import _stats, render_prometheus, reset_metrics
+
+User = get_user_model()
+
+
+class MetricsMiddlewareTest(TestCase):
+    def setUp(self):
+        reset_metrics()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(email="test@example.com", password="testpass123")
+
+    def test_server_timing_header(self):
+        response = self.client.get("/learn/")
+        timing = response["Server-Timing"]
+        assert timing.startswith("total;dur=")
+        assert "db;dur=" in timing
+        assert "tpl;dur=" in timing
+        assert "cache;desc=" in timing
+
+    def test_records_per_view(self):
+        self.client.get("/learn/")
+        self.client.get("/learn/")
+        stats = _stats["education:path"]
+        assert stats.duration.count == 2
+        assert stats.queries.sum > 0
+        assert stats.template_time > 0
+
+    def test_counts_cache_reads(self):
+        self.client.get("/accounts/profile/")
+        stats = _stats["accounts:profile"]
+        # The session is read from the database, not the cache
+        assert stats.cache_hits + stats.cache_misses == 0
+
+        self.client.get("/learn/L0-01/")
+        stats = _stats["education:lesson"]
+        assert stats.cache_hits + stats.cache_misses > 0
+
+    async def test_async_view(self):
+        await self.async_client.aforce_login(self.user)
+        # Redirects to onboarding, after querying for a portfolio
+        response = await self.async_client.get("/dashboard/")
+        assert '"0 queries"' not in response["Server-Timing"]
+        assert _stats["dashboard"].queries.sum > 0
+
+    def test_unresolved_paths(self):
+        self.client.get("/no-such-page/")
+        assert "unresolved" in _stats
+
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_sampling_off(self):
+        response = self.client.get("/learn/")
+        assert "Server-Timing" not in response
+        assert _stats == {}
+
+    def test_exposition(self):
+        self.client.get("/learn/")
+        text = render_prometheus()
+        assert 'limpid_request_duration_seconds_bucket{view="education:path",le="+Inf"} 1' in text
+        assert 'limpid_request_duration_seconds_count{view="education:path"} 1' in text
+        assert 'limpid_cache_requests_total{view="education:path",result="hit"}' in text
+
+
+class SamplingOffTest(TestCase):
+    @override_settings(METRICS_SAMPLE_RATE=0)
+    def test_middleware_unloads(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            MetricsMiddleware(lambda request: None)
+
+
+class AsyncCapableTest(TestCase):
+    def test_middlewares_follow_the_handler(self):
+        async def get_response(request):
+            return None
+
+        for middleware in (MetricsMiddleware, ProfilingMiddleware):
+            assert iscoroutinefunction(middleware(get_response))
+            assert not iscoroutinefunction(middleware(lambda request: None))
@@ -0,0 +1,75 @@
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase, override_settings
+
+User = get_user_model()
+
+
+class ProfilingMiddlewareTest(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.settings_override = override_settings(PROFILING_DIR=self.tmp.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def _login(self, **extra):
+        User.objects.create_user(username="testuser", email="test@example.com", password="testpass123", **extra)
+        self.client.login(email="test@example.com", password="testpass123")
+
+    def _dumps(self):
+        return sorted(Path(self.tmp.name).glob("*.prof"))
+
+    def test_off_by_default(self):
+        self._login()
+        self.client.get("/learn/")
+        assert self._dumps() == []
+
+    def test_staff_header(self):
+        self._login(is_staff=True)
+        response = self.client.get("/learn/", headers={"X-Profile": "1"})
+        dumps = self._dumps()
+        assert len(dumps) == 1
+        assert response["X-Profile-File"] == dumps[0].name
+        assert "-education.path-" in dumps[0].name
+
+    async def test_async_view(self):
+        user = await User.objects.acreate_user(username="staff", email="staff@example.com", is_staff=True)
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get("/dashboard/", headers={"X-Profile": "1"})
+        dumps = self._dumps()
+        assert len(dumps) == 1
+        assert response["X-Profile-File"] == dumps[0].name
+        assert "-dashboard-" in dumps[0].name
+
+    def test_header_ignored_for_non_staff(self):
+        self._login()
+        response = self.client.get("/learn/", headers={"X-Profile": "1"})
+        assert "X-Profile-File" not in response
+        assert self._dumps() == []
+
+    @override_settings(PROFILING_SAMPLE_EVERY=2)
+    def test_sampling(self):
+        self._login()
+        for _ in range(4):
+            response = self.client.get("/learn/")
+            assert "X-Profile-File" not in response
+        assert len(self._dumps()) == 2
+
+    @override_settings(PROFILING_SAMPLE_EVERY=1)
+    def test_report(self):
+        self._login()
+        self.client.get("/learn/")
+        self.client.get("/learn/L0-01/")
+        out = StringIO()
+        call_command("profile_report", "--view", "education:path", stdout=out)
+        assert "1 profiles" in out.getvalue()
+        assert "get_user_progress_summary" in out.getvalue()
+
+    def test_report_without_profiles(self):
+        with self.assertRaises(CommandError):
+            call_command("profile_report", stdout=StringIO())
@@ -0,0 +1,87 @@
+import cProfile
+import tempfile
+import threading
+from unittest.mock import patch
+
+from django.test import SimpleTestCase, override_settings
+
+from apps.metrics import services
+from apps.metrics.services import (
+    RequestMetrics,
+    _services,
+    dump_profile,
+    instrumented,
+    render_prometheus,
+    reset_metrics,
+)
+
+
+@instrumented
+def _square(x):
+    return x * x
+
+
+@instrumented
+def _boom():
+    raise ValueError("boom")
+
+
+class RequestMetricsTest(SimpleTestCase):
+    def test_counts_from_several_threads(self):
+        metrics = RequestMetrics()
+
+        def work():
+            for _ in range(2000):
+                metrics.add_query(0.001)
+                metrics.add_cache_read(hit=True)
+
+        threads = [threading.Thread(target=work) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert (metrics.queries, metrics.cache_hits, metrics.cache_misses) == (8000, 8000, 0)
+        assert round(metrics.db_time, 6) == 8.0
+
+
+class InstrumentedTest(SimpleTestCase):
+    def setUp(self):
+        reset_metrics()
+
+    def test_counts_calls_and_time(self):
+        assert _square(3) == 9
+        _square(4)
+        stats = _services[f"{__name__}._square"]
+        assert stats.calls == 2
+        assert stats.seconds > 0
+
+    def test_counts_failing_calls(self):
+        with self.assertRaises(ValueError):
+            _boom()
+        assert _services[f"{__name__}._boom"].calls == 1
+
+    def test_keeps_metadata(self):
+        assert _square.__name__ == "_square"
+        assert _square.__wrapped__(2) == 4
+
+    def test_exposition(self):
+        _square(2)
+        text = render_prometheus()
+        assert f'limpid_service_calls_total{{function="{__name__}._square"}} 1' in text
+        assert 'limpid_service_calls_total{function="apps.education.services.load_lesson"}' in text
+
+
+class DumpProfileTest(SimpleTestCase):
+    def test_writes_and_prunes(self):
+        with tempfile.TemporaryDirectory() as tmp, override_settings(PROFILING_DIR=tmp):
+            with patch.object(services, "PROFILES_KEPT", 2):
+                paths = []
+                for _ in range(3):
+                    profile = cProfile.Profile()
+                    profile.runcall(_square, 2)
+                    paths.append(dump_profile(profile, "education:lesson"))
+            assert paths[0].name.endswith(".prof")
+            assert "-education.lesson-" in paths[0].name
+            assert not paths[0].exists()
+            assert paths[1].exists()
+            assert paths[2].exists()
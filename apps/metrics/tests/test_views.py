@@ -0,0 +1,31 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+
+User = get_user_model()
+
+
+class MetricsViewTest(TestCase):
+    def test_anonymous_forbidden(self):
+        response = self.client.get("/metrics/")
+        assert response.status_code == 403
+
+    def test_non_staff_forbidden(self):
+        User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.client.login(email="test@example.com", password="testpass123")
+        assert self.client.get("/metrics/").status_code == 403
+
+    def test_staff(self):
+        User.objects.create_user(username="staff", email="staff@example.com", password="testpass123", is_staff=True)
+        self.client.login(email="staff@example.com", password="testpass123")
+        response = self.client.get("/metrics/")
+        assert response.status_code == 200
+        assert response["Content-Type"].startswith("text/plain; version=0.0.4")
+        self.assertContains(response, "# TYPE limpid_request_duration_seconds histogram")
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_bearer_token(self):
+        assert self.client.get("/metrics/", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+        assert self.client.get("/metrics/", headers={"Authorization": "Bearer wrong"}).status_code == 403
+
+    def test_empty_token_never_matches(self):
+        assert self.client.get("/metrics/", headers={"Authorization": "Bearer "}).status_code == 403
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.core.exceptions import PermissionDenied
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+
+from .services import render_prometheus
+
+
+def _authorized(request):
+    if request.user.is_authenticated and request.user.is_staff:
+        return True
+    token = settings.METRICS_TOKEN
+    header = request.headers.get("Authorization", "")
+    return bool(token) and constant_time_compare(header, f"Bearer {token}")
+
+
+def metrics(request):
+    """Prometheus scrape endpoint: staff, or a bearer METRICS_TOKEN."""
+    if not _authorized(request):
+        raise PermissionDenied
+    return HttpResponse(render_prometheus(), content_type="text/plain; version=0.0.4; charset=utf-8")
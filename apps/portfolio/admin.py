@@ -1,6 +1,6 @@
 from django.contrib import admin
 
-from .models import Holding, Portfolio, Transaction
+from .models import Holding, Portfolio, PortfolioValuation, Transaction
 
 
 @admin.register(Portfolio)
@@ -22,3 +22,9 @@ class TransactionAdmin(admin.ModelAdmin):
     list_display = ["portfolio", "asset", "transaction_type", "quantity", "price", "executed_at"]
     list_filter = ["transaction_type", "asset__asset_type"]
     search_fields = ["asset__ticker", "portfolio__name"]
+
+
+@admin.register(PortfolioValuation)
+class PortfolioValuationAdmin(admin.ModelAdmin):
+    list_display = ["portfolio", "total_value", "total_cost", "daily_change", "computed_at"]
+    search_fields = ["portfolio__name", "portfolio__user__email"]
@@ -5,3 +5,6 @@ class PortfolioConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "apps.portfolio"
     label = "portfolio"
+
+    def ready(self):
+        from . import signals  # noqa: F401
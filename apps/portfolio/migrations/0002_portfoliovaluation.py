@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-18 09:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PortfolioValuation',
+            fields=[
+                ('portfolio', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='valuation', serialize=False, to='portfolio.portfolio')),
+                ('total_value', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('total_cost', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('daily_change', models.DecimalField(decimal_places=6, max_digits=20)),
+                ('allocation', models.JSONField(default=list)),
+                ('exposures', models.JSONField(default=dict)),
+                ('computed_at', models.DateTimeField()),
+            ],
+            options={
+                'verbose_name': 'portfolio valuation',
+                'verbose_name_plural': 'portfolio valuations',
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:00
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def unflag_duplicate_sandboxes(apps, schema_editor):
+    """Keep each user's oldest sandbox; earlier races could have created more."""
+    Portfolio = apps.get_model("portfolio", "Portfolio")
+    seen = set()
+    duplicates = []
+    for pk, user_id in Portfolio.objects.filter(is_sandbox=True).order_by("user_id", "created_at", "pk").values_list(
+        "pk", "user_id"
+    ):
+        if user_id in seen:
+            duplicates.append(pk)
+        seen.add(user_id)
+    Portfolio.objects.filter(pk__in=duplicates).update(is_sandbox=False)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0002_portfoliovaluation'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(unflag_duplicate_sandboxes, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='portfolio',
+            constraint=models.UniqueConstraint(condition=models.Q(('is_sandbox', True)), fields=('user',), name='unique_sandbox_portfolio_per_user'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+def drop_unconverted_valuations(apps, schema_editor):
+    """Stored valuations summed amounts across currencies; they are rebuilt on the next read."""
+    apps.get_model("portfolio", "PortfolioValuation").objects.all().delete()
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0003_unique_sandbox_portfolio'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfoliovaluation',
+            name='currency',
+            field=models.CharField(default='CAD', max_length=3),
+        ),
+        migrations.RunPython(drop_unconverted_valuations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 11:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('portfolio', '0004_portfoliovaluation_currency'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='portfoliovaluation',
+            name='rates_missing',
+            field=models.BooleanField(default=False),
+        ),
+    ]
@@ -19,6 +19,13 @@ class Portfolio(models.Model):
         verbose_name = _("portfolio")
         verbose_name_plural = _("portfolios")
         ordering = ["-created_at"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user"],
+                condition=models.Q(is_sandbox=True),
+                name="unique_sandbox_portfolio_per_user",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.user.email})"
@@ -94,3 +101,34 @@ class Transaction(models.Model):
 
     def __str__(self):
         return f"{self.transaction_type} {self.asset.ticker} x{self.quantity}"
+
+
+class PortfolioValuation(models.Model):
+    """Denormalized portfolio aggregates, refreshed when holdings or prices change.
+
+    Amounts are in ``currency``, the owner's base currency when computed.
+    rates_missing marks figures that add other currencies at face value
+    because no exchange rate was available.
+    """
+
+    portfolio = models.OneToOneField(
+        Portfolio,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="valuation",
+    )
+    currency = models.CharField(max_length=3, default="CAD")
+    rates_missing = models.BooleanField(default=False)
+    total_value = models.DecimalField(max_digits=20, decimal_places=6)
+    total_cost = models.DecimalField(max_digits=20, decimal_places=6)
+    daily_change = models.DecimalField(max_digits=20, decimal_places=6)
+    allocation = models.JSONField(default=list)
+    exposures = models.JSONField(default=dict)
+    computed_at = models.DateTimeField()
+
+    class Meta:
+        verbose_name = _("portfolio valuation")
+        verbose_name_plural = _("portfolio valuations")
+
+    def __str__(self):
+        return f"{self.portfolio_id}: {self.total_value}"
@@ -0,0 +1,151 @@
+"""Exact fixed-point money as scaled integers.
+
+Quantities are stored with four decimal places and prices with two, so a
+quantity times a price is an exact integer number of micro-dollars
+(10**-6) and sums of them never round. PortfolioAnalytics multiplies and
+adds plain ints in these units and keeps its totals as Money; Decimal
+only appears when a figure is formatted, through ``to_decimal`` and
+``percent_of``, or ``quantize`` and ``percent`` on plain ints in loops.
+
+Rounding is half-even, like Decimal.quantize under the default context,
+and a negative amount that rounds to zero keeps its sign ("-0.00"), as
+Decimal does. Percentages are rounded once from the exact ratio, where
+Decimal division first rounds to 28 digits; the two can only disagree on
+a ratio within 10**-28 of a rounding boundary.
+"""
+
+from decimal import Decimal
+from functools import total_ordering
+
+QUANTITY_PLACES = 4
+PRICE_PLACES = 2
+VALUE_PLACES = QUANTITY_PLACES + PRICE_PLACES
+
+# 10**-places as Decimals: multiplying by one is cheaper than Decimal.scaleb
+_UNITS = {places: Decimal(1).scaleb(-places) for places in range(VALUE_PLACES + 1)}
+
+
+def round_div(numerator, denominator):
+    """numerator / denominator rounded half to even, in integers."""
+    if denominator < 0:
+        numerator, denominator = -numerator, -denominator
+    quotient, remainder = divmod(numerator, denominator)
+    twice = 2 * remainder
+    if twice > denominator or (twice == denominator and quotient % 2):
+        quotient += 1
+    return quotient
+
+
+def units_of(value, places):
+    """Decimal ``value`` as an int of 10**-places; ValueError if that would round."""
+    scaled = value.scaleb(places)
+    units = int(scaled)
+    if units != scaled:
+        raise ValueError(f"{value} has more than {places} decimal places")
+    return units
+
+
+def quantize(units, places, to):
+    """``units`` of 10**-places as a Decimal rounded to ``to`` places."""
+    if to == places:
+        return Decimal(units) * _UNITS[to]
+    if to > places:
+        return Decimal(units * 10 ** (to - places)) * _UNITS[to]
+    # round_div inlined: this runs for every figure of every holding
+    step = 10 ** (places - to)
+    quotient, remainder = divmod(units, step)
+    if 2 * remainder > step or (2 * remainder == step and quotient % 2):
+        quotient += 1
+    if quotient or units >= 0:
+        return Decimal(quotient) * _UNITS[to]
+    return (Decimal(0) * _UNITS[to]).copy_negate()
+
+
+def percent(part, whole, places):
+    """100 * part / whole as a Decimal rounded to ``places``; zero if whole is.
+
+    part and whole are ints at the same scale.
+    """
+    if not whole:
+        return Decimal(0) * _UNITS[places]
+    if whole < 0:
+        part, whole = -part, -whole
+    # round_div inlined, as in quantize
+    quotient, remainder = divmod(part * 100 * 10**places, whole)
+    if 2 * remainder > whole or (2 * remainder == whole and quotient % 2):
+        quotient += 1
+    if quotient or part >= 0:
+        return Decimal(quotient) * _UNITS[places]
+    return (Decimal(0) * _UNITS[places]).copy_negate()
+
+
+@total_ordering
+class Money:
+    """An amount of ``units`` times 10**-places; micro-dollars by default."""
+
+    __slots__ = ("units", "places")
+
+    def __init__(self, units=0, places=VALUE_PLACES):
+        self.units = units
+        self.places = places
+
+    @classmethod
+    def from_decimal(cls, value, places=VALUE_PLACES):
+        """Exact conversion; ValueError if ``value`` has more than ``places`` decimals."""
+        return cls(units_of(Decimal(value), places), places)
+
+    def _aligned(self, other):
+        """(self units, other units, places) at the finer of the two scales."""
+        if isinstance(other, int):
+            other = Money(other, 0)
+        elif not isinstance(other, Money):
+            other = Money.from_decimal(other, max(self.places, -other.as_tuple().exponent))
+        if self.places == other.places:
+            return self.units, other.units, self.places
+        if self.places > other.places:
+            return self.units, other.units * 10 ** (self.places - other.places), self.places
+        return self.units * 10 ** (other.places - self.places), other.units, other.places
+
+    def __add__(self, other):
+        a, b, places = self._aligned(other)
+        return Money(a + b, places)
+
+    def __sub__(self, other):
+        a, b, places = self._aligned(other)
+        return Money(a - b, places)
+
+    def __neg__(self):
+        return Money(-self.units, self.places)
+
+    def __bool__(self):
+        return self.units != 0
+
+    def __eq__(self, other):
+        if not isinstance(other, Money | int | Decimal):
+            return NotImplemented
+        a, b, _ = self._aligned(other)
+        return a == b
+
+    def __lt__(self, other):
+        if not isinstance(other, Money | int | Decimal):
+            return NotImplemented
+        a, b, _ = self._aligned(other)
+        return a < b
+
+    def __hash__(self):
+        return hash(self.to_decimal())
+
+    def __repr__(self):
+        return f"Money('{self}')"
+
+    def __str__(self):
+        return str(self.to_decimal())
+
+    def to_decimal(self, places=None):
+        """This amount as a Decimal, rounded to ``places`` if given."""
+        return quantize(self.units, self.places, self.places if places is None else places)
+
+    def percent_of(self, whole, places):
+        """100 * self / whole as a Decimal rounded to ``places``; zero if whole is."""
+        part, whole, _ = self._aligned(whole)
+        return percent(part, whole, places)
@@ -1,13 +1,23 @@
 import json
 from decimal import Decimal
+from functools import cached_property
 
+import numpy as np
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, CharField, Count, F, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Cast, Coalesce, Round, TruncDate
 from django.utils import timezone
 from django.utils.translation import gettext as _
 
-from apps.education.models import LessonProgress
+from apps.accounts.models import UserProfile
+from apps.education.services import get_coverage_masks, get_learning_progress
 from apps.market_data.models import Asset
+from apps.market_data.services import RATE_SCALE, MissingExchangeRate, get_cached_price_matrix, get_conversion_rates
+from apps.metrics.services import instrumented
 
-from .models import Holding, Portfolio, Transaction
+from .models import Holding, Portfolio, PortfolioValuation, Transaction
+from .money import PRICE_PLACES, QUANTITY_PLACES, VALUE_PLACES, Money, percent, quantize, round_div, units_of
 
 # Allocation configs by risk profile tier
 SANDBOX_ALLOCATIONS = {
@@ -32,14 +42,15 @@ SANDBOX_ALLOCATIONS = {
 
 SANDBOX_TOTAL = Decimal("10000")
 
-# Map asset types to lesson IDs that cover them
-ASSET_TYPE_LESSON_MAP = {
-    "etf": ["L1-02"],
-    "stock": ["L1-01"],
-    "bond": ["L1-03"],
-    "gic": ["L1-03"],
-    "cash": ["L0-01"],
-}
+# Asset fields that feed into stored valuations
+VALUATION_ASSET_FIELDS = frozenset({"current_price", "previous_close", "asset_type", "currency", "geography", "sector"})
+
+# Base currency of users without a profile
+DEFAULT_CURRENCY = "CAD"
+
+# Cached performance series are also keyed on the valuation timestamp and the
+# transactions; the TTL bounds staleness for edits to existing transactions.
+PERFORMANCE_CACHE_TIMEOUT = 60 * 60
 
 CHART_COLORS = [
     "#4f46e5",  # indigo-600
@@ -62,216 +73,714 @@ def _get_risk_tier(score):
     return "growth"
 
 
+def _resolve_sandbox_assets():
+    """Every sandbox ticker -> Asset in one query, creating placeholders for unseeded ones."""
+    tickers = sorted({ticker for allocations in SANDBOX_ALLOCATIONS.values() for ticker, _weight in allocations})
+    assets = Asset.objects.in_bulk(tickers, field_name="ticker")
+    missing = [ticker for ticker in tickers if ticker not in assets]
+    if missing:
+        Asset.objects.bulk_create(
+            [Asset(ticker=ticker, name=ticker, asset_type="cash", current_price=Decimal("1.00")) for ticker in missing],
+            ignore_conflicts=True,
+        )
+        assets.update(Asset.objects.in_bulk(missing, field_name="ticker"))
+    return assets
+
+
+def _fill_sandboxes(portfolios, tiers, currencies, assets):
+    """Bulk-write seed holdings, buy transactions and valuations for new sandboxes.
+
+    portfolios, tiers and base currencies are parallel lists. bulk_create
+    skips the Holding signals, so valuations are computed from the
+    in-memory rows and stored here instead.
+    """
+    now = timezone.now()
+    holdings = []
+    transactions = []
+    valuations = []
+    for portfolio, tier, currency in zip(portfolios, tiers, currencies, strict=True):
+        rows = []
+        for ticker, weight in SANDBOX_ALLOCATIONS[tier]:
+            asset = assets[ticker]
+            amount = SANDBOX_TOTAL * weight
+            quantity = (amount / asset.current_price).quantize(Decimal("0.0001"))
+            # Simulate bought slightly lower, rounded to cents as it is stored
+            avg_cost = (asset.current_price * Decimal("0.97")).quantize(Decimal("0.01"))
+            rows.append(Holding(portfolio=portfolio, asset=asset, quantity=quantity, average_cost=avg_cost))
+            transactions.append(
+                Transaction(
+                    portfolio=portfolio,
+                    asset=asset,
+                    transaction_type="buy",
+                    quantity=quantity,
+                    price=avg_cost,
+                    fees=Decimal("0.00"),
+                    executed_at=now,
+                )
+            )
+        holdings.extend(rows)
+        valuations.append(PortfolioAnalytics(portfolio, rows, currency).to_valuation())
+
+    Holding.objects.bulk_create(holdings)
+    Transaction.objects.bulk_create(transactions)
+    _store_valuations(valuations)
+
+
+@instrumented
 def create_sandbox_portfolio(user):
     """Create a sandbox portfolio with seed holdings based on risk profile.
 
-    Idempotent: skips if user already has a sandbox portfolio.
+    Idempotent: returns the user's existing sandbox portfolio if there is
+    one. Everything is written in one transaction; if a concurrent request
+    creates the sandbox first, the unique constraint makes this one roll
+    back and return that portfolio instead.
     """
-    if Portfolio.objects.filter(user=user, is_sandbox=True).exists():
-        return Portfolio.objects.get(user=user, is_sandbox=True)
+    existing = Portfolio.objects.filter(user=user, is_sandbox=True).first()
+    if existing is not None:
+        return existing
 
     profile = getattr(user, "profile", None)
     score = profile.risk_profile_score if profile else None
     tier = _get_risk_tier(score)
-    allocations = SANDBOX_ALLOCATIONS[tier]
+    currency = profile.base_currency if profile else DEFAULT_CURRENCY
+
+    try:
+        with transaction.atomic():
+            portfolio = Portfolio.objects.create(
+                user=user,
+                name=_("My Sandbox Portfolio"),
+                is_sandbox=True,
+            )
+            _fill_sandboxes([portfolio], [tier], [currency], _resolve_sandbox_assets())
+    except IntegrityError:
+        return Portfolio.objects.get(user=user, is_sandbox=True)
+    return portfolio
 
-    portfolio = Portfolio.objects.create(
-        user=user,
-        name=_("My Sandbox Portfolio"),
-        is_sandbox=True,
-    )
 
-    now = timezone.now()
+def create_sandbox_portfolios(users):
+    """Provision sandbox portfolios for many users at once.
 
-    for ticker, weight in allocations:
-        asset, _created = Asset.objects.get_or_create(
-            ticker=ticker,
-            defaults={"name": ticker, "asset_type": "cash", "current_price": Decimal("1.00")},
-        )
-        amount = SANDBOX_TOTAL * weight
-        quantity = (amount / asset.current_price).quantize(Decimal("0.0001"))
-        avg_cost = asset.current_price * Decimal("0.97")  # Simulate bought slightly lower
-
-        Holding.objects.create(
-            portfolio=portfolio,
-            asset=asset,
-            quantity=quantity,
-            average_cost=avg_cost,
+    Users who already have one are skipped. Risk profiles, assets,
+    portfolios, holdings, transactions and valuations are each read or
+    written in a single query, inside one transaction. Meant for data
+    migrations and load tests; unlike create_sandbox_portfolio it does not
+    recover from a concurrent onboarding of the same user.
+
+    Returns a dict mapping user id -> sandbox portfolio.
+    """
+    users = list(users)
+    user_ids = [user.pk for user in users]
+    sandboxes = {p.user_id: p for p in Portfolio.objects.filter(user_id__in=user_ids, is_sandbox=True)}
+    new_users = [user for user in users if user.pk not in sandboxes]
+    if not new_users:
+        return sandboxes
+
+    profiles = {
+        user_id: (score, currency)
+        for user_id, score, currency in UserProfile.objects.filter(
+            user_id__in=[user.pk for user in new_users]
+        ).values_list("user_id", "risk_profile_score", "base_currency")
+    }
+    with transaction.atomic():
+        portfolios = Portfolio.objects.bulk_create(
+            [Portfolio(user=user, name=_("My Sandbox Portfolio"), is_sandbox=True) for user in new_users]
         )
+        score_currency = [profiles.get(user.pk, (None, DEFAULT_CURRENCY)) for user in new_users]
+        tiers = [_get_risk_tier(score) for score, _currency in score_currency]
+        currencies = [currency for _score, currency in score_currency]
+        _fill_sandboxes(portfolios, tiers, currencies, _resolve_sandbox_assets())
+
+    sandboxes.update((p.user_id, p) for p in portfolios)
+    return sandboxes
+
+
+def _scaled(field, places):
+    """``field`` as an integer count of 10**-places, converted by the database."""
+    return Cast(Round(F(field) * 10**places), BigIntegerField())
+
+
+def base_currency(user_path):
+    """The base currency of the user at ``user_path``, defaulted in SQL for users without a profile."""
+    return Coalesce(F(f"{user_path}__profile__base_currency"), Value(DEFAULT_CURRENCY))
+
+
+# Columns of a position row, as loaded by _load_positions
+POSITION_FIELDS = (
+    "asset__ticker",
+    "asset__name",
+    "asset__asset_type",
+    "asset__geography",
+    "asset__sector",
+    "asset__currency",
+)
+
 
-        Transaction.objects.create(
-            portfolio=portfolio,
-            asset=asset,
-            transaction_type="buy",
-            quantity=quantity,
-            price=avg_cost,
-            fees=Decimal("0.00"),
-            executed_at=now,
+def _owner_currency(portfolio):
+    """Base currency of the portfolio's owner: one query."""
+    return Portfolio.objects.filter(pk=portfolio.pk).values_list(base_currency("user"), flat=True).first()
+
+
+def conversion_factors(base, currencies):
+    """Float multipliers into ``base`` for the NumPy analytics, and whether any rate was missing.
+
+    Uses the same cached rate vector as PortfolioAnalytics. Without a rate
+    for every currency, amounts count at face value (1.0), as there.
+    """
+    currencies = set(currencies)
+    if currencies <= {base}:
+        return dict.fromkeys(currencies, 1.0), False
+    try:
+        rates = get_conversion_rates(base, currencies)
+    except MissingExchangeRate:
+        return dict.fromkeys(currencies, 1.0), True
+    return {currency: rate / RATE_SCALE for currency, rate in rates.items()}, False
+
+
+def _load_positions(portfolio):
+    """(ticker, name, asset_type, geography, sector, currency, quantity,
+    average_cost, price, previous_close, base currency) per holding, amounts
+    as scaled ints: one query. The last column is the owner's base currency."""
+    return list(
+        portfolio.holdings.values_list(
+            *POSITION_FIELDS,
+            _scaled("quantity", QUANTITY_PLACES),
+            _scaled("average_cost", PRICE_PLACES),
+            _scaled("asset__current_price", PRICE_PLACES),
+            _scaled("asset__previous_close", PRICE_PLACES),
+            base_currency("portfolio__user"),
         )
+    )
 
-    return portfolio
 
+def _position(holding):
+    """A Holding (with its asset, and optionally a base_currency annotation) as a position row."""
+    asset = holding.asset
+    return (
+        asset.ticker,
+        asset.name,
+        asset.asset_type,
+        asset.geography,
+        asset.sector,
+        asset.currency,
+        units_of(holding.quantity, QUANTITY_PLACES),
+        units_of(holding.average_cost, PRICE_PLACES),
+        units_of(asset.current_price, PRICE_PLACES),
+        units_of(asset.previous_close, PRICE_PLACES),
+        getattr(holding, "base_currency", None),
+    )
 
-def get_portfolio_snapshot(portfolio):
-    """Compute portfolio-level metrics from holdings."""
-    holdings = portfolio.holdings.select_related("asset").all()
-
-    total_value = Decimal("0")
-    total_cost = Decimal("0")
-    daily_change = Decimal("0")
-
-    for h in holdings:
-        mv = h.quantity * h.asset.current_price
-        tc = h.quantity * h.average_cost
-        dc = h.quantity * h.asset.daily_change
-        total_value += mv
-        total_cost += tc
-        daily_change += dc
-
-    gain_loss = total_value - total_cost
-    gain_loss_pct = (gain_loss / total_cost * 100) if total_cost else Decimal("0")
-    prev_value = total_value - daily_change
-    daily_change_pct = (daily_change / prev_value * 100) if prev_value else Decimal("0")
-
-    dc = daily_change.quantize(Decimal("0.01"))
-    dc_pct = daily_change_pct.quantize(Decimal("0.01"))
-    sign = "+" if dc >= 0 else ""
-    daily_change_display = f"{sign}${dc} ({sign}{dc_pct}%)"
-
-    gl = gain_loss.quantize(Decimal("0.01"))
-    gl_pct = gain_loss_pct.quantize(Decimal("0.01"))
-    gl_sign = "+" if gl >= 0 else ""
-    gain_loss_display = f"{gl_sign}${gl} ({gl_sign}{gl_pct}%)"
-
-    return {
-        "total_value": total_value.quantize(Decimal("0.01")),
-        "total_cost": total_cost.quantize(Decimal("0.01")),
-        "gain_loss": gl,
-        "gain_loss_pct": gl_pct,
-        "gain_loss_display": gain_loss_display,
-        "daily_change": dc,
-        "daily_change_pct": dc_pct,
-        "daily_change_display": daily_change_display,
-    }
 
+class PortfolioAnalytics:
+    """Every dashboard/detail aggregate for a portfolio, computed in one pass.
 
-def get_allocation_breakdown(portfolio):
-    """Break down portfolio by asset type with chart data."""
-    holdings = portfolio.holdings.select_related("asset").all()
-
-    by_type = {}
-    total_value = Decimal("0")
-
-    for h in holdings:
-        mv = h.quantity * h.asset.current_price
-        total_value += mv
-        label = h.asset.get_asset_type_display()
-        by_type[label] = by_type.get(label, Decimal("0")) + mv
-
-    breakdown = []
-    labels = []
-    values = []
-
-    for label, value in sorted(by_type.items(), key=lambda x: x[1], reverse=True):
-        pct = (value / total_value * 100) if total_value else Decimal("0")
-        pct_q = pct.quantize(Decimal("0.1"))
-        val_q = value.quantize(Decimal("0.01"))
-        breakdown.append(
+    Holdings (with their assets) are loaded once; totals, allocation by
+    asset type, geography/sector/currency exposures and per-holding rows
+    are all accumulated in the same loop. Results are exposed as cached
+    properties so each figure is formatted at most once per request.
+
+    Amounts are loaded as scaled integers and summed exactly as Money (see
+    apps.portfolio.money); the properties convert to Decimal for display.
+
+    Figures are in ``currency``, the owner's base currency unless given.
+    Holdings are summed per asset currency and the sums converted together
+    with one cached vector of exchange rates (see
+    market_data.services.get_conversion_rates), which is only looked up if
+    some holding is in another currency. If a rate is missing, every sum is
+    taken at face value and ``rates_missing`` is set, so pages can say so
+    instead of failing.
+
+    The aggregates can also be restored from a stored PortfolioValuation
+    (see ``from_valuation``), in which case holdings are only loaded if the
+    holdings table is requested.
+    """
+
+    def __init__(self, portfolio, holdings=None, currency=None):
+        self.portfolio = portfolio
+        positions = _load_positions(portfolio) if holdings is None else [_position(h) for h in holdings]
+        self.currency = currency or (positions and positions[0][-1]) or _owner_currency(portfolio) or DEFAULT_CURRENCY
+        self.rates_missing = False
+        self._rows = []
+
+        groups = {}
+        for position in positions:
+            groups.setdefault(position[5], []).append(position)
+        sums = {currency: self._accumulate(rows) for currency, rows in groups.items()}
+        self._rates = self._conversion_rates(set(sums))
+
+        totals = self._convert(
+            {c: {"value": group[0], "cost": group[1], "change": group[2]} for c, group in sums.items()}
+        )
+        self.total_value = totals.get("value", Money())
+        self.total_cost = totals.get("cost", Money())
+        self.daily_change = totals.get("change", Money())
+        self.by_type = self._convert({c: group[3] for c, group in sums.items()})
+        self.geography = self._convert({c: group[4] for c, group in sums.items()})
+        self.sectors = self._convert({c: group[5] for c, group in sums.items()})
+        self.currencies = self._convert({c: {c: group[0]} for c, group in sums.items()})
+        self.asset_types = set(self.by_type)
+
+    def _accumulate(self, positions):
+        """(value, cost, daily change, by type, by geography, by sector) of
+        positions in one currency, as ints in that currency."""
+        total_value = total_cost = daily_change = 0
+        by_type = {}
+        geography = {}
+        sectors = {}
+
+        for position in positions:
+            asset_type, geo, sector, _currency, quantity, average_cost, price, previous_close = position[2:10]
+            mv = quantity * price
+            tc = quantity * average_cost
+            total_value += mv
+            total_cost += tc
+            if previous_close:
+                daily_change += quantity * (price - previous_close)
+            by_type[asset_type] = by_type.get(asset_type, 0) + mv
+            if geo:
+                geography[geo] = geography.get(geo, 0) + mv
+            if sector:
+                sectors[sector] = sectors.get(sector, 0) + mv
+            self._rows.append((position, mv, tc))
+
+        return total_value, total_cost, daily_change, by_type, geography, sectors
+
+    def _conversion_rates(self, currencies):
+        """Rates into the base currency for ``currencies``; None if none are needed or available."""
+        if currencies <= {self.currency}:
+            return None
+        try:
+            return get_conversion_rates(self.currency, currencies)
+        except MissingExchangeRate:
+            self.rates_missing = True
+            return None
+
+    def _convert(self, amounts):
+        """{asset currency: {key: units}} as {key: Money} in the base currency, summed per key."""
+        rates = self._rates
+        if rates is None:
+            # Only the base currency, or rates are missing
+            summed = {}
+            for by_key in amounts.values():
+                for key, units in by_key.items():
+                    summed[key] = summed.get(key, 0) + units
+            return {key: Money(units) for key, units in summed.items()}
+        summed = {}
+        for currency, by_key in amounts.items():
+            rate = rates[currency]
+            for key, units in by_key.items():
+                summed[key] = summed.get(key, 0) + units * rate
+        return {key: Money(round_div(units, RATE_SCALE)) for key, units in summed.items()}
+
+    @classmethod
+    def from_valuation(cls, portfolio, valuation):
+        """Restore aggregates from a stored valuation without reading holdings."""
+        analytics = cls(portfolio, holdings=[], currency=valuation.currency)
+        analytics._rows = None
+        analytics.rates_missing = valuation.rates_missing
+        analytics.total_value = Money.from_decimal(valuation.total_value)
+        analytics.total_cost = Money.from_decimal(valuation.total_cost)
+        analytics.daily_change = Money.from_decimal(valuation.daily_change)
+        analytics.by_type = {asset_type: Money.from_decimal(value) for asset_type, value in valuation.allocation}
+        analytics.geography = {label: Money.from_decimal(value) for label, value in valuation.exposures["geography"]}
+        analytics.sectors = {label: Money.from_decimal(value) for label, value in valuation.exposures["sectors"]}
+        analytics.currencies = {label: Money.from_decimal(value) for label, value in valuation.exposures["currencies"]}
+        analytics.asset_types = set(analytics.by_type)
+        return analytics
+
+    def to_valuation(self):
+        """Build an unsaved PortfolioValuation holding the raw aggregates."""
+        return PortfolioValuation(
+            portfolio_id=self.portfolio.pk,
+            currency=self.currency,
+            rates_missing=self.rates_missing,
+            total_value=self.total_value.to_decimal(),
+            total_cost=self.total_cost.to_decimal(),
+            daily_change=self.daily_change.to_decimal(),
+            allocation=[[asset_type, str(value)] for asset_type, value in self.by_type.items()],
+            exposures={
+                "geography": [[label, str(value)] for label, value in self.geography.items()],
+                "sectors": [[label, str(value)] for label, value in self.sectors.items()],
+                "currencies": [[label, str(value)] for label, value in self.currencies.items()],
+            },
+            computed_at=timezone.now(),
+        )
+
+    def _pct(self, value, places):
+        return value.percent_of(self.total_value, places)
+
+    @cached_property
+    def snapshot(self):
+        """Portfolio-level value, cost, gain/loss and daily change."""
+        gain_loss = self.total_value - self.total_cost
+        prev_value = self.total_value - self.daily_change
+
+        dc = self.daily_change.to_decimal(2)
+        dc_pct = self.daily_change.percent_of(prev_value, 2)
+        sign = "+" if dc >= 0 else ""
+        daily_change_display = f"{sign}${dc} ({sign}{dc_pct}%)"
+
+        gl = gain_loss.to_decimal(2)
+        gl_pct = gain_loss.percent_of(self.total_cost, 2)
+        gl_sign = "+" if gl >= 0 else ""
+        gain_loss_display = f"{gl_sign}${gl} ({gl_sign}{gl_pct}%)"
+
+        return {
+            "total_value": self.total_value.to_decimal(2),
+            "total_cost": self.total_cost.to_decimal(2),
+            "gain_loss": gl,
+            "gain_loss_pct": gl_pct,
+            "gain_loss_display": gain_loss_display,
+            "daily_change": dc,
+            "daily_change_pct": dc_pct,
+            "daily_change_display": daily_change_display,
+            "rates_missing": self.rates_missing,
+        }
+
+    @cached_property
+    def allocation(self):
+        """Breakdown by asset type with chart data."""
+        type_labels = dict(Asset.ASSET_TYPE_CHOICES)
+        breakdown = []
+        labels = []
+        values = []
+
+        for asset_type, value in sorted(self.by_type.items(), key=lambda x: x[1], reverse=True):
+            label = str(type_labels.get(asset_type, asset_type))
+            pct_q = self._pct(value, 1)
+            val_q = value.to_decimal(2)
+            breakdown.append(
+                {
+                    "label": label,
+                    "value": val_q,
+                    "pct": pct_q,
+                    "display": f"{pct_q}% (${val_q})",
+                }
+            )
+            labels.append(label)
+            values.append(float(pct_q))
+
+        chart_data = json.dumps(
             {
-                "label": label,
-                "value": val_q,
-                "pct": pct_q,
-                "display": f"{pct_q}% (${val_q})",
+                "labels": labels,
+                "values": values,
+                "colors": CHART_COLORS[: len(labels)],
             }
         )
-        labels.append(label)
-        values.append(float(pct.quantize(Decimal("0.1"))))
-
-    chart_data = json.dumps(
-        {
-            "labels": labels,
-            "values": values,
-            "colors": CHART_COLORS[: len(labels)],
+
+        return {"breakdown": breakdown, "chart_data": chart_data}
+
+    @cached_property
+    def exposures(self):
+        """Breakdown by geography, sector and asset currency."""
+
+        def to_list(d):
+            return [
+                {"label": label, "pct": float(self._pct(value, 1))}
+                for label, value in sorted(d.items(), key=lambda x: x[1], reverse=True)
+            ]
+
+        return {
+            "geography": to_list(self.geography),
+            "sectors": to_list(self.sectors),
+            "currencies": to_list(self.currencies),
         }
+
+    @cached_property
+    def holdings_table(self):
+        """Per-holding rows for the detail table, largest position first."""
+        if self._rows is None:
+            self._rows = []
+            for position in _load_positions(self.portfolio):
+                quantity, average_cost, price = position[6:9]
+                self._rows.append((position, quantity * price, quantity * average_cost))
+            self._rates = self._conversion_rates({position[5] for position, _mv, _tc in self._rows})
+
+        rows = []
+        total_value = self.total_value.units
+        rates = self._rates
+
+        # Plain ints: Money objects would cost more than the Decimals they replace
+        for position, mv, tc in self._rows:
+            ticker, name = position[:2]
+            currency, quantity, average_cost, price = position[5:9]
+            if rates is not None:
+                mv = round_div(mv * rates[currency], RATE_SCALE)
+                tc = round_div(tc * rates[currency], RATE_SCALE)
+            gain_loss = mv - tc
+
+            rows.append(
+                {
+                    "ticker": ticker,
+                    "name": name,
+                    "currency": currency,
+                    "quantity": quantize(quantity, QUANTITY_PLACES, QUANTITY_PLACES),
+                    "avg_cost": quantize(average_cost, PRICE_PLACES, PRICE_PLACES),
+                    "current_price": quantize(price, PRICE_PLACES, PRICE_PLACES),
+                    "market_value": quantize(mv, VALUE_PLACES, 2),
+                    "gain_loss": quantize(gain_loss, VALUE_PLACES, 2),
+                    "gain_loss_pct": percent(gain_loss, tc, 2),
+                    "weight": percent(mv, total_value, 1),
+                }
+            )
+
+        return sorted(rows, key=lambda r: r["market_value"], reverse=True)
+
+    @instrumented
+    def clarity_score(self, user, progress=None):
+        """Compute % of asset types in portfolio that user has learned about.
+
+        An asset type counts once every lesson covering it is complete: a
+        bitwise check of the user's LearningProgress against the coverage
+        masks. Pass ``progress`` if it is already loaded.
+        """
+        if not self.asset_types:
+            return {"score": 0, "learned": 0, "total": 0}
+
+        completed = (progress or get_learning_progress(user)).mask
+        required = get_coverage_masks()
+
+        learned = 0
+        for at in self.asset_types:
+            mask = required.get(at, 0)
+            if mask and completed & mask == mask:
+                learned += 1
+
+        total = len(self.asset_types)
+        score = round(learned / total * 100) if total else 0
+
+        return {"score": score, "learned": learned, "total": total}
+
+
+def _store_valuations(valuations):
+    PortfolioValuation.objects.bulk_create(
+        valuations,
+        update_conflicts=True,
+        unique_fields=["portfolio"],
+        update_fields=[
+            "currency",
+            "rates_missing",
+            "total_value",
+            "total_cost",
+            "daily_change",
+            "allocation",
+            "exposures",
+            "computed_at",
+        ],
     )
+    return valuations
 
-    return {"breakdown": breakdown, "chart_data": chart_data}
 
+@instrumented
+def refresh_portfolio_valuations(portfolio_ids):
+    """Recompute the stored valuations of the given portfolios in bulk.
 
-def get_exposure_breakdown(portfolio):
-    """Break down portfolio by geography and sector."""
-    holdings = portfolio.holdings.select_related("asset").all()
+    Holdings for every affected portfolio are read in one query and the
+    valuations are upserted in one statement. Model signals call this for
+    single saves; code that changes prices or holdings in bulk
+    (``QuerySet.update``, ``bulk_create``) must call it explicitly.
+    """
+    holdings = {pk: [] for pk in set(portfolio_ids)}
+    if not holdings:
+        return []
+
+    rows = (
+        Holding.objects.filter(portfolio_id__in=holdings)
+        .select_related("asset")
+        .annotate(base_currency=base_currency("portfolio__user"))
+    )
+    for h in rows:
+        holdings[h.portfolio_id].append(h)
+    # Holdings carry their owner's base currency; empty portfolios need a lookup
+    empty = [pk for pk, rows in holdings.items() if not rows]
+    currencies = dict(Portfolio.objects.filter(pk__in=empty).values_list("pk", base_currency("user"))) if empty else {}
+
+    return _store_valuations(
+        [PortfolioAnalytics(Portfolio(pk=pk), rows, currencies.get(pk)).to_valuation() for pk, rows in holdings.items()]
+    )
 
-    geo = {}
-    sector = {}
-    total_value = Decimal("0")
 
-    for h in holdings:
-        mv = h.quantity * h.asset.current_price
-        total_value += mv
-        if h.asset.geography:
-            geo[h.asset.geography] = geo.get(h.asset.geography, Decimal("0")) + mv
-        if h.asset.sector:
-            sector[h.asset.sector] = sector.get(h.asset.sector, Decimal("0")) + mv
+@instrumented
+def get_portfolio_analytics(portfolio):
+    """Return analytics served from the stored valuation.
 
-    def to_list(d):
-        result = []
-        for label, value in sorted(d.items(), key=lambda x: x[1], reverse=True):
-            pct = (value / total_value * 100) if total_value else Decimal("0")
-            result.append({"label": label, "pct": float(pct.quantize(Decimal("0.1")))})
-        return result
+    A single indexed lookup on the common path; the valuation is computed
+    and stored the first time a portfolio is read, and again if the owner
+    has since changed their base currency.
+    """
+    valuation = (
+        PortfolioValuation.objects.filter(portfolio=portfolio)
+        .annotate(base_currency=base_currency("portfolio__user"))
+        .first()
+    )
+    if valuation is None or valuation.currency != valuation.base_currency:
+        analytics = PortfolioAnalytics(portfolio, currency=valuation.base_currency if valuation else None)
+        _store_valuations([analytics.to_valuation()])
+        return analytics
+    return PortfolioAnalytics.from_valuation(portfolio, valuation)
 
-    return {"geography": to_list(geo), "sectors": to_list(sector)}
 
+def get_dashboard_version(user):
+    """Version stamps of everything the dashboard shows, in one query.
 
-def get_clarity_score(user, portfolio):
-    """Compute % of asset types in portfolio that user has learned about."""
-    holdings = portfolio.holdings.select_related("asset").all()
-    asset_types = {h.asset.asset_type for h in holdings}
+    (portfolio id, name, valuation time, learning progress time, base
+    currency) for the user's dashboard portfolio, or None if they have
+    none. The valuation is refreshed whenever holdings, prices or exchange
+    rates change.
+    """
+    return (
+        Portfolio.objects.filter(user=user)
+        .values_list(
+            "pk", "name", "valuation__computed_at", "user__learning_progress__updated_at", base_currency("user")
+        )
+        .first()
+    )
 
-    if not asset_types:
-        return {"score": 0, "learned": 0, "total": 0}
 
-    completed_ids = set(LessonProgress.objects.filter(user=user).values_list("lesson_id", flat=True))
+def get_portfolio_version(user, pk):
+    """Version stamps of the portfolio detail page, in one query; None if not the user's.
+
+    (name, valuation time, latest transaction id, base currency).
+    """
+    latest_transaction = Transaction.objects.filter(portfolio=OuterRef("pk")).order_by("-pk").values("pk")[:1]
+    return (
+        Portfolio.objects.filter(pk=pk, user=user)
+        .values_list("name", "valuation__computed_at", Subquery(latest_transaction), base_currency("user"))
+        .first()
+    )
+
+
+def get_portfolio_snapshot(portfolio):
+    """Compute portfolio-level metrics from the stored valuation."""
+    return get_portfolio_analytics(portfolio).snapshot
+
+
+def get_allocation_breakdown(portfolio):
+    """Break down portfolio by asset type with chart data."""
+    return get_portfolio_analytics(portfolio).allocation
 
-    learned = 0
-    for at in asset_types:
-        required_lessons = ASSET_TYPE_LESSON_MAP.get(at, [])
-        if required_lessons and all(lid in completed_ids for lid in required_lessons):
-            learned += 1
 
-    total = len(asset_types)
-    score = round(learned / total * 100) if total else 0
+def get_exposure_breakdown(portfolio):
+    """Break down portfolio by geography, sector and asset currency."""
+    return get_portfolio_analytics(portfolio).exposures
+
 
-    return {"score": score, "learned": learned, "total": total}
+def get_clarity_score(user, portfolio):
+    """Compute % of asset types in portfolio that user has learned about."""
+    return get_portfolio_analytics(portfolio).clarity_score(user)
 
 
+@instrumented
 def get_holdings_table(portfolio):
     """Build a list of holding dicts for the detail table."""
-    holdings = portfolio.holdings.select_related("asset").all()
+    return PortfolioAnalytics(portfolio).holdings_table
 
-    total_value = sum(h.quantity * h.asset.current_price for h in holdings)
-    rows = []
 
-    for h in holdings:
-        mv = h.quantity * h.asset.current_price
-        tc = h.quantity * h.average_cost
-        gl = mv - tc
-        gl_pct = (gl / tc * 100) if tc else Decimal("0")
-        weight = (mv / total_value * 100) if total_value else Decimal("0")
+def compute_value_series(asset_index, day_index, quantities, prices):
+    """Daily portfolio value from transaction deltas and a price matrix.
 
-        rows.append(
-            {
-                "ticker": h.asset.ticker,
-                "name": h.asset.name,
-                "quantity": h.quantity,
-                "avg_cost": h.average_cost.quantize(Decimal("0.01")),
-                "current_price": h.asset.current_price.quantize(Decimal("0.01")),
-                "market_value": mv.quantize(Decimal("0.01")),
-                "gain_loss": gl.quantize(Decimal("0.01")),
-                "gain_loss_pct": gl_pct.quantize(Decimal("0.01")),
-                "weight": weight.quantize(Decimal("0.1")),
-            }
+    prices has shape (assets, days). Each transaction adds its signed
+    quantity at (asset_index, day_index); a cumulative sum along the day
+    axis gives the position matrix, which is weighted by prices and summed
+    per day. Days before an asset's first price count as zero value.
+    """
+    deltas = np.zeros(prices.shape)
+    np.add.at(deltas, (asset_index, day_index), quantities)
+    positions = np.cumsum(deltas, axis=1)
+    return np.einsum("ij,ij->j", positions, np.nan_to_num(prices))
+
+
+def _transaction_columns(portfolio):
+    """(asset ids, signed quantities, days) of the portfolio's transactions as NumPy arrays.
+
+    Cached per latest transaction id and count, so a price ingest, which
+    moves every valuation on, doesn't read the transactions again.
+    """
+    latest, count = portfolio.transactions.aggregate(latest=Max("pk"), count=Count("pk")).values()
+    if not count:
+        return None
+
+    def build():
+        asset_ids, tx_types, quantities, days = zip(
+            *portfolio.transactions.order_by().values_list(
+                "asset_id", "transaction_type", "quantity", Cast(TruncDate("executed_at"), output_field=CharField())
+            ),
+            strict=True,
+        )
+        signs = np.where(np.array(tx_types) == "buy", 1.0, -1.0)
+        return (
+            np.array(asset_ids, dtype=np.int64),
+            np.array(quantities, dtype=np.float64) * signs,
+            np.array(days, dtype="datetime64[D]"),
         )
 
-    return sorted(rows, key=lambda r: r["market_value"], reverse=True)
+    return cache.get_or_set(f"portfolio:transactions:{portfolio.pk}:{latest}:{count}", build, PERFORMANCE_CACHE_TIMEOUT)
+
+
+@instrumented
+def get_performance_series(portfolio, currency=None):
+    """Reconstruct the portfolio's daily market value from its transactions.
+
+    Returns Lightweight Charts points (``{"time": "YYYY-MM-DD", "value": float}``)
+    from the first transaction onwards, on the trading days present in the
+    price history, with a final point for today at current prices. Values
+    are in ``currency`` (the owner's base currency by default), converted
+    at today's rates. Transactions, price series and rates come from the
+    cache when unchanged, so after a price ingest this costs two small
+    queries and the NumPy work (three without ``currency``).
+    """
+    columns = _transaction_columns(portfolio)
+    if columns is None:
+        return []
+
+    tx_asset_ids, quantities, tx_days = columns
+    assets = Asset.objects.filter(pk__in=np.unique(tx_asset_ids).tolist()).order_by("pk")
+    asset_ids, current_prices, stamps, asset_currencies = zip(
+        *assets.values_list("pk", "current_price", "prices_updated_at", "currency"), strict=True
+    )
+    asset_index = np.searchsorted(np.array(asset_ids, dtype=np.int64), tx_asset_ids)
+    today = np.datetime64(timezone.localdate())
+
+    dates, prices = get_cached_price_matrix(
+        dict(zip(asset_ids, stamps, strict=True)), start=tx_days.min().item(), end=today.item()
+    )
+    current = np.array(current_prices, dtype=np.float64)
+    if not dates.size or dates[-1] < today:
+        dates = np.append(dates, today)
+        prices = np.hstack([prices, current[:, None]])
+    else:
+        # Assets with no bars yet are still worth their current price today
+        prices[:, -1] = np.where(np.isnan(prices[:, -1]), current, prices[:, -1])
+    factors, _missing = conversion_factors(currency or _owner_currency(portfolio), asset_currencies)
+    prices = prices * np.array([factors[c] for c in asset_currencies])[:, None]
+
+    day_index = np.searchsorted(dates, tx_days)
+    keep = day_index < len(dates)
+
+    values = compute_value_series(asset_index[keep], day_index[keep], quantities[keep], prices)
+    return [{"time": str(d), "value": round(float(v), 2)} for d, v in zip(dates, values, strict=True)]
+
+
+@instrumented
+def get_cached_performance_series(portfolio):
+    """Performance series cached per portfolio, valuation timestamp, transactions and currency.
+
+    The latest transaction id and the count move the key when a transaction
+    is recorded or deleted, so the chart doesn't wait for the TTL.
+    """
+    transactions = Transaction.objects.filter(portfolio=OuterRef("pk")).order_by().values("portfolio")
+    computed_at, latest, count, currency = (
+        Portfolio.objects.filter(pk=portfolio.pk)
+        .values_list(
+            "valuation__computed_at",
+            Subquery(transactions.annotate(latest=Max("pk")).values("latest")),
+            Subquery(transactions.annotate(count=Count("pk")).values("count")),
+            base_currency("user"),
+        )
+        .get()
+    )
+    stamp = computed_at.timestamp() if computed_at else 0
+    return cache.get_or_set(
+        f"portfolio:performance:{portfolio.pk}:{stamp}:{latest}:{count}:{currency}",
+        lambda: get_performance_series(portfolio, currency),
+        PERFORMANCE_CACHE_TIMEOUT,
+    )
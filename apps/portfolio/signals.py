@@ -0,0 +1,28 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.market_data.models import Asset
+
+from .models import Holding, PortfolioValuation
+from .services import VALUATION_ASSET_FIELDS, refresh_portfolio_valuations
+
+
+@receiver(post_save, sender=Asset)
+def refresh_valuations_on_asset_change(sender, instance, update_fields=None, **kwargs):
+    """Recompute valuations of every portfolio holding a repriced asset."""
+    if update_fields is not None and not VALUATION_ASSET_FIELDS.intersection(update_fields):
+        return
+    portfolio_ids = Holding.objects.filter(asset=instance).values_list("portfolio_id", flat=True)
+    refresh_portfolio_valuations(portfolio_ids)
+
+
+@receiver(post_save, sender=Holding)
+def refresh_valuation_on_holding_save(sender, instance, **kwargs):
+    refresh_portfolio_valuations([instance.portfolio_id])
+
+
+@receiver(post_delete, sender=Holding)
+def invalidate_valuation_on_holding_delete(sender, instance, **kwargs):
+    # Deleting (rather than recomputing) keeps portfolio cascades safe; the
+    # valuation is rebuilt lazily on the next read.
+    PortfolioValuation.objects.filter(portfolio_id=instance.portfolio_id).delete()
@@ -0,0 +1,43 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase
+
+from apps.portfolio.money import Money, percent, quantize, round_div, units_of
+
+
+class RoundingTest(SimpleTestCase):
+    def test_round_div_is_half_even(self):
+        assert [round_div(n, 2) for n in (1, 3, 5, -1, -3, -5)] == [0, 2, 2, 0, -2, -2]
+        assert round_div(7, -2) == -4
+
+    def test_quantize_matches_decimal(self):
+        for text in ("1.005000", "1.015000", "-2.345001", "-0.004999", "0.000000", "12.999999"):
+            expected = Decimal(text).quantize(Decimal("0.01"))
+            result = quantize(units_of(Decimal(text), 6), 6, 2)
+            assert (str(result), result) == (str(expected), expected)
+
+    def test_percent_matches_decimal(self):
+        for part, whole in ((1, 3), (-1, 3), (2, 3), (1, 8), (3, 8), (-1, 100_000), (5, 0)):
+            result = percent(part, whole, 1)
+            expected = (Decimal(part) / whole * 100).quantize(Decimal("0.1")) if whole else Decimal("0.0")
+            assert (str(result), result) == (str(expected), expected)
+
+
+class MoneyTest(SimpleTestCase):
+    def test_exact_conversion(self):
+        money = Money.from_decimal(Decimal("3000.5"))
+        assert money.units == 3_000_500_000
+        assert str(money) == "3000.500000"
+        with self.assertRaises(ValueError):
+            Money.from_decimal(Decimal("0.0000001"))
+
+    def test_arithmetic_aligns_scales(self):
+        assert Money(150, 2) + Money(1, 6) == Decimal("1.500001")
+        assert (Money(150, 2) - Money(1, 6)).places == 6
+        assert Money(100, 2) == 1
+        assert sorted([Money(3), Money(1, 2), Money(-2)]) == [Money(-2), Money(3), Money(1, 2)]
+
+    def test_display(self):
+        assert Money(1_234_565_000).to_decimal(2) == Decimal("1234.56")
+        assert Money(25, 2).percent_of(Money(100, 2), 1) == Decimal("25.0")
+        assert Money(1, 2).percent_of(Money(0), 2) == Decimal("0.00")
@@ -0,0 +1,475 @@
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import IntegrityError, transaction
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from apps.accounts.models import UserProfile
+from apps.education.models import LearningProgress, LessonProgress
+from apps.education.services import get_curriculum_layout, update_learning_progress
+from apps.market_data.models import Asset, FxRate, PriceBar
+from apps.market_data.services import ingest_fx_rates, ingest_price_bars
+from apps.portfolio import services
+from apps.portfolio.models import Holding, Portfolio, PortfolioValuation, Transaction
+from apps.portfolio.services import (
+    SANDBOX_ALLOCATIONS,
+    PortfolioAnalytics,
+    compute_value_series,
+    create_sandbox_portfolio,
+    create_sandbox_portfolios,
+    get_allocation_breakdown,
+    get_cached_performance_series,
+    get_performance_series,
+    get_portfolio_analytics,
+    get_portfolio_snapshot,
+    refresh_portfolio_valuations,
+)
+
+User = get_user_model()
+
+
+@override_settings(LANGUAGE_CODE="en")
+class PortfolioAnalyticsTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.portfolio = Portfolio.objects.create(user=self.user, name="Test")
+        etf = Asset.objects.create(
+            ticker="XEQT.TO",
+            name="iShares Core Equity ETF Portfolio",
+            asset_type="etf",
+            geography="Global",
+            sector="Multi-sector",
+            current_price=Decimal("30.00"),
+            previous_close=Decimal("29.00"),
+        )
+        stock = Asset.objects.create(
+            ticker="RY.TO",
+            name="Royal Bank of Canada",
+            asset_type="stock",
+            geography="Canada",
+            sector="Financials",
+            current_price=Decimal("100.00"),
+            previous_close=Decimal("100.00"),
+        )
+        Holding.objects.create(portfolio=self.portfolio, asset=etf, quantity=Decimal("100"), average_cost=Decimal("25"))
+        Holding.objects.create(
+            portfolio=self.portfolio, asset=stock, quantity=Decimal("10"), average_cost=Decimal("110")
+        )
+
+    def test_loads_holdings_once(self):
+        with self.assertNumQueries(1):
+            analytics = PortfolioAnalytics(self.portfolio)
+            assert analytics.snapshot
+            assert analytics.allocation
+            assert analytics.exposures
+            assert analytics.holdings_table
+
+    def test_snapshot(self):
+        snapshot = PortfolioAnalytics(self.portfolio).snapshot
+        assert snapshot["total_value"] == Decimal("4000.00")
+        assert snapshot["total_cost"] == Decimal("3600.00")
+        assert snapshot["gain_loss"] == Decimal("400.00")
+        assert snapshot["gain_loss_pct"] == Decimal("11.11")
+        assert snapshot["daily_change"] == Decimal("100.00")
+        assert snapshot["daily_change_display"] == "+$100.00 (+2.56%)"
+
+    def test_allocation(self):
+        allocation = PortfolioAnalytics(self.portfolio).allocation
+        assert [item["label"] for item in allocation["breakdown"]] == ["ETF", "Stock"]
+        assert allocation["breakdown"][0]["display"] == "75.0% ($3000.00)"
+
+    def test_exposures(self):
+        exposures = PortfolioAnalytics(self.portfolio).exposures
+        assert exposures["geography"] == [{"label": "Global", "pct": 75.0}, {"label": "Canada", "pct": 25.0}]
+        assert exposures["sectors"][1] == {"label": "Financials", "pct": 25.0}
+
+    def test_holdings_table(self):
+        rows = PortfolioAnalytics(self.portfolio).holdings_table
+        assert [r["ticker"] for r in rows] == ["XEQT.TO", "RY.TO"]
+        assert rows[1]["gain_loss"] == Decimal("-100.00")
+        assert rows[1]["weight"] == Decimal("25.0")
+
+    def test_clarity_score(self):
+        analytics = PortfolioAnalytics(self.portfolio)
+        assert analytics.clarity_score(self.user) == {"score": 0, "learned": 0, "total": 2}
+        LessonProgress.objects.create(user=self.user, lesson_id="L1-02")
+        update_learning_progress(self.user, "L1-02")
+        assert analytics.clarity_score(self.user) == {"score": 50, "learned": 1, "total": 2}
+
+    def test_clarity_score_needs_every_covering_lesson(self):
+        analytics = PortfolioAnalytics(self.portfolio)
+        layout = get_curriculum_layout()
+        masks = {"etf": layout.mask_of(["L1-02", "L5-01"]), "stock": layout.mask_of(["L1-01"])}
+        progress = LearningProgress(user=self.user)
+        progress.mask = layout.mask_of(["L1-02"])
+        with mock.patch.object(services, "get_coverage_masks", return_value=masks), self.assertNumQueries(0):
+            assert analytics.clarity_score(self.user, progress)["learned"] == 0
+            progress.mask |= layout.mask_of(["L5-01"])
+            assert analytics.clarity_score(self.user, progress)["learned"] == 1
+
+    def test_empty_portfolio(self):
+        portfolio = Portfolio.objects.create(user=self.user, name="Empty")
+        analytics = PortfolioAnalytics(portfolio)
+        assert analytics.snapshot["total_value"] == Decimal("0.00")
+        assert analytics.allocation["breakdown"] == []
+        assert analytics.holdings_table == []
+        assert analytics.clarity_score(self.user) == {"score": 0, "learned": 0, "total": 0}
+
+
+@override_settings(LANGUAGE_CODE="en")
+class PortfolioValuationTest(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.portfolio = Portfolio.objects.create(user=self.user, name="Test")
+        self.asset = Asset.objects.create(
+            ticker="XEQT.TO",
+            name="iShares Core Equity ETF Portfolio",
+            asset_type="etf",
+            current_price=Decimal("30.00"),
+            previous_close=Decimal("29.00"),
+        )
+        self.holding = Holding.objects.create(
+            portfolio=self.portfolio, asset=self.asset, quantity=Decimal("100"), average_cost=Decimal("25")
+        )
+
+    def test_holding_save_refreshes_valuation(self):
+        valuation = PortfolioValuation.objects.get(portfolio=self.portfolio)
+        assert valuation.total_value == Decimal("3000")
+        assert valuation.allocation == [["etf", "3000.000000"]]
+
+    def test_served_from_single_lookup(self):
+        with self.assertNumQueries(1):
+            snapshot = get_portfolio_snapshot(self.portfolio)
+        assert snapshot == PortfolioAnalytics(self.portfolio).snapshot
+
+    def test_matches_live_computation(self):
+        stored = get_portfolio_analytics(self.portfolio)
+        live = PortfolioAnalytics(self.portfolio)
+        assert stored.snapshot == live.snapshot
+        assert stored.allocation == live.allocation
+        assert stored.exposures == live.exposures
+        assert stored.holdings_table == live.holdings_table
+
+    def test_price_change_refreshes_valuation(self):
+        self.asset.current_price = Decimal("40.00")
+        self.asset.save()
+        assert get_portfolio_snapshot(self.portfolio)["total_value"] == Decimal("4000.00")
+
+    def test_unrelated_asset_update_skips_refresh(self):
+        with self.assertNumQueries(1):
+            self.asset.save(update_fields=["description"])
+
+    def test_holding_delete_invalidates_valuation(self):
+        self.holding.delete()
+        assert not PortfolioValuation.objects.filter(portfolio=self.portfolio).exists()
+        assert get_allocation_breakdown(self.portfolio)["breakdown"] == []
+        assert PortfolioValuation.objects.filter(portfolio=self.portfolio).exists()
+
+    def test_bulk_refresh_after_queryset_update(self):
+        other = Portfolio.objects.create(user=self.user, name="Other")
+        Holding.objects.create(portfolio=other, asset=self.asset, quantity=Decimal("1"), average_cost=Decimal("25"))
+        Asset.objects.filter(pk=self.asset.pk).update(current_price=Decimal("50.00"))
+
+        with self.assertNumQueries(2):
+            refresh_portfolio_valuations([self.portfolio.pk, other.pk])
+
+        totals = dict(PortfolioValuation.objects.values_list("portfolio_id", "total_value"))
+        assert totals == {self.portfolio.pk: Decimal("5000"), other.pk: Decimal("50")}
+
+    def test_portfolio_delete_cascades(self):
+        self.portfolio.delete()
+        assert not PortfolioValuation.objects.exists()
+
+
+@override_settings(LANGUAGE_CODE="en")
+class MultiCurrencyTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.profile = UserProfile.objects.create(user=self.user)
+        self.portfolio = Portfolio.objects.create(user=self.user, name="Test")
+        ingest_fx_rates([FxRate(currency="USD", date=timezone.localdate(), rate=Decimal("1.25"))])
+        cad = Asset.objects.create(
+            ticker="XIC.TO",
+            name="XIC",
+            asset_type="etf",
+            geography="Canada",
+            current_price=Decimal("30.00"),
+            previous_close=Decimal("30.00"),
+        )
+        usd = Asset.objects.create(
+            ticker="SPY",
+            name="SPY",
+            asset_type="stock",
+            currency="USD",
+            geography="United States",
+            current_price=Decimal("100.00"),
+            previous_close=Decimal("98.00"),
+        )
+        Holding.objects.create(portfolio=self.portfolio, asset=cad, quantity=Decimal("50"), average_cost=Decimal("20"))
+        Holding.objects.create(portfolio=self.portfolio, asset=usd, quantity=Decimal("10"), average_cost=Decimal("80"))
+
+    def test_converts_to_base_currency(self):
+        analytics = PortfolioAnalytics(self.portfolio)
+        assert analytics.currency == "CAD"
+        # 1500 CAD + 1000 USD at 1.25
+        assert analytics.snapshot["total_value"] == Decimal("2750.00")
+        assert analytics.snapshot["total_cost"] == Decimal("2000.00")
+        assert analytics.snapshot["daily_change"] == Decimal("25.00")
+        assert analytics.exposures["geography"] == [
+            {"label": "Canada", "pct": 54.5},
+            {"label": "United States", "pct": 45.5},
+        ]
+        assert analytics.exposures["currencies"] == [{"label": "CAD", "pct": 54.5}, {"label": "USD", "pct": 45.5}]
+
+    def test_holdings_table_in_base_currency(self):
+        spy = next(row for row in PortfolioAnalytics(self.portfolio).holdings_table if row["ticker"] == "SPY")
+        assert spy["currency"] == "USD"
+        assert spy["current_price"] == Decimal("100.00")
+        assert (spy["market_value"], spy["gain_loss"], spy["weight"]) == (Decimal("1250.00"), Decimal("250.00"), 45.5)
+
+    def test_base_currency_change_recomputes_valuation(self):
+        assert get_portfolio_snapshot(self.portfolio)["total_value"] == Decimal("2750.00")
+        self.profile.base_currency = "USD"
+        self.profile.save()
+
+        analytics = get_portfolio_analytics(self.portfolio)
+        assert analytics.currency == "USD"
+        assert analytics.snapshot["total_value"] == Decimal("2200.00")
+        assert PortfolioValuation.objects.get(portfolio=self.portfolio).currency == "USD"
+        with self.assertNumQueries(1):
+            assert get_portfolio_analytics(self.portfolio).snapshot == analytics.snapshot
+
+    def test_stored_valuation_matches_live(self):
+        stored = get_portfolio_analytics(self.portfolio)
+        live = PortfolioAnalytics(self.portfolio)
+        assert stored.exposures == live.exposures
+        assert stored.holdings_table == live.holdings_table
+
+    def test_rates_read_once(self):
+        PortfolioAnalytics(self.portfolio)
+        with self.assertNumQueries(1):
+            assert PortfolioAnalytics(self.portfolio).holdings_table
+
+    def test_single_currency_skips_rates(self):
+        Holding.objects.filter(asset__ticker="SPY").delete()
+        with mock.patch.object(services, "get_conversion_rates") as get_conversion_rates:
+            assert PortfolioAnalytics(self.portfolio).holdings_table
+            assert services.conversion_factors("CAD", {"CAD"}) == ({"CAD": 1.0}, False)
+        get_conversion_rates.assert_not_called()
+
+    def test_missing_rate_counts_at_face_value(self):
+        FxRate.objects.all().delete()
+        cache.clear()
+        analytics = PortfolioAnalytics(self.portfolio)
+        assert analytics.rates_missing
+        assert analytics.snapshot["rates_missing"]
+        # 1500 CAD + 1000 USD, unconverted
+        assert analytics.snapshot["total_value"] == Decimal("2500.00")
+        assert analytics.exposures["currencies"] == [{"label": "CAD", "pct": 60.0}, {"label": "USD", "pct": 40.0}]
+        spy = next(row for row in analytics.holdings_table if row["ticker"] == "SPY")
+        assert spy["market_value"] == Decimal("1000.00")
+
+    def test_missing_rate_is_stored(self):
+        FxRate.objects.all().delete()
+        cache.clear()
+        Holding.objects.filter(portfolio=self.portfolio).delete()
+        spy = Asset.objects.get(ticker="SPY")
+        # The post_save signal values the portfolio without a rate
+        Holding.objects.create(portfolio=self.portfolio, asset=spy, quantity=Decimal("1"), average_cost=Decimal("1"))
+
+        valuation = PortfolioValuation.objects.get(portfolio=self.portfolio)
+        assert valuation.rates_missing
+        assert get_portfolio_analytics(self.portfolio).snapshot["rates_missing"]
+
+        ingest_fx_rates([FxRate(currency="USD", date=timezone.localdate(), rate=Decimal("1.25"))])
+        refresh_portfolio_valuations([self.portfolio.pk])
+        assert not get_portfolio_analytics(self.portfolio).rates_missing
+
+    def test_empty_portfolio_in_owner_currency(self):
+        self.profile.base_currency = "USD"
+        self.profile.save()
+        empty = Portfolio.objects.create(user=self.user, name="Empty")
+        assert get_portfolio_analytics(empty).currency == "USD"
+        with self.assertNumQueries(1):
+            assert get_portfolio_analytics(empty).currency == "USD"
+
+
+class PerformanceSeriesTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.portfolio = Portfolio.objects.create(user=self.user, name="Test")
+        self.etf = Asset.objects.create(ticker="XEQT.TO", name="XEQT", asset_type="etf", current_price=Decimal("12"))
+        self.stock = Asset.objects.create(ticker="RY.TO", name="RY", asset_type="stock", current_price=Decimal("100"))
+        today = timezone.localdate()
+        self.days = [today - timedelta(days=n) for n in (4, 3, 2, 1)]
+        ingest_price_bars(
+            [
+                PriceBar(asset=self.etf, date=d, close=close)
+                for d, close in zip(self.days, [10, 11, 12, 13], strict=True)
+            ]
+            + [PriceBar(asset=self.stock, date=d, close=100.0) for d in self.days[1:]]
+        )
+
+    def _tx(self, asset, tx_type, quantity, day):
+        at = timezone.make_aware(datetime.combine(day, time(12)))
+        Transaction.objects.create(
+            portfolio=self.portfolio,
+            asset=asset,
+            transaction_type=tx_type,
+            quantity=Decimal(quantity),
+            price=Decimal("1"),
+            executed_at=at,
+        )
+
+    def test_empty_portfolio(self):
+        assert get_performance_series(self.portfolio) == []
+
+    def test_reconstructs_daily_values(self):
+        self._tx(self.etf, "buy", "10", self.days[0])
+        self._tx(self.stock, "buy", "1", self.days[2])
+        self._tx(self.etf, "sell", "4", self.days[3])
+
+        series = get_performance_series(self.portfolio)
+
+        assert [point["time"] for point in series] == [str(d) for d in self.days] + [str(timezone.localdate())]
+        assert [point["value"] for point in series] == [100.0, 110.0, 220.0, 178.0, 172.0]
+
+    def test_compute_value_series_accumulates_positions(self):
+        prices = np.array([[1.0, 2.0, 3.0], [np.nan, 10.0, 10.0]])
+        values = compute_value_series(np.array([0, 1, 0]), np.array([0, 1, 2]), np.array([1.0, 2.0, -1.0]), prices)
+        np.testing.assert_array_equal(values, [1.0, 22.0, 20.0])
+
+    def test_cached_series(self):
+        self._tx(self.etf, "buy", "1", self.days[0])
+        first = get_cached_performance_series(self.portfolio)
+        with self.assertNumQueries(1):
+            assert get_cached_performance_series(self.portfolio) == first
+
+    def test_cached_series_shows_new_transactions(self):
+        self._tx(self.etf, "buy", "1", self.days[0])
+        first = get_cached_performance_series(self.portfolio)
+        self._tx(self.etf, "buy", "1", self.days[0])
+        assert [point["value"] for point in get_cached_performance_series(self.portfolio)] == [
+            2 * point["value"] for point in first
+        ]
+
+    def test_series_after_price_ingest(self):
+        self._tx(self.etf, "buy", "10", self.days[0])
+        get_performance_series(self.portfolio)
+        ingest_price_bars([PriceBar(asset=self.etf, date=self.days[3], close=20.0)])
+        # Transactions and the other assets' prices come from the cache
+        with self.assertNumQueries(3):
+            series = get_performance_series(self.portfolio, "CAD")
+        assert series[3]["value"] == 200.0
+
+    def test_final_day_with_one_bar(self):
+        unpriced = Asset.objects.create(ticker="NEW.TO", name="NEW", asset_type="stock", current_price=Decimal("50"))
+        self._tx(self.etf, "buy", "10", self.days[0])
+        self._tx(self.stock, "buy", "1", self.days[1])
+        self._tx(unpriced, "buy", "2", self.days[2])
+        today = timezone.localdate()
+        ingest_price_bars([PriceBar(asset=self.etf, date=today, close=14.0)])
+        series = get_performance_series(self.portfolio)
+        # RY.TO carries yesterday's close; NEW.TO, with no bars yet, its current price
+        assert series[-1] == {"time": str(today), "value": 340.0}
+
+    def test_series_in_base_currency(self):
+        Asset.objects.filter(pk=self.etf.pk).update(currency="USD")
+        ingest_fx_rates([FxRate(currency="USD", date=self.days[0], rate=Decimal("1.25"))])
+        self._tx(self.etf, "buy", "10", self.days[0])
+        values = [point["value"] for point in get_performance_series(self.portfolio)]
+        assert values == [125.0, 137.5, 150.0, 162.5, 150.0]
+
+    def test_series_without_exchange_rates(self):
+        Asset.objects.filter(pk=self.etf.pk).update(currency="USD")
+        self._tx(self.etf, "buy", "10", self.days[0])
+        values = [point["value"] for point in get_performance_series(self.portfolio)]
+        assert values == [100.0, 110.0, 120.0, 130.0, 120.0]
+
+
+class SandboxPortfolioTest(TestCase):
+    def setUp(self):
+        call_command("seed_assets", stdout=StringIO())
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        UserProfile.objects.create(user=self.user, risk_profile_score=8)
+
+    def test_creates_holdings_transactions_and_valuation(self):
+        portfolio = create_sandbox_portfolio(self.user)
+        tickers = sorted(ticker for ticker, _ in SANDBOX_ALLOCATIONS["growth"])
+        assert sorted(portfolio.holdings.values_list("asset__ticker", flat=True)) == tickers
+        assert portfolio.transactions.filter(transaction_type="buy").count() == len(tickers)
+        valuation = PortfolioValuation.objects.get(portfolio=portfolio)
+        assert valuation.total_value == PortfolioAnalytics(portfolio).total_value
+
+    def test_sandbox_without_exchange_rates(self):
+        cache.clear()
+        self.user.profile.base_currency = "USD"
+        self.user.profile.save()
+        portfolio = create_sandbox_portfolio(self.user)
+        valuation = PortfolioValuation.objects.get(portfolio=portfolio)
+        assert (valuation.currency, valuation.rates_missing) == ("USD", True)
+
+    def test_query_count(self):
+        # sandbox check, portfolio, assets, holdings, transactions, valuation + savepoint pair
+        # (the profile is already cached on the user)
+        with self.assertNumQueries(8):
+            create_sandbox_portfolio(self.user)
+
+    def test_idempotent(self):
+        portfolio = create_sandbox_portfolio(self.user)
+        with self.assertNumQueries(1):
+            assert create_sandbox_portfolio(self.user) == portfolio
+        assert Holding.objects.filter(portfolio=portfolio).count() == len(SANDBOX_ALLOCATIONS["growth"])
+
+    def test_one_sandbox_per_user(self):
+        Portfolio.objects.create(user=self.user, name="Sandbox", is_sandbox=True)
+        Portfolio.objects.create(user=self.user, name="Real")
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            Portfolio.objects.create(user=self.user, name="Sandbox 2", is_sandbox=True)
+
+    def test_concurrent_creation_returns_winner(self):
+        def race(score):
+            # Another request creates the sandbox between our check and insert
+            Portfolio.objects.create(user=self.user, name="Winner", is_sandbox=True)
+            return "growth"
+
+        with mock.patch.object(services, "_get_risk_tier", side_effect=race):
+            portfolio = create_sandbox_portfolio(self.user)
+        assert portfolio.name == "Winner"
+        assert Portfolio.objects.filter(user=self.user).count() == 1
+        assert not Holding.objects.exists()
+
+    def test_creates_missing_assets(self):
+        Asset.objects.filter(ticker="SHOP.TO").delete()
+        portfolio = create_sandbox_portfolio(self.user)
+        assert portfolio.holdings.filter(asset__ticker="SHOP.TO", asset__asset_type="cash").exists()
+
+    def test_bulk(self):
+        existing = create_sandbox_portfolio(self.user)
+        users = [self.user]
+        for i, score in enumerate([2, 5, None]):
+            user = User.objects.create_user(username=f"user{i}", email=f"user{i}@example.com", password="x")
+            if score is not None:
+                UserProfile.objects.create(user=user, risk_profile_score=score)
+            users.append(user)
+
+        # existing sandboxes, profiles, portfolios, assets, holdings, transactions, valuations
+        # + savepoint pair
+        with self.assertNumQueries(9):
+            sandboxes = create_sandbox_portfolios(users)
+
+        assert sandboxes[self.user.pk] == existing
+        assert len(sandboxes) == 4
+        counts = [Holding.objects.filter(portfolio=sandboxes[user.pk]).count() for user in users[1:]]
+        assert counts == [len(SANDBOX_ALLOCATIONS[tier]) for tier in ("conservative", "moderate", "conservative")]
+        assert PortfolioValuation.objects.filter(portfolio__in=sandboxes.values()).count() == 4
+        assert create_sandbox_portfolios(users) == sandboxes
@@ -1 +1,188 @@
-# Portfolio view tests
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from apps.accounts.models import UserProfile
+from apps.market_data.models import Asset
+from apps.portfolio.models import Portfolio
+from apps.portfolio.services import create_sandbox_portfolio
+
+User = get_user_model()
+
+
+class PortfolioViewTestMixin:
+    def setUp(self):
+        cache.clear()
+        call_command("seed_assets", stdout=StringIO())
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        UserProfile.objects.create(user=self.user, risk_profile_score=5, onboarding_completed=True)
+        self.portfolio = create_sandbox_portfolio(self.user)
+        self.client.login(email="test@example.com", password="testpass123")
+
+
+class DashboardViewTest(PortfolioViewTestMixin, TestCase):
+    def test_redirect_when_not_authenticated(self):
+        self.client.logout()
+        response = self.client.get("/dashboard/")
+        assert response.status_code == 302
+
+    def test_redirects_to_onboarding_without_portfolio(self):
+        self.portfolio.delete()
+        response = self.client.get("/dashboard/")
+        assert response.status_code == 302
+        assert response["Location"] == "/accounts/onboarding/"
+
+    def test_dashboard_returns_200(self):
+        response = self.client.get("/dashboard/")
+        assert response.status_code == 200
+        self.assertTemplateUsed(response, "pages/dashboard.html")
+        assert response.context["snapshot"]["total_value"] > 0
+        assert response.context["clarity"]["total"] == 2
+
+    @override_settings(LANGUAGE_CODE="en")
+    def test_dashboard_without_exchange_rates(self):
+        UserProfile.objects.filter(user=self.user).update(base_currency="USD")
+        response = self.client.get("/dashboard/")
+        assert response.status_code == 200
+        assert response.context["snapshot"]["rates_missing"]
+        self.assertContains(response, "Exchange rates aren")
+
+        response = self.client.get(f"/portfolio/{self.portfolio.pk}/")
+        assert response.status_code == 200
+        assert response.context["snapshot"]["rates_missing"]
+
+    def test_dashboard_query_count(self):
+        # The first visit builds the learning-progress aggregate
+        self.client.get("/dashboard/")
+        # session, user, version stamps, portfolio, valuation, learning progress
+        with self.assertNumQueries(6):
+            self.client.get("/dashboard/")
+
+
+class ConditionalGetTest(PortfolioViewTestMixin, TestCase):
+    def test_unchanged_dashboard_is_not_modified(self):
+        self.client.get("/dashboard/")
+        response = self.client.get("/dashboard/")
+        assert "private" in response["Cache-Control"]
+        # session, user, version stamps
+        with self.assertNumQueries(3):
+            response = self.client.get("/dashboard/", headers={"if-none-match": response["ETag"]})
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_progress_and_prices_change_the_dashboard(self):
+        self.client.get("/dashboard/")
+        etag = self.client.get("/dashboard/")["ETag"]
+        self.client.post("/learn/L0-01/complete/")
+        assert self.client.get("/dashboard/", headers={"if-none-match": etag}).status_code == 200
+
+        etag = self.client.get("/dashboard/")["ETag"]
+        asset = Asset.objects.get(ticker="XEQT.TO")
+        asset.current_price += 1
+        asset.save()
+        assert self.client.get("/dashboard/", headers={"if-none-match": etag}).status_code == 200
+
+    def test_rename_changes_the_dashboard(self):
+        self.client.get("/dashboard/")
+        etag = self.client.get("/dashboard/")["ETag"]
+        self.portfolio.name = "Renamed"
+        self.portfolio.save()
+        response = self.client.get("/dashboard/", headers={"if-none-match": etag})
+        assert response.status_code == 200
+        self.assertContains(response, "Renamed")
+
+    def test_language_changes_the_dashboard(self):
+        self.client.get("/dashboard/")
+        etag = self.client.get("/dashboard/")["ETag"]
+        response = self.client.get("/dashboard/", headers={"if-none-match": etag, "accept-language": "en"})
+        assert response.status_code == 200
+
+    def test_portfolio_detail(self):
+        path = f"/portfolio/{self.portfolio.pk}/"
+        # The first view stores the valuation the ETag is based on
+        self.client.get(path)
+        etag = self.client.get(path)["ETag"]
+        assert self.client.get(path, headers={"if-none-match": etag}).status_code == 304
+        holding = self.portfolio.holdings.first()
+        holding.quantity += 1
+        holding.save()
+        assert self.client.get(path, headers={"if-none-match": etag}).status_code == 200
+
+    def test_other_users_portfolio_is_still_404(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        self.client.force_login(other)
+        assert self.client.get(f"/portfolio/{self.portfolio.pk}/", headers={"if-none-match": "*"}).status_code == 404
+
+
+@override_settings(CONCURRENT_CARDS=True, ROOT_URLCONF="config.urls_async")
+class ConcurrentCardsTest(PortfolioViewTestMixin, TransactionTestCase):
+    # Cards run on their own connections, which only see committed data
+
+    async def test_dashboard_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        await self.async_client.get("/dashboard/")
+        response = await self.async_client.get("/dashboard/")
+        assert response.status_code == 200
+        assert response.context["clarity"]["total"] == 2
+        assert response.context["next_lesson"]["id"] == "L0-01"
+        response = await self.async_client.get("/dashboard/", headers={"if-none-match": response["ETag"]})
+        assert response.status_code == 304
+
+    async def test_portfolio_detail_under_asgi(self):
+        await self.async_client.aforce_login(self.user)
+        response = await self.async_client.get(f"/portfolio/{self.portfolio.pk}/")
+        assert response.status_code == 200
+        assert len(response.context["holdings"]) == 4
+        assert len(response.context["transactions"]) == 4
+
+    def test_card_queries_are_counted(self):
+        self.client.get("/dashboard/")
+        response = self.client.get("/dashboard/")
+        # Same six queries as serially, three of them on the cards' threads
+        assert '"6 queries"' in response["Server-Timing"]
+
+    def test_other_pages_stay_routed(self):
+        response = self.client.get(f"/portfolio/{self.portfolio.pk}/performance.json")
+        assert response.status_code == 200
+
+
+class PortfolioDetailViewTest(PortfolioViewTestMixin, TestCase):
+    def test_detail_returns_200(self):
+        response = self.client.get(f"/portfolio/{self.portfolio.pk}/")
+        assert response.status_code == 200
+        self.assertTemplateUsed(response, "portfolio/detail.html")
+        assert len(response.context["holdings"]) == 4
+
+    def test_detail_other_user_returns_404(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        portfolio = Portfolio.objects.create(user=other, name="Other")
+        response = self.client.get(f"/portfolio/{portfolio.pk}/")
+        assert response.status_code == 404
+
+    def test_detail_query_count(self):
+        # The first visit stores the valuation
+        self.client.get(f"/portfolio/{self.portfolio.pk}/")
+        # session, user, version stamps, portfolio, holdings, transactions
+        with self.assertNumQueries(6):
+            self.client.get(f"/portfolio/{self.portfolio.pk}/")
+
+    def test_performance_endpoint(self):
+        response = self.client.get(f"/portfolio/{self.portfolio.pk}/performance.json")
+        assert response.status_code == 200
+        series = response.json()
+        assert len(series) == 1
+        assert series[0]["value"] > 0
+
+    def test_performance_endpoint_other_user_returns_404(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        portfolio = Portfolio.objects.create(user=other, name="Other")
+        response = self.client.get(f"/portfolio/{portfolio.pk}/performance.json")
+        assert response.status_code == 404
+
+    def test_list_redirects_to_single_portfolio(self):
+        response = self.client.get("/portfolio/")
+        assert response.status_code == 302
+        assert response["Location"] == f"/portfolio/{self.portfolio.pk}/"
@@ -7,4 +7,5 @@ app_name = "portfolio"
 urlpatterns = [
     path("", views.portfolio_list, name="list"),
     path("<int:pk>/", views.portfolio_detail, name="detail"),
+    path("<int:pk>/performance.json", views.portfolio_performance, name="performance"),
 ]
@@ -1,45 +1,136 @@
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from functools import cache, wraps
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib.auth.decorators import login_required
-from django.shortcuts import get_object_or_404, redirect, render
+from django.contrib.messages import get_messages
+from django.db import close_old_connections
+from django.http import JsonResponse
+from django.shortcuts import aget_object_or_404, get_object_or_404, redirect, render
+from django.template import engines
+from django.utils.translation import get_language
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition
 
-from apps.education.services import get_next_lesson
+from apps.education.services import get_curriculum_version, get_learning_progress, get_next_lesson
 
 from .models import Portfolio
 from .services import (
-    get_allocation_breakdown,
-    get_clarity_score,
-    get_exposure_breakdown,
-    get_holdings_table,
-    get_portfolio_snapshot,
+    PortfolioAnalytics,
+    get_cached_performance_series,
+    get_dashboard_version,
+    get_portfolio_analytics,
+    get_portfolio_version,
+    refresh_portfolio_valuations,
 )
 
 
-@login_required
-def dashboard_view(request):
-    """Main dashboard showing portfolio overview."""
-    portfolio = Portfolio.objects.filter(user=request.user).first()
-    if not portfolio:
-        return redirect("accounts:onboarding")
+def _deployed_files():
+    """Digest of the templates and frontend manifest; changes with each release."""
+    dirs = [Path(d) for engine in engines.all() for d in engine.template_dirs]
+    files = sorted(f for d in dirs if d.is_dir() for f in d.rglob("*.html"))
+    manifest = settings.DJANGO_VITE["default"].get("manifest_path")
+    if manifest:
+        files.append(Path(manifest))
+    digest = hashlib.sha256()
+    for path in files:
+        if path.exists():
+            stat = path.stat()
+            digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size};".encode())
+    return digest.hexdigest()
+
+
+_release = cache(_deployed_files)
+
+
+def _page_etag(request, *versions):
+    """ETag of a page rendered from ``versions``; None skips validation.
+
+    Also covers the language, the deployed templates and the CSRF cookie,
+    since pages embed a token. Pages with pending messages always render:
+    a message is only shown once.
+    """
+    if None in versions or get_messages(request):
+        return None
+    release = _deployed_files() if settings.DEBUG else _release()
+    parts = (request.user.pk, get_language(), request.COOKIES.get(settings.CSRF_COOKIE_NAME), release, *versions)
+    return hashlib.sha256(repr(parts).encode()).hexdigest()[:32]
+
+
+def _dashboard_etag(request):
+    version = get_dashboard_version(request.user)
+    return _page_etag(request, get_curriculum_version(), *version) if version else None
+
+
+def _portfolio_detail_etag(request, pk):
+    version = get_portfolio_version(request.user, pk)
+    return _page_etag(request, *version) if version else None
+
+
+def _learning_cards(user):
+    progress = get_learning_progress(user)
+    return progress, get_next_lesson(user, progress=progress)
+
+
+def _transactions(portfolio):
+    return list(portfolio.transactions.select_related("asset")[:20])
 
-    snapshot = get_portfolio_snapshot(portfolio)
-    allocation = get_allocation_breakdown(portfolio)
-    exposures = get_exposure_breakdown(portfolio)
-    clarity = get_clarity_score(request.user, portfolio)
-    next_lesson = get_next_lesson(request.user)
 
+def _detail_analytics(portfolio):
+    analytics = PortfolioAnalytics(portfolio)
+    if not hasattr(portfolio, "valuation"):
+        # Stored so the next view can be validated against it
+        refresh_portfolio_valuations([portfolio.pk])
+    return analytics
+
+
+def _dashboard_page(request, portfolio, analytics, progress, next_lesson):
     return render(
         request,
         "pages/dashboard.html",
         {
             "portfolio": portfolio,
-            "snapshot": snapshot,
-            "allocation": allocation,
-            "exposures": exposures,
-            "clarity": clarity,
+            "snapshot": analytics.snapshot,
+            "allocation": analytics.allocation,
+            "exposures": analytics.exposures,
+            "clarity": analytics.clarity_score(request.user, progress),
             "next_lesson": next_lesson,
         },
     )
 
 
+def _detail_page(request, portfolio, analytics, transactions):
+    return render(
+        request,
+        "portfolio/detail.html",
+        {
+            "portfolio": portfolio,
+            "snapshot": analytics.snapshot,
+            "allocation": analytics.allocation,
+            "holdings": analytics.holdings_table,
+            "base_currency": analytics.currency,
+            "transactions": transactions,
+        },
+    )
+
+
+# Browsers revalidate on every view; unchanged pages come back as a bodiless 304
+@login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_dashboard_etag)
+def dashboard_view(request):
+    """Main dashboard showing portfolio overview."""
+    portfolio = Portfolio.objects.filter(user=request.user).first()
+    if not portfolio:
+        return redirect("accounts:onboarding")
+
+    return _dashboard_page(request, portfolio, get_portfolio_analytics(portfolio), *_learning_cards(request.user))
+
+
 @login_required
 def portfolio_list(request):
     """List user portfolios, redirect to detail if only one."""
@@ -50,22 +141,97 @@ def portfolio_list(request):
 
 
 @login_required
+@cache_control(private=True, no_cache=True)
+@condition(etag_func=_portfolio_detail_etag)
 def portfolio_detail(request, pk):
     """Show portfolio detail with holdings and transactions."""
+    portfolio = get_object_or_404(Portfolio.objects.select_related("valuation"), pk=pk, user=request.user)
+    return _detail_page(request, portfolio, _detail_analytics(portfolio), _transactions(portfolio))
+
+
+@login_required
+def portfolio_performance(request, pk):
+    """JSON daily value series for the performance chart."""
     portfolio = get_object_or_404(Portfolio, pk=pk, user=request.user)
-    snapshot = get_portfolio_snapshot(portfolio)
-    allocation = get_allocation_breakdown(portfolio)
-    holdings = get_holdings_table(portfolio)
-    transactions = portfolio.transactions.select_related("asset").all()[:20]
+    return JsonResponse(get_cached_performance_series(portfolio), safe=False)
 
-    return render(
-        request,
-        "portfolio/detail.html",
-        {
-            "portfolio": portfolio,
-            "snapshot": snapshot,
-            "allocation": allocation,
-            "holdings": holdings,
-            "transactions": transactions,
-        },
+
+# Async variants, served by config.urls_async when CONCURRENT_CARDS is on.
+# They only pay off under uvicorn: gunicorn would start an event loop per request.
+
+
+def _conditional_page(etag_func):
+    """condition() for async page views.
+
+    Resolves the user once (login_required already awaited it) and runs
+    ``etag_func`` off the event loop, since it queries the database.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            request.user = await request.auser()
+            etag = await sync_to_async(etag_func)(request, *args, **kwargs)
+            return await condition(etag_func=lambda *_, **__: etag)(view)(request, *args, **kwargs)
+
+        return inner
+
+    return decorator
+
+
+# Most cards a page loads at once
+CARD_THREADS = 4
+
+
+@cache
+def _card_executor():
+    # Lives as long as the process, so its threads keep their connections
+    # open between requests for up to CONN_MAX_AGE
+    return ThreadPoolExecutor(max_workers=CARD_THREADS, thread_name_prefix="card")
+
+
+def _card(func):
+    """Awaitable ``func`` for loading one part of a page.
+
+    Each call runs on a card thread with its own database connection, so a
+    page's cards load at the same time.
+    """
+
+    @wraps(func)
+    def run(*args, **kwargs):
+        close_old_connections()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            close_old_connections()
+
+    return sync_to_async(run, thread_sensitive=False, executor=_card_executor())
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@_conditional_page(_dashboard_etag)
+async def adashboard_view(request):
+    """dashboard_view with its cards loaded concurrently."""
+    portfolio = await Portfolio.objects.filter(user=request.user).afirst()
+    if not portfolio:
+        return redirect("accounts:onboarding")
+
+    analytics, (progress, next_lesson) = await asyncio.gather(
+        _card(get_portfolio_analytics)(portfolio),
+        _card(_learning_cards)(request.user),
+    )
+    return await sync_to_async(_dashboard_page)(request, portfolio, analytics, progress, next_lesson)
+
+
+@login_required
+@cache_control(private=True, no_cache=True)
+@_conditional_page(_portfolio_detail_etag)
+async def aportfolio_detail(request, pk):
+    """portfolio_detail with holdings and transactions loaded concurrently."""
+    portfolio = await aget_object_or_404(Portfolio.objects.select_related("valuation"), pk=pk, user=request.user)
+    analytics, transactions = await asyncio.gather(
+        _card(_detail_analytics)(portfolio),
+        _card(_transactions)(portfolio),
     )
+    return await sync_to_async(_detail_page)(request, portfolio, analytics, transactions)
@@ -1 +1,27 @@
-# Scenarios forms
+from django import forms
+from django.utils.translation import gettext_lazy as _
+
+from .services import SHOCKS
+
+
+class StressTestForm(forms.Form):
+    shock = forms.ChoiceField(choices=[(key, shock["label"]) for key, shock in SHOCKS.items()])
+    magnitude = forms.FloatField()
+
+    def clean(self):
+        cleaned_data = super().clean()
+        shock = cleaned_data.get("shock")
+        magnitude = cleaned_data.get("magnitude")
+        if shock and magnitude is not None:
+            bounds = SHOCKS[shock]
+            if not bounds["min"] <= magnitude <= bounds["max"]:
+                raise forms.ValidationError(
+                    _("Magnitude must be between %(min)s and %(max)s."),
+                    params={"min": bounds["min"], "max": bounds["max"]},
+                )
+        return cleaned_data
+
+
+class MonteCarloForm(forms.Form):
+    years = forms.IntegerField(min_value=1, max_value=40)
+    seed = forms.IntegerField(min_value=0, required=False)
@@ -1 +1,216 @@
-# Scenarios services
+import json
+
+import numpy as np
+from django.utils.translation import gettext_lazy as _
+
+from apps.metrics.services import instrumented
+from apps.portfolio.models import Holding
+from apps.portfolio.services import base_currency, conversion_factors
+
+# Risk factors every holding is decomposed into
+FACTORS = ("equity", "bonds", "cash", "foreign")
+
+# Funds whose sleeves can't be read off asset_type/sector alone
+BLENDED_SLEEVES = {
+    "XBAL.TO": {"equity": 0.6, "bonds": 0.4},
+    "XGRO.TO": {"equity": 0.8, "bonds": 0.2},
+    "XCNS.TO": {"equity": 0.4, "bonds": 0.6},
+}
+
+# Share of a holding priced outside Canada, by geography
+FOREIGN_SHARE = {
+    "Canada": 0.0,
+    "Global": 0.75,
+    "United States": 1.0,
+}
+
+# Guided shocks: factor sensitivities per unit of the slider value (in %).
+# The slider value is the size of the event, e.g. a 30% crash or +2 points.
+SHOCKS = {
+    "equity_crash": {
+        "label": _("Stock market crash"),
+        "unit": _("Drop in stocks (%)"),
+        "default": 30,
+        "min": 5,
+        "max": 60,
+        "step": 5,
+        # Bonds usually catch a small flight-to-quality bid
+        "sensitivities": {"equity": -1.0, "bonds": 0.05},
+    },
+    "inflation": {
+        "label": _("Inflation spike"),
+        "unit": _("Inflation (%)"),
+        "default": 5,
+        "min": 1,
+        "max": 12,
+        "step": 1,
+        # Real (after-inflation) value: everything loses purchasing power
+        "sensitivities": {"equity": -1.5, "bonds": -1.6, "cash": -1.0},
+    },
+    "rates_up": {
+        "label": _("Interest rates rise"),
+        "unit": _("Rate increase (points)"),
+        "default": 2,
+        "min": 0.5,
+        "max": 5,
+        "step": 0.5,
+        # Bonds lose roughly their duration (~6 years for a broad index) per point
+        "sensitivities": {"equity": -4.0, "bonds": -6.0},
+    },
+    "fx_move": {
+        "label": _("Canadian dollar rises"),
+        "unit": _("CAD appreciation (%)"),
+        "default": 10,
+        "min": 2,
+        "max": 25,
+        "step": 1,
+        "sensitivities": {"foreign": -1.0},
+    },
+}
+
+# Long-run annual (expected return, volatility) per sleeve, after FP Canada's
+# projection assumption guidelines; cash volatility is nominal.
+MONTE_CARLO_ASSUMPTIONS = {
+    "equity": (0.066, 0.16),
+    "bonds": (0.034, 0.06),
+    "cash": (0.024, 0.01),
+}
+
+MONTE_CARLO_CORRELATION = np.array(
+    [
+        [1.0, 0.2, 0.0],
+        [0.2, 1.0, 0.3],
+        [0.0, 0.3, 1.0],
+    ]
+)
+
+MONTE_CARLO_PATHS = 10_000
+MONTE_CARLO_PERCENTILES = (5, 25, 50, 75, 95)
+
+# A fixed default seed keeps the fan steady while the user moves sliders
+MONTE_CARLO_SEED = 20240101
+
+
+def _factor_row(ticker, asset_type, sector, geography):
+    """Exposure of one holding to each of FACTORS, as fractions of its value."""
+    if ticker in BLENDED_SLEEVES:
+        sleeves = BLENDED_SLEEVES[ticker]
+    elif asset_type in ("cash", "gic"):
+        sleeves = {"cash": 1.0}
+    elif asset_type == "bond" or sector == "Fixed income":
+        sleeves = {"bonds": 1.0}
+    else:
+        sleeves = {"equity": 1.0}
+
+    invested = 1.0 - sleeves.get("cash", 0.0)
+    foreign = FOREIGN_SHARE.get(geography, 1.0 if geography else 0.0) * invested
+    return [sleeves.get("equity", 0.0), sleeves.get("bonds", 0.0), sleeves.get("cash", 0.0), foreign]
+
+
+@instrumented
+def get_scenario_inputs(portfolio):
+    """Tickers, market values and factor exposures for the portfolio's holdings.
+
+    Returns (tickers, values, exposures) where values has shape (n,), in
+    the owner's base currency at today's rates, and exposures has shape
+    (n, len(FACTORS)). One query.
+    """
+    rows = list(
+        Holding.objects.filter(portfolio=portfolio)
+        .order_by("asset__ticker")
+        .values_list(
+            "asset__ticker",
+            "asset__asset_type",
+            "asset__sector",
+            "asset__geography",
+            "quantity",
+            "asset__current_price",
+            "asset__currency",
+            base_currency("portfolio__user"),
+        )
+    )
+    tickers = [row[0] for row in rows]
+    factors, _missing = conversion_factors(rows[0][-1] if rows else None, {row[6] for row in rows})
+    values = np.array([float(row[4] * row[5]) * factors[row[6]] for row in rows], dtype=np.float64)
+    exposures = np.array([_factor_row(*row[:4]) for row in rows], dtype=np.float64).reshape(len(rows), len(FACTORS))
+    return tickers, values, exposures
+
+
+def apply_shock(values, exposures, shock, magnitude):
+    """Market values after a guided shock of the given magnitude (in %).
+
+    Each holding moves by its factor exposures times the shock's
+    sensitivities, floored at a total loss.
+    """
+    sensitivities = np.array([SHOCKS[shock]["sensitivities"].get(factor, 0.0) for factor in FACTORS])
+    returns = exposures @ sensitivities * (magnitude / 100)
+    return values * np.maximum(1 + returns, 0.0)
+
+
+@instrumented
+def run_stress_test(tickers, values, exposures, shock, magnitude):
+    """Before/after breakdown of a guided shock, shaped for the scenario chart."""
+    after = apply_shock(values, exposures, shock, magnitude)
+    before_total = float(values.sum())
+    after_total = float(after.sum())
+    change_pct = round((after_total / before_total - 1) * 100, 1) if before_total else 0.0
+    return {
+        "labels": tickers,
+        "before": values.round(2).tolist(),
+        "after": after.round(2).tolist(),
+        "before_total": round(before_total, 2),
+        "after_total": round(after_total, 2),
+        "change": round(after_total - before_total, 2),
+        "change_pct": change_pct,
+        "change_display": f"{change_pct:+.1f}%",
+    }
+
+
+def simulate_paths(initial, weights, years, paths=MONTE_CARLO_PATHS, seed=None):
+    """Simulate yearly portfolio values for a constant-mix portfolio.
+
+    weights are the equity/bonds/cash shares of the portfolio, rebalanced
+    yearly. Annual sleeve returns are correlated log-normal draws from
+    MONTE_CARLO_ASSUMPTIONS. Returns an array of shape (paths, years + 1)
+    starting at ``initial``.
+    """
+    rng = np.random.default_rng(seed)
+    means, vols = np.array(list(MONTE_CARLO_ASSUMPTIONS.values())).T
+    # Log-normal parameters matching the arithmetic mean and volatility
+    sigma2 = np.log1p((vols / (1 + means)) ** 2)
+    mu = np.log1p(means) - sigma2 / 2
+    chol = np.linalg.cholesky(MONTE_CARLO_CORRELATION)
+
+    shocks = rng.standard_normal((paths, years, len(means))) @ chol.T
+    sleeve_returns = np.expm1(mu + shocks * np.sqrt(sigma2))
+    growth = np.cumprod(1 + sleeve_returns @ np.asarray(weights, dtype=np.float64), axis=1)
+
+    values = np.empty((paths, years + 1))
+    values[:, 0] = initial
+    values[:, 1:] = initial * growth
+    return values
+
+
+def run_monte_carlo(values, exposures, years, paths=MONTE_CARLO_PATHS, seed=None):
+    """Percentile fan of simulated portfolio values, one point per year."""
+    total = float(values.sum())
+    weights = values @ exposures[:, :3] / total if total else np.zeros(3)
+    simulated = simulate_paths(total, weights, years, paths=paths, seed=seed)
+    fan = np.percentile(simulated, MONTE_CARLO_PERCENTILES, axis=0)
+    loss_probability = round(float((simulated[:, -1] < total).mean()) * 100, 1)
+    return {
+        "years": list(range(years + 1)),
+        "percentiles": {f"p{p}": row.round(2).tolist() for p, row in zip(MONTE_CARLO_PERCENTILES, fan, strict=True)},
+        "initial": round(total, 2),
+        "median": round(float(fan[MONTE_CARLO_PERCENTILES.index(50), -1]), 2),
+        "loss_probability": loss_probability,
+        "loss_probability_display": f"{loss_probability:.1f}%",
+        "paths": paths,
+    }
+
+
+def monte_carlo_report(values, exposures, years, seed=None):
+    """Template context for the Monte Carlo partial; runs as a pool job."""
+    result = run_monte_carlo(values, exposures, years, seed=seed)
+    chart_data = {"labels": result["years"], **result["percentiles"]}
+    return {"result": result, "chart_data": json.dumps(chart_data)}
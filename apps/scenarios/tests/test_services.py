@@ -0,0 +1,140 @@
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+
+from apps.market_data.models import Asset, FxRate
+from apps.market_data.services import ingest_fx_rates
+from apps.portfolio.models import Holding, Portfolio
+from apps.scenarios.services import (
+    MONTE_CARLO_PERCENTILES,
+    apply_shock,
+    get_scenario_inputs,
+    run_monte_carlo,
+    run_stress_test,
+    simulate_paths,
+)
+
+User = get_user_model()
+
+
+class ScenarioInputsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.portfolio = Portfolio.objects.create(user=user, name="Test")
+        assets = [
+            ("XBAL.TO", "etf", "Multi-sector", "Global", "30"),
+            ("ZAG.TO", "etf", "Fixed income", "Canada", "14"),
+            ("VFV.TO", "etf", "Multi-sector", "United States", "100"),
+            ("CASH.TO", "cash", "", "Canada", "50"),
+        ]
+        for ticker, asset_type, sector, geography, price in assets:
+            asset = Asset.objects.create(
+                ticker=ticker,
+                name=ticker,
+                asset_type=asset_type,
+                sector=sector,
+                geography=geography,
+                current_price=Decimal(price),
+            )
+            Holding.objects.create(portfolio=self.portfolio, asset=asset, quantity=10, average_cost=price)
+
+    def test_exposures(self):
+        with self.assertNumQueries(1):
+            tickers, values, exposures = get_scenario_inputs(self.portfolio)
+        assert tickers == ["CASH.TO", "VFV.TO", "XBAL.TO", "ZAG.TO"]
+        np.testing.assert_array_equal(values, [500.0, 1000.0, 300.0, 140.0])
+        np.testing.assert_allclose(
+            exposures,
+            [
+                [0.0, 0.0, 1.0, 0.0],
+                [1.0, 0.0, 0.0, 1.0],
+                [0.6, 0.4, 0.0, 0.75],
+                [0.0, 1.0, 0.0, 0.0],
+            ],
+        )
+
+    def test_values_in_base_currency(self):
+        Asset.objects.filter(ticker="VFV.TO").update(currency="USD")
+        ingest_fx_rates([FxRate(currency="USD", date=timezone.localdate(), rate=Decimal("1.25"))])
+        _tickers, values, _exposures = get_scenario_inputs(self.portfolio)
+        np.testing.assert_array_equal(values, [500.0, 1250.0, 300.0, 140.0])
+
+    def test_values_without_exchange_rates(self):
+        Asset.objects.filter(ticker="VFV.TO").update(currency="USD")
+        _tickers, values, _exposures = get_scenario_inputs(self.portfolio)
+        np.testing.assert_array_equal(values, [500.0, 1000.0, 300.0, 140.0])
+
+    def test_empty_portfolio(self):
+        Holding.objects.all().delete()
+        tickers, values, exposures = get_scenario_inputs(self.portfolio)
+        assert tickers == []
+        assert exposures.shape == (0, 4)
+
+
+class StressTestTest(TestCase):
+    values = np.array([1000.0, 500.0, 200.0])
+    # equity, bonds, cash, foreign
+    exposures = np.array(
+        [
+            [1.0, 0.0, 0.0, 1.0],
+            [0.0, 1.0, 0.0, 0.0],
+            [0.0, 0.0, 1.0, 0.0],
+        ]
+    )
+
+    def test_equity_crash(self):
+        after = apply_shock(self.values, self.exposures, "equity_crash", 30)
+        np.testing.assert_allclose(after, [700.0, 507.5, 200.0])
+
+    def test_rates_hit_bonds_by_duration(self):
+        after = apply_shock(self.values, self.exposures, "rates_up", 2)
+        np.testing.assert_allclose(after, [920.0, 440.0, 200.0])
+
+    def test_fx_only_moves_foreign_holdings(self):
+        after = apply_shock(self.values, self.exposures, "fx_move", 10)
+        np.testing.assert_allclose(after, [900.0, 500.0, 200.0])
+
+    def test_losses_floor_at_zero(self):
+        after = apply_shock(self.values, np.array([[3.0, 0.0, 0.0, 0.0]] * 3), "equity_crash", 60)
+        np.testing.assert_array_equal(after, [0.0, 0.0, 0.0])
+
+    def test_result_shape(self):
+        result = run_stress_test(["A", "B", "C"], self.values, self.exposures, "equity_crash", 30)
+        assert result["labels"] == ["A", "B", "C"]
+        assert result["before_total"] == 1700.0
+        assert result["after_total"] == 1407.5
+        assert result["change"] == -292.5
+        assert result["change_display"] == "-17.2%"
+
+
+class MonteCarloTest(TestCase):
+    def test_seeded_runs_are_reproducible(self):
+        a = simulate_paths(1000.0, [0.6, 0.3, 0.1], 5, paths=500, seed=7)
+        b = simulate_paths(1000.0, [0.6, 0.3, 0.1], 5, paths=500, seed=7)
+        assert a.shape == (500, 6)
+        np.testing.assert_array_equal(a, b)
+        assert (a[:, 0] == 1000.0).all()
+
+    def test_cash_only_barely_moves(self):
+        values = simulate_paths(1000.0, [0.0, 0.0, 1.0], 1, paths=2000, seed=1)
+        assert abs(np.median(values[:, 1]) / 1000 - 1.024) < 0.005
+
+    def test_fan_is_ordered(self):
+        values = np.array([6000.0, 4000.0])
+        exposures = np.array([[1.0, 0.0, 0.0, 0.5], [0.0, 1.0, 0.0, 0.0]])
+        result = run_monte_carlo(values, exposures, 10, paths=2000, seed=3)
+        assert result["years"] == list(range(11))
+        fan = np.array([result["percentiles"][f"p{p}"] for p in MONTE_CARLO_PERCENTILES])
+        assert fan.shape == (5, 11)
+        assert (np.diff(fan[:, 1:], axis=0) > 0).all()
+        assert result["initial"] == 10000.0
+        assert 0 < result["loss_probability"] < 50
+
+    def test_empty_portfolio(self):
+        result = run_monte_carlo(np.zeros(0), np.zeros((0, 4)), 5, paths=100, seed=0)
+        assert result["median"] == 0.0
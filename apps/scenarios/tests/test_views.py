@@ -1 +1,72 @@
-# Scenarios view tests
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from apps.accounts.models import UserProfile
+from apps.portfolio.services import create_sandbox_portfolio
+
+User = get_user_model()
+
+
+class ScenarioViewTest(TestCase):
+    def setUp(self):
+        call_command("seed_assets", stdout=StringIO())
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        UserProfile.objects.create(user=self.user, risk_profile_score=5, onboarding_completed=True)
+        self.portfolio = create_sandbox_portfolio(self.user)
+        self.client.login(email="test@example.com", password="testpass123")
+
+    def test_lab_requires_login(self):
+        self.client.logout()
+        assert self.client.get("/scenarios/").status_code == 302
+
+    def test_lab_redirects_to_onboarding_without_portfolio(self):
+        self.portfolio.delete()
+        response = self.client.get("/scenarios/")
+        assert response["Location"] == "/accounts/onboarding/"
+
+    def test_lab_renders_guided_shocks(self):
+        response = self.client.get("/scenarios/")
+        assert response.status_code == 200
+        self.assertTemplateUsed(response, "scenarios/lab.html")
+        scenarios = response.context["scenarios"]
+        assert [s["shock"] for s in scenarios] == ["equity_crash", "inflation", "rates_up", "fx_move"]
+        assert all(s["result"]["after_total"] < s["result"]["before_total"] for s in scenarios)
+
+    def test_stress_partial(self):
+        response = self.client.get("/scenarios/stress/", {"shock": "equity_crash", "magnitude": "50"})
+        assert response.status_code == 200
+        self.assertTemplateUsed(response, "scenarios/partials/stress_result.html")
+        assert response.context["magnitude"] == 50.0
+        assert 'data-chart="scenario"' in response.content.decode()
+
+    def test_stress_rejects_out_of_range(self):
+        response = self.client.get("/scenarios/stress/", {"shock": "rates_up", "magnitude": "40"})
+        assert response.status_code == 400
+        response = self.client.get("/scenarios/stress/", {"shock": "meteor", "magnitude": "10"})
+        assert response.status_code == 400
+
+    def test_monte_carlo_partial(self):
+        response = self.client.get("/scenarios/monte-carlo/", {"years": "5"})
+        assert response.status_code == 200
+        self.assertTemplateUsed(response, "scenarios/partials/monte_carlo_result.html")
+        assert response.context["result"]["years"] == [0, 1, 2, 3, 4, 5]
+
+    def test_monte_carlo_default_seed_is_stable(self):
+        first = self.client.get("/scenarios/monte-carlo/", {"years": "10"}).context["result"]
+        second = self.client.get("/scenarios/monte-carlo/", {"years": "10"}).context["result"]
+        assert first == second
+        other = self.client.get("/scenarios/monte-carlo/", {"years": "10", "seed": "1"}).context["result"]
+        assert other != first
+
+    def test_monte_carlo_rejects_bad_horizon(self):
+        assert self.client.get("/scenarios/monte-carlo/", {"years": "100"}).status_code == 400
+
+    @override_settings(JOBS_MAX_PENDING=0)
+    def test_monte_carlo_sheds_load_when_pool_is_full(self):
+        response = self.client.get("/scenarios/monte-carlo/", {"years": "5"})
+        assert response.status_code == 503
+        assert response["Retry-After"] == "2"
+        self.assertTemplateUsed(response, "jobs/partials/queue_full.html")
@@ -6,4 +6,6 @@ app_name = "scenarios"
 
 urlpatterns = [
     path("", views.scenario_lab, name="lab"),
+    path("stress/", views.stress_test, name="stress"),
+    path("monte-carlo/", views.monte_carlo, name="monte_carlo"),
 ]
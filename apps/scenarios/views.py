@@ -1,6 +1,94 @@
-from django.shortcuts import render
+import json
 
+from django.conf import settings
+from django.contrib.auth.decorators import login_required
+from django.http import HttpResponseBadRequest
+from django.shortcuts import redirect, render
+from django.utils.translation import gettext as _
 
+from apps.jobs.services import JobQueueFull, submit_job, wait_for_job
+from apps.jobs.views import render_job, render_queue_full
+from apps.portfolio.models import Portfolio
+
+from .forms import MonteCarloForm, StressTestForm
+from .services import MONTE_CARLO_SEED, SHOCKS, get_scenario_inputs, monte_carlo_report, run_stress_test
+
+MONTE_CARLO_DEFAULT_YEARS = 10
+
+
+def _stress_context(inputs, shock, magnitude):
+    result = run_stress_test(*inputs, shock, magnitude)
+    chart_data = {
+        "labels": result["labels"],
+        "before": result["before"],
+        "after": result["after"],
+        "beforeLabel": _("Today"),
+        "afterLabel": _("After shock"),
+    }
+    return {
+        "shock": shock,
+        "config": SHOCKS[shock],
+        "magnitude": magnitude,
+        "result": result,
+        "chart_data": json.dumps(chart_data),
+    }
+
+
+@login_required
 def scenario_lab(request):
-    """Scenario lab landing page."""
-    return render(request, "scenarios/lab.html")
+    """Scenario lab: guided shocks and a Monte Carlo projection of the user's portfolio."""
+    portfolio = Portfolio.objects.filter(user=request.user).first()
+    if not portfolio:
+        return redirect("accounts:onboarding")
+
+    inputs = get_scenario_inputs(portfolio)
+    scenarios = [_stress_context(inputs, key, shock["default"]) for key, shock in SHOCKS.items()]
+    return render(
+        request,
+        "scenarios/lab.html",
+        {
+            "scenarios": scenarios,
+            "years": MONTE_CARLO_DEFAULT_YEARS,
+        },
+    )
+
+
+@login_required
+def stress_test(request):
+    """HTMX GET: re-run one guided shock as its slider moves."""
+    form = StressTestForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest()
+
+    portfolio = Portfolio.objects.filter(user=request.user).first()
+    if not portfolio:
+        return HttpResponseBadRequest()
+
+    inputs = get_scenario_inputs(portfolio)
+    context = _stress_context(inputs, form.cleaned_data["shock"], form.cleaned_data["magnitude"])
+    return render(request, "scenarios/partials/stress_result.html", context)
+
+
+@login_required
+def monte_carlo(request):
+    """HTMX GET: percentile fan of simulated portfolio values."""
+    form = MonteCarloForm(request.GET)
+    if not form.is_valid():
+        return HttpResponseBadRequest()
+
+    portfolio = Portfolio.objects.filter(user=request.user).first()
+    if not portfolio:
+        return HttpResponseBadRequest()
+
+    _tickers, values, exposures = get_scenario_inputs(portfolio)
+    seed = form.cleaned_data["seed"]
+    try:
+        job = submit_job(
+            request.user,
+            monte_carlo_report,
+            (values, exposures, form.cleaned_data["years"], MONTE_CARLO_SEED if seed is None else seed),
+            template="scenarios/partials/monte_carlo_result.html",
+        )
+    except JobQueueFull:
+        return render_queue_full(request)
+    return render_job(request, wait_for_job(job, settings.JOBS_INLINE_WAIT))
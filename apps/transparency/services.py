@@ -1 +1,136 @@
-# Transparency services
+import hashlib
+from datetime import timedelta
+
+import numpy as np
+from django.core.cache import cache
+from django.db.models import Max
+
+from apps.market_data.models import Asset, PriceBar
+from apps.market_data.services import get_price_matrix
+from apps.metrics.services import instrumented
+from apps.portfolio.models import Holding
+from apps.portfolio.services import base_currency, conversion_factors
+
+# Broad-market proxy the portfolio's beta is measured against
+BENCHMARK_TICKER = "XEQT.TO"
+
+TRADING_DAYS_PER_YEAR = 252
+
+# How far back the risk metrics look from the as-of date
+RISK_LOOKBACK = timedelta(days=3 * 365)
+
+# Results are keyed by composition and as-of date, so they only go stale if
+# bars for an already-seen day are rewritten; a day is a safe upper bound.
+RISK_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def composition_hash(positions):
+    """Stable digest of (asset_id, quantity) pairs, independent of their order."""
+    payload = ";".join(f"{asset_id}:{quantity}" for asset_id, quantity in sorted(positions))
+    return hashlib.sha1(payload.encode(), usedforsecurity=False).hexdigest()
+
+
+def _returns(series):
+    """Simple daily returns along the last axis."""
+    return np.diff(series, axis=-1) / series[..., :-1]
+
+
+def compute_risk_metrics(prices, quantities, benchmark=None):
+    """Risk of holding ``quantities`` of each asset over the ``prices`` window.
+
+    prices has shape (n_assets, n_days), as returned by get_price_matrix;
+    days before every asset has a price are dropped so the portfolio series
+    never mixes partial baskets. benchmark is an optional (n_days,) series
+    aligned on the same days. Returns None when fewer than two returns remain.
+    """
+    prices = np.asarray(prices, dtype=np.float64)
+    quantities = np.asarray(quantities, dtype=np.float64)
+    window = ~np.isnan(prices).any(axis=0)
+    if window.sum() < 3:
+        return None
+
+    prices = prices[:, window]
+    values = quantities @ prices
+    returns = _returns(values)
+    drawdowns = values / np.maximum.accumulate(values) - 1
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.atleast_2d(np.corrcoef(_returns(prices)))
+
+        beta = None
+        if benchmark is not None:
+            bench_returns = _returns(np.asarray(benchmark, dtype=np.float64)[window])
+            valid = ~np.isnan(bench_returns)
+            if valid.sum() >= 2:
+                cov = np.cov(returns[valid], bench_returns[valid])
+                beta = float(cov[0, 1] / cov[1, 1]) if cov[1, 1] > 0 else None
+
+    return {
+        "volatility": float(returns.std(ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)),
+        "max_drawdown": float(drawdowns.min()),
+        "beta": beta,
+        "correlation": np.where(np.isnan(correlation), None, correlation.round(2)).tolist(),
+        "observations": len(returns),
+    }
+
+
+def _risk_report(positions, as_of):
+    asset_ids = [asset_id for asset_id, _, _ in positions]
+    benchmark_id = Asset.objects.filter(ticker=BENCHMARK_TICKER).values_list("id", flat=True).first()
+    extra = [benchmark_id] if benchmark_id is not None and benchmark_id not in asset_ids else []
+
+    _, matrix = get_price_matrix(asset_ids + extra, start=as_of - RISK_LOOKBACK, end=as_of)
+    benchmark = None
+    if benchmark_id is not None:
+        benchmark = matrix[(asset_ids + extra).index(benchmark_id)]
+
+    metrics = compute_risk_metrics(
+        matrix[: len(asset_ids)],
+        [quantity for _, _, quantity in positions],
+        benchmark,
+    )
+    if metrics is None:
+        return None
+    return {
+        **metrics,
+        "tickers": [ticker for _, ticker, _ in positions],
+        "benchmark": BENCHMARK_TICKER if metrics["beta"] is not None else None,
+        "as_of": as_of,
+    }
+
+
+@instrumented
+def get_risk_metrics(portfolio):
+    """Volatility, drawdown, beta and correlations for the portfolio's holdings.
+
+    The as-of date is the latest price bar for any held asset, so a fresh
+    ingest moves the cache key forward on its own. Quantities are scaled by
+    today's rate into the owner's base currency, so holdings in different
+    currencies are weighted by comparable values and a rate change moves
+    the key too. Cache hits cost two queries: holdings and the as-of lookup.
+    """
+    rows = list(
+        Holding.objects.filter(portfolio=portfolio)
+        .order_by("asset_id")
+        .values_list("asset_id", "asset__ticker", "quantity", "asset__currency", base_currency("portfolio__user"))
+    )
+    if not rows:
+        return None
+
+    factors, _missing = conversion_factors(rows[0][-1], {row[3] for row in rows})
+    positions = [
+        (asset_id, ticker, float(quantity) * factors[currency]) for asset_id, ticker, quantity, currency, _base in rows
+    ]
+
+    as_of = PriceBar.objects.filter(asset_id__in=[asset_id for asset_id, _, _ in positions]).aggregate(
+        latest=Max("date")
+    )["latest"]
+    if as_of is None:
+        return None
+
+    digest = composition_hash((asset_id, quantity) for asset_id, _, quantity in positions)
+    return cache.get_or_set(
+        f"transparency:risk:{digest}:{as_of.isoformat()}",
+        lambda: _risk_report(positions, as_of),
+        RISK_CACHE_TIMEOUT,
+    )
@@ -0,0 +1,119 @@
+from datetime import date
+from decimal import Decimal
+
+import numpy as np
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+
+from apps.market_data.models import Asset, FxRate, PriceBar
+from apps.market_data.services import ingest_fx_rates, ingest_price_bars
+from apps.portfolio.models import Holding, Portfolio
+from apps.transparency.services import composition_hash, compute_risk_metrics, get_risk_metrics
+
+User = get_user_model()
+
+
+class ComputeRiskMetricsTest(TestCase):
+    def test_single_asset(self):
+        metrics = compute_risk_metrics([[100.0, 110.0, 99.0, 120.0]], [2])
+        returns = np.array([0.1, -0.1, 120 / 99 - 1])
+        assert np.isclose(metrics["volatility"], returns.std(ddof=1) * np.sqrt(252))
+        assert np.isclose(metrics["max_drawdown"], -0.1)
+        assert metrics["beta"] is None
+        assert metrics["correlation"] == [[1.0]]
+        assert metrics["observations"] == 3
+
+    def test_beta_against_itself_is_one(self):
+        prices = [[10.0, 11.0, 10.5, 12.0, 11.0]]
+        metrics = compute_risk_metrics(prices, [1], benchmark=prices[0])
+        assert np.isclose(metrics["beta"], 1.0)
+
+    def test_beta_scales_with_leverage(self):
+        benchmark = np.array([100.0, 101.0, 99.0, 102.0, 100.0])
+        levered = 100 * np.cumprod(np.r_[1, 1 + 2 * (np.diff(benchmark) / benchmark[:-1])])
+        metrics = compute_risk_metrics([levered], [1], benchmark=benchmark)
+        assert np.isclose(metrics["beta"], 2.0)
+
+    def test_correlation_matrix(self):
+        a = [10.0, 11.0, 10.0, 12.0]
+        metrics = compute_risk_metrics([a, [2 * x for x in a], [5.0, 5.0, 5.0, 5.0]], [1, 1, 1])
+        assert metrics["correlation"][0][:2] == [1.0, 1.0]
+        # A flat series has no defined correlation
+        assert metrics["correlation"][0][2] is None
+
+    def test_drops_days_before_every_asset_has_a_price(self):
+        metrics = compute_risk_metrics([[np.nan, 10.0, 11.0, 12.0], [5.0, 5.0, 5.5, 6.0]], [1, 1])
+        assert metrics["observations"] == 2
+
+    def test_insufficient_history(self):
+        assert compute_risk_metrics([[10.0, 11.0]], [1]) is None
+        assert compute_risk_metrics([[np.nan, 10.0, 11.0], [1.0, 1.0, 1.0]], [1, 1]) is None
+
+
+class CompositionHashTest(TestCase):
+    def test_order_independent(self):
+        assert composition_hash([(1, Decimal("2")), (3, Decimal("4"))]) == composition_hash(
+            [(3, Decimal("4")), (1, Decimal("2"))]
+        )
+
+    def test_quantity_sensitive(self):
+        assert composition_hash([(1, Decimal("2"))]) != composition_hash([(1, Decimal("3"))])
+
+
+class GetRiskMetricsTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        self.portfolio = Portfolio.objects.create(user=user, name="Test")
+        self.xeqt = Asset.objects.create(ticker="XEQT.TO", name="XEQT", asset_type="etf", current_price=Decimal("30"))
+        self.zag = Asset.objects.create(ticker="ZAG.TO", name="ZAG", asset_type="bond", current_price=Decimal("14"))
+        Holding.objects.create(portfolio=self.portfolio, asset=self.xeqt, quantity=10, average_cost=28)
+        Holding.objects.create(portfolio=self.portfolio, asset=self.zag, quantity=20, average_cost=14)
+        ingest_price_bars(
+            PriceBar(asset=asset, date=date(2024, 1, 1 + i), close=close)
+            for asset, closes in ((self.xeqt, [28.0, 29.0, 27.5, 30.0]), (self.zag, [14.0, 14.1, 14.2, 14.0]))
+            for i, close in enumerate(closes)
+        )
+
+    def test_metrics(self):
+        risk = get_risk_metrics(self.portfolio)
+        assert risk["tickers"] == ["XEQT.TO", "ZAG.TO"]
+        assert risk["benchmark"] == "XEQT.TO"
+        assert risk["as_of"] == date(2024, 1, 4)
+        assert risk["observations"] == 3
+        assert risk["max_drawdown"] < 0
+        assert len(risk["correlation"]) == 2
+
+    def test_cached_per_composition_and_as_of(self):
+        get_risk_metrics(self.portfolio)
+        # holdings + as-of date
+        with self.assertNumQueries(2):
+            get_risk_metrics(self.portfolio)
+
+        ingest_price_bars(
+            [PriceBar(asset=self.xeqt, date=date(2024, 1, 5), close=31.0)]
+            + [PriceBar(asset=self.zag, date=date(2024, 1, 5), close=14.1)]
+        )
+        assert get_risk_metrics(self.portfolio)["as_of"] == date(2024, 1, 5)
+
+        # A new composition misses: benchmark lookup and price matrix on top
+        Holding.objects.filter(asset=self.zag).update(quantity=0)
+        with self.assertNumQueries(4):
+            get_risk_metrics(self.portfolio)
+
+    def test_weights_in_base_currency(self):
+        Asset.objects.filter(pk=self.zag.pk).update(currency="USD")
+        ingest_fx_rates([FxRate(currency="USD", date=date(2024, 1, 1), rate=Decimal("2"))])
+        prices = [[28.0, 29.0, 27.5, 30.0], [14.0, 14.1, 14.2, 14.0]]
+        expected = compute_risk_metrics(prices, [10, 40], prices[0])
+        risk = get_risk_metrics(self.portfolio)
+        assert risk["volatility"] == expected["volatility"]
+        assert risk["max_drawdown"] == expected["max_drawdown"]
+
+    def test_no_holdings_or_history(self):
+        Holding.objects.filter(asset=self.xeqt).delete()
+        PriceBar.objects.all().delete()
+        assert get_risk_metrics(self.portfolio) is None
+        Holding.objects.all().delete()
+        assert get_risk_metrics(self.portfolio) is None
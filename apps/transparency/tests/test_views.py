@@ -1 +1,64 @@
-# Transparency view tests
+from datetime import date, timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from apps.accounts.models import UserProfile
+from apps.market_data.models import PriceBar
+from apps.market_data.services import ingest_price_bars
+from apps.portfolio.services import create_sandbox_portfolio
+
+User = get_user_model()
+
+
+class RiskCardViewTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        call_command("seed_assets", stdout=StringIO())
+        self.user = User.objects.create_user(username="testuser", email="test@example.com", password="testpass123")
+        UserProfile.objects.create(user=self.user, risk_profile_score=5, onboarding_completed=True)
+        self.portfolio = create_sandbox_portfolio(self.user)
+        self.client.login(email="test@example.com", password="testpass123")
+        self.url = f"/transparency/risk/{self.portfolio.pk}/"
+
+    def test_requires_login(self):
+        self.client.logout()
+        assert self.client.get(self.url).status_code == 302
+
+    def test_without_history(self):
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+        self.assertTemplateUsed(response, "transparency/partials/risk_card.html")
+        assert response.context["risk"] is None
+
+    def test_with_history(self):
+        start = date(2024, 1, 1)
+        ingest_price_bars(
+            PriceBar(
+                asset=holding.asset, date=start + timedelta(days=i), close=float(holding.asset.current_price) + i % 3
+            )
+            for holding in self.portfolio.holdings.select_related("asset")
+            for i in range(10)
+        )
+        response = self.client.get(self.url)
+        assert response.status_code == 200
+        assert response.context["risk"]["observations"] == 9
+        assert response.context["volatility_display"].endswith("%")
+
+    def test_currency_exposure(self):
+        response = self.client.get(self.url)
+        assert response.context["currencies"] == [{"label": "CAD", "pct": 100.0}]
+        self.assertContains(response, "Currency exposure")
+
+    def test_other_users_portfolio_404(self):
+        other = User.objects.create_user(username="other", email="other@example.com", password="testpass123")
+        UserProfile.objects.create(user=other, risk_profile_score=2, onboarding_completed=True)
+        portfolio = create_sandbox_portfolio(other)
+        assert self.client.get(f"/transparency/risk/{portfolio.pk}/").status_code == 404
+
+    def test_dashboard_lazy_loads_card(self):
+        response = self.client.get("/dashboard/")
+        self.assertContains(response, f'hx-get="{self.url}"')
@@ -1,3 +1,9 @@
+from django.urls import path
+
+from . import views
+
 app_name = "transparency"
 
-urlpatterns = []
+urlpatterns = [
+    path("risk/<int:pk>/", views.risk_card, name="risk"),
+]
@@ -1 +1,28 @@
-# Transparency views
+from django.contrib.auth.decorators import login_required
+from django.shortcuts import get_object_or_404, render
+
+from apps.portfolio.models import Portfolio
+from apps.portfolio.services import get_portfolio_analytics
+
+from .services import get_risk_metrics
+
+
+@login_required
+def risk_card(request, pk):
+    """HTMX GET: risk metrics and currency exposure card, lazy-loaded by the dashboard."""
+    portfolio = get_object_or_404(Portfolio, pk=pk, user=request.user)
+    risk = get_risk_metrics(portfolio)
+    analytics = get_portfolio_analytics(portfolio)
+    context = {
+        "risk": risk,
+        "currencies": analytics.exposures["currencies"],
+        "base_currency": analytics.currency,
+        "rates_missing": analytics.rates_missing,
+    }
+    if risk is not None:
+        context.update(
+            volatility_display=f"{risk['volatility']:.1%}",
+            drawdown_display=f"{risk['max_drawdown']:.1%}",
+            correlation_rows=list(zip(risk["tickers"], risk["correlation"], strict=True)),
+        )
+    return render(request, "transparency/partials/risk_card.html", context)
@@ -0,0 +1,22 @@
+"""Standalone benchmarks, run with ``python -m benchmarks.<name>``.
+
+They use the test settings and an in-memory database, so they never touch
+development or production data.
+"""
+
+import os
+
+
+def setup_django():
+    """Configure Django with test settings and create a fresh test database."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings.test")
+
+    import django
+
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import setup_test_environment
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
@@ -0,0 +1,106 @@
+"""Benchmark the cache backends a gunicorn worker can use.
+
+Times get (hit and miss), set and incr on LocMemCache (per worker),
+SQLiteCache and FileBasedCache (shared through local files) and
+DatabaseCache (shared through the database; here the benchmarks' in-memory
+SQLite, so PostgreSQL adds a network round trip to every operation). Then
+runs a mixed read-heavy workload from several threads at once.
+
+    python -m benchmarks.caches [--ops 2000] [--value-kb 4] [--threads 4]
+"""
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from benchmarks import setup_django
+
+
+def backends(tmp):
+    from django.core.cache.backends.db import DatabaseCache
+    from django.core.cache.backends.filebased import FileBasedCache
+    from django.core.cache.backends.locmem import LocMemCache
+    from django.core.management import call_command
+
+    from apps.cache.backends import SQLiteCache
+
+    call_command("createcachetable", "bench_cache", verbosity=0)
+    return {
+        "locmem": LocMemCache("bench", {"OPTIONS": {"MAX_ENTRIES": 100_000}}),
+        "sqlite (shared)": SQLiteCache(str(Path(tmp) / "cache.sqlite3"), {}),
+        "filebased (shared)": FileBasedCache(str(Path(tmp) / "files"), {"OPTIONS": {"MAX_ENTRIES": 100_000}}),
+        "database (shared)": DatabaseCache("bench_cache", {"OPTIONS": {"MAX_ENTRIES": 100_000}}),
+    }
+
+
+def per_op_us(fn, ops):
+    """Median microseconds per call over five rounds of ``ops`` calls."""
+    rounds = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for i in range(ops):
+            fn(i)
+        rounds.append((time.perf_counter() - started) / ops * 1e6)
+    return statistics.median(rounds)
+
+
+def mixed_ops_per_second(cache, threads, ops, value):
+    """Throughput of 9 gets per set, spread across ``threads`` threads."""
+
+    def work(offset):
+        for i in range(ops):
+            key = f"mixed:{(offset + i) % 500}"
+            if i % 10 == 0:
+                cache.set(key, value)
+            else:
+                cache.get(key)
+
+    workers = [threading.Thread(target=work, args=(n * 97,)) for n in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return threads * ops / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ops", type=int, default=2000)
+    parser.add_argument("--value-kb", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.core.cache.backends.db import DatabaseCache
+
+    # Roughly a cached performance series: a list of date/value points
+    value = [{"date": f"2024-01-{i % 28 + 1:02d}", "value": i * 1.5} for i in range(args.value_kb * 25)]
+
+    print(f"{args.ops} ops per round, ~{args.value_kb} KiB values, {args.threads} threads for the mixed load")
+    print(f"  {'backend':<20} {'get hit':>9} {'get miss':>9} {'set':>9} {'incr':>9} {'mixed ops/s':>12}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, cache in backends(tmp).items():
+            for i in range(args.ops):
+                cache.set(f"bench:{i}", value)
+            cache.set("counter", 0)
+            row = [
+                per_op_us(lambda i, cache=cache: cache.get(f"bench:{i}"), args.ops),
+                per_op_us(lambda i, cache=cache: cache.get(f"none:{i}"), args.ops),
+                per_op_us(lambda i, cache=cache: cache.set(f"bench:{i}", value), args.ops),
+                per_op_us(lambda i, cache=cache: cache.incr("counter"), args.ops),
+            ]
+            if isinstance(cache, DatabaseCache):
+                # The in-memory benchmark database can't be shared between threads
+                mixed = f"{'n/a':>12}"
+            else:
+                mixed = f"{mixed_ops_per_second(cache, args.threads, args.ops, value):12,.0f}"
+            print(f"  {name:<20} " + " ".join(f"{us:7.1f}us" for us in row) + f" {mixed}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,151 @@
+"""Benchmark serving the dashboard through WSGI threads and through ASGI.
+
+Models one web worker on this machine. Under gunicorn's threaded worker each
+request runs start to finish on one of --concurrency threads (the WSGI
+handler); under uvicorn every request shares one event loop (the ASGI
+handler), with sync code moved to per-request threads as Django does. Both
+serve --requests dashboard views to --concurrency logged-in users at once,
+first through the sync view, whose cards load one after another, and then
+with CONCURRENT_CARDS through its async variant (config.urls_async), and
+report throughput and p50/p95/p99 latency.
+
+The in-memory database answers in microseconds, so --db-latency-ms adds a
+sleep to every query to stand in for PostgreSQL round trips. Sockets, HTTP
+parsing and opening database connections aren't measured (under ASGI each
+request's sync code runs on a fresh thread, which connects again): compare
+the modes with each other, not with production numbers.
+
+    python -m benchmarks.handlers [--concurrency 8] [--requests 400] [--db-latency-ms 1]
+"""
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+
+from benchmarks import setup_django
+from benchmarks.journeys import seed
+
+PATH = "/dashboard/"
+
+
+def add_db_latency(seconds):
+    """Sleep before every query, on every connection and thread."""
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    def delay(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    def install(connection, **kwargs):
+        # First, under any execute_wrapper() a middleware has pushed and will pop
+        if delay not in connection.execute_wrappers:
+            connection.execute_wrappers.insert(0, delay)
+
+    connection_created.connect(install, weak=False)
+    for connection in connections.all():
+        install(connection)
+
+
+def check(response):
+    if response.status_code != 200:
+        raise SystemExit(f"GET {PATH} returned {response.status_code}")
+
+
+def run_wsgi(users, per_user):
+    """Latencies (ms) and elapsed seconds for one thread per user."""
+    from django.test import Client
+
+    clients = []
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        clients.append(client)
+    latencies = []
+
+    def work(client):
+        for _ in range(per_user):
+            started = time.perf_counter()
+            response = client.get(PATH)
+            latencies.append((time.perf_counter() - started) * 1000)
+            check(response)
+
+    threads = [threading.Thread(target=work, args=(client,)) for client in clients]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, time.perf_counter() - started
+
+
+def run_asgi(users, per_user):
+    """Latencies (ms) and elapsed seconds for one task per user on one event loop."""
+    from asgiref.sync import ThreadSensitiveContext
+    from django.test import AsyncClient
+
+    clients = []
+    for user in users:
+        client = AsyncClient()
+        client.force_login(user)
+        clients.append(client)
+    latencies = []
+
+    async def work(client):
+        for _ in range(per_user):
+            started = time.perf_counter()
+            # What ASGIHandler does around each request; the test client doesn't
+            async with ThreadSensitiveContext():
+                response = await client.get(PATH)
+            latencies.append((time.perf_counter() - started) * 1000)
+            check(response)
+
+    async def main():
+        await asyncio.gather(*(work(client) for client in clients))
+
+    started = time.perf_counter()
+    asyncio.run(main())
+    return latencies, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="users, and WSGI threads, served at once")
+    parser.add_argument("--requests", type=int, default=400, help="dashboard views per mode")
+    parser.add_argument("--transactions", type=int, default=50, help="extra trades per seeded portfolio")
+    parser.add_argument("--db-latency-ms", type=float, default=1.0)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    users = seed(args.concurrency, args.transactions)
+    # Build every user's valuation and learning progress, and warm the caches
+    for user in users:
+        client = Client()
+        client.force_login(user)
+        check(client.get(PATH))
+    if args.db_latency_ms > 0:
+        add_db_latency(args.db_latency_ms / 1000)
+
+    per_user = max(1, args.requests // args.concurrency)
+    print(f"{per_user * len(users)} dashboard views, {len(users)} at a time, {args.db_latency_ms:g} ms added per query")
+    print(f"  {'handler':<8} {'cards':<11} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for handler, run in (("wsgi", run_wsgi), ("asgi", run_asgi)):
+        for cards, concurrent in (("serial", False), ("concurrent", True)):
+            urlconf = "config.urls_async" if concurrent else "config.urls"
+            with override_settings(CONCURRENT_CARDS=concurrent, ROOT_URLCONF=urlconf):
+                latencies, elapsed = run(users, per_user)
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            print(
+                f"  {handler:<8} {cards:<11} {len(latencies) / elapsed:8.1f}"
+                f" {cuts[49]:8.2f} {cuts[94]:8.2f} {cuts[98]:8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,271 @@
+"""Benchmark the core user journeys end to end.
+
+Seeds --users onboarded users with sandbox portfolios and --transactions
+extra trades each, then drives two journeys through the WSGI handler
+in-process (the test client, so middleware, templates and sessions all run):
+
+  new user:   signup -> onboarding steps -> dashboard -> lesson -> quiz
+  returning:  login -> dashboard -> revisit -> revalidate (304) -> learning path
+              -> search -> lesson
+
+Every step reports p50/p95/p99 latency, queries per request and the peak
+memory allocated while serving it (median tracemalloc peak, measured on a
+separate pass so tracing doesn't skew the timings).
+
+    python -m benchmarks.journeys [--users 200] [--transactions 50] [--journeys 20]
+    python -m benchmarks.journeys --save-baseline
+
+Without --save-baseline the results are compared with the stored baseline
+and the command exits non-zero on a regression: a step issuing more queries
+than before, or p95 latency or peak allocations beyond --tolerance. Record
+the baseline on the machine you compare on; latency doesn't travel.
+"""
+
+import argparse
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import timedelta
+from pathlib import Path
+
+from benchmarks import setup_django
+
+BASELINE_PATH = Path(__file__).parent / "baselines" / "journeys.json"
+PASSWORD = "bench-password-1"
+
+# Journeys run under tracemalloc; the median peak per step is reported
+TRACED_JOURNEYS = 5
+
+# Growth below these is noise on small steps, whatever --tolerance says
+SLACK = {"p95_ms": 2.0, "alloc_kb": 64.0}
+
+
+def seed(users, transactions):
+    """Onboarded users, each with a sandbox portfolio and extra trades."""
+    import numpy as np
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.utils import timezone
+
+    from apps.accounts.models import UserProfile
+    from apps.portfolio.models import Holding, Transaction
+    from apps.portfolio.services import create_sandbox_portfolios
+
+    User = get_user_model()
+    password = make_password(PASSWORD)
+    created = User.objects.bulk_create(
+        [User(username=f"seed{i}", email=f"seed{i}@example.com", password=password) for i in range(users)]
+    )
+    UserProfile.objects.bulk_create(
+        [
+            UserProfile(user=user, onboarding_completed=True, risk_profile_score=i % 10 + 1)
+            for i, user in enumerate(created)
+        ]
+    )
+    portfolios = create_sandbox_portfolios(created)
+
+    holdings = defaultdict(list)
+    for portfolio_id, asset_id in Holding.objects.values_list("portfolio_id", "asset_id"):
+        holdings[portfolio_id].append(asset_id)
+
+    rng = np.random.default_rng(0)
+    now = timezone.now()
+    trades = []
+    for portfolio in portfolios.values():
+        asset_ids = holdings[portfolio.pk]
+        for _ in range(transactions):
+            trades.append(
+                Transaction(
+                    portfolio=portfolio,
+                    asset_id=asset_ids[rng.integers(len(asset_ids))],
+                    transaction_type="buy",
+                    quantity=int(rng.integers(1, 10)),
+                    price=round(float(rng.uniform(20, 150)), 2),
+                    executed_at=now - timedelta(days=int(rng.integers(1, 3650))),
+                )
+            )
+    Transaction.objects.bulk_create(trades, batch_size=1000)
+    return created
+
+
+def quiz_lesson():
+    """First lesson in the curriculum that has a quiz: (lesson_id, questions)."""
+    from apps.education.services import load_curriculum_index, load_quiz
+
+    for level in load_curriculum_index("en")["levels"]:
+        for lesson_id in level["lessons"]:
+            quiz = load_quiz(lesson_id, "en")
+            if quiz is not None:
+                return lesson_id, quiz["questions"]
+    raise SystemExit("No lesson with a quiz in the curriculum.")
+
+
+class Recorder:
+    """Runs requests through the test client and records each step."""
+
+    def __init__(self, trace=False):
+        self.trace = trace
+        self.latency = defaultdict(list)
+        self.queries = defaultdict(int)
+        self.allocated = defaultdict(list)
+
+    def request(self, client, step, method, path, data=None, headers=None):
+        from django.db import connection
+        from django.test.utils import CaptureQueriesContext
+
+        if self.trace:
+            tracemalloc.reset_peak()
+            baseline, _ = tracemalloc.get_traced_memory()
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            response = getattr(client, method)(path, data, headers=headers)
+            elapsed = (time.perf_counter() - started) * 1000
+        if self.trace:
+            _, peak = tracemalloc.get_traced_memory()
+            self.allocated[step].append(peak - baseline)
+        else:
+            self.latency[step].append(elapsed)
+        self.queries[step] = max(self.queries[step], len(ctx))
+
+        if response.status_code >= 400:
+            raise SystemExit(f"{step}: {method.upper()} {path} returned {response.status_code}")
+        return response
+
+
+def new_user_journey(recorder, n, lesson_id, questions):
+    from django.test import Client
+
+    client = Client()
+    recorder.request(
+        client,
+        "signup",
+        "post",
+        "/accounts/signup/",
+        {"email": f"journey{n}@example.com", "password1": PASSWORD, "password2": PASSWORD},
+    )
+    recorder.request(client, "onboarding", "get", "/accounts/onboarding/")
+    recorder.request(client, "onboarding step 1", "post", "/accounts/onboarding/step/1/", {"province": "ON"})
+    recorder.request(client, "onboarding step 2", "post", "/accounts/onboarding/step/2/", {"preferred_language": "en"})
+    recorder.request(client, "onboarding step 3", "get", "/accounts/onboarding/step/3/")
+    recorder.request(client, "dashboard", "get", "/dashboard/")
+    recorder.request(client, "lesson", "get", f"/learn/{lesson_id}/")
+    recorder.request(client, "quiz start", "get", f"/learn/{lesson_id}/quiz/")
+    for step, question in enumerate(questions, start=1):
+        choice = {"choice": question["answer"]}
+        recorder.request(client, "quiz answer", "post", f"/learn/{lesson_id}/quiz/{step}/", choice)
+        recorder.request(client, "quiz next", "get", f"/learn/{lesson_id}/quiz/{step}/next/")
+
+
+def returning_journey(recorder, user, lesson_id):
+    from django.test import Client
+
+    client = Client()
+    recorder.request(client, "login", "post", "/accounts/login/", {"login": user.email, "password": PASSWORD})
+    recorder.request(client, "dashboard (seeded)", "get", "/dashboard/")
+    # The first visit shows the login message, so it isn't given an ETag
+    etag = recorder.request(client, "dashboard (revisit)", "get", "/dashboard/")["ETag"]
+    recorder.request(client, "dashboard (304)", "get", "/dashboard/", headers={"if-none-match": etag})
+    recorder.request(client, "learning path", "get", "/learn/")
+    recorder.request(client, "search", "get", "/learn/search/", {"q": "divers"})
+    recorder.request(client, "lesson (seeded)", "get", f"/learn/{lesson_id}/")
+
+
+def run(args):
+    users = seed(args.users, args.transactions)
+    lesson_id, questions = quiz_lesson()
+
+    def journeys(recorder, count, offset):
+        for i in range(count):
+            new_user_journey(recorder, offset + i, lesson_id, questions)
+            returning_journey(recorder, users[(offset + i) % len(users)], lesson_id)
+
+    # One untimed pass warms template, URL and curriculum caches
+    journeys(Recorder(), 1, 0)
+    timed = Recorder()
+    journeys(timed, args.journeys, 1)
+    traced = Recorder(trace=True)
+    tracemalloc.start()
+    journeys(traced, TRACED_JOURNEYS, args.journeys + 1)
+    tracemalloc.stop()
+
+    steps = {}
+    for step, samples in timed.latency.items():
+        cuts = statistics.quantiles(samples, n=100, method="inclusive")
+        steps[step] = {
+            "p50_ms": round(cuts[49], 2),
+            "p95_ms": round(cuts[94], 2),
+            "p99_ms": round(cuts[98], 2),
+            "queries": timed.queries[step],
+            "alloc_kb": round(statistics.median(traced.allocated[step]) / 1024, 1),
+        }
+    return steps
+
+
+def compare(steps, baseline, tolerance):
+    """Regressions of ``steps`` against ``baseline``, as printable lines."""
+    regressions = []
+    for step, current in steps.items():
+        before = baseline.get(step)
+        if before is None:
+            continue
+        if current["queries"] > before["queries"]:
+            regressions.append(f"{step}: {before['queries']} -> {current['queries']} queries")
+        for key, unit in (("p95_ms", "ms p95"), ("alloc_kb", "KiB allocated")):
+            if current[key] > before[key] * (1 + tolerance) + SLACK[key]:
+                regressions.append(f"{step}: {before[key]} -> {current[key]} {unit}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--transactions", type=int, default=50, help="extra trades per seeded portfolio")
+    parser.add_argument("--journeys", type=int, default=20)
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed p95/allocation growth (0.5 = +50%%)")
+    args = parser.parse_args()
+
+    setup_django()
+
+    from django.test.utils import override_settings
+
+    # Every journey signs up and logs in from the same client address
+    with override_settings(ACCOUNT_RATE_LIMITS=False):
+        steps = run(args)
+    scale = {"users": args.users, "transactions": args.transactions, "journeys": args.journeys}
+
+    print(f"{args.users} users, {args.transactions} extra trades each, {args.journeys} journeys")
+    print(f"  {'step':<20} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'queries':>8} {'alloc KiB':>10}")
+    for step, s in steps.items():
+        print(
+            f"  {step:<20} {s['p50_ms']:8.2f} {s['p95_ms']:8.2f} {s['p99_ms']:8.2f}"
+            f" {s['queries']:8d} {s['alloc_kb']:10.1f}"
+        )
+
+    if args.save_baseline:
+        args.baseline.parent.mkdir(parents=True, exist_ok=True)
+        args.baseline.write_text(json.dumps({"scale": scale, "steps": steps}, indent=2) + "\n")
+        print(f"Baseline saved to {args.baseline}")
+        return
+
+    if not args.baseline.exists():
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one.")
+        return
+    baseline = json.loads(args.baseline.read_text())
+    if baseline["scale"] != scale:
+        print(f"Note: baseline was recorded at {baseline['scale']}")
+    regressions = compare(steps, baseline["steps"], args.tolerance)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""Benchmark PortfolioAnalytics on fixed-point Money against Decimal.
+
+Seeds portfolios of --holdings positions with random quantities, costs and
+prices, then times building every dashboard/detail figure (snapshot,
+allocation, exposures, holdings table) two ways: with PortfolioAnalytics,
+which loads amounts as scaled integers, and with the Decimal implementation
+it replaced (DecimalAnalytics below, loading Holding instances). Every
+figure of both is compared first, so the run also checks that Money rounds
+exactly like Decimal. The seeded assets are all in the owner's base
+currency, so no exchange rates are involved. The "figures" rows leave out
+the query; Money from Holdings is the path taken when valuations are
+stored from model instances, which converts every Decimal first.
+
+    python -m benchmarks.money [--holdings 100] [--portfolios 20] [--repeat 50]
+"""
+
+import argparse
+import json
+from decimal import Decimal
+from functools import cached_property
+
+from benchmarks import setup_django
+from benchmarks.performance_series import timed
+
+
+class DecimalAnalytics:
+    """PortfolioAnalytics as it was, summing and quantizing Decimals."""
+
+    def __init__(self, holdings):
+        self.total_value = Decimal("0")
+        self.total_cost = Decimal("0")
+        self.daily_change = Decimal("0")
+        self.by_type = {}
+        self.geography = {}
+        self.sectors = {}
+        self._rows = []
+
+        for h in holdings:
+            asset = h.asset
+            mv = h.quantity * asset.current_price
+            tc = h.quantity * h.average_cost
+            self.total_value += mv
+            self.total_cost += tc
+            self.daily_change += h.quantity * asset.daily_change
+            self.by_type[asset.asset_type] = self.by_type.get(asset.asset_type, Decimal("0")) + mv
+            if asset.geography:
+                self.geography[asset.geography] = self.geography.get(asset.geography, Decimal("0")) + mv
+            if asset.sector:
+                self.sectors[asset.sector] = self.sectors.get(asset.sector, Decimal("0")) + mv
+            self._rows.append((h, mv, tc))
+
+    def _pct(self, value):
+        return (value / self.total_value * 100) if self.total_value else Decimal("0")
+
+    @cached_property
+    def snapshot(self):
+        gain_loss = self.total_value - self.total_cost
+        gain_loss_pct = (gain_loss / self.total_cost * 100) if self.total_cost else Decimal("0")
+        prev_value = self.total_value - self.daily_change
+        daily_change_pct = (self.daily_change / prev_value * 100) if prev_value else Decimal("0")
+
+        dc = self.daily_change.quantize(Decimal("0.01"))
+        dc_pct = daily_change_pct.quantize(Decimal("0.01"))
+        sign = "+" if dc >= 0 else ""
+        gl = gain_loss.quantize(Decimal("0.01"))
+        gl_pct = gain_loss_pct.quantize(Decimal("0.01"))
+        gl_sign = "+" if gl >= 0 else ""
+        return {
+            "total_value": self.total_value.quantize(Decimal("0.01")),
+            "total_cost": self.total_cost.quantize(Decimal("0.01")),
+            "gain_loss": gl,
+            "gain_loss_pct": gl_pct,
+            "gain_loss_display": f"{gl_sign}${gl} ({gl_sign}{gl_pct}%)",
+            "daily_change": dc,
+            "daily_change_pct": dc_pct,
+            "daily_change_display": f"{sign}${dc} ({sign}{dc_pct}%)",
+        }
+
+    @cached_property
+    def allocation(self):
+        from apps.market_data.models import Asset
+        from apps.portfolio.services import CHART_COLORS
+
+        type_labels = dict(Asset.ASSET_TYPE_CHOICES)
+        breakdown, labels, values = [], [], []
+        for asset_type, value in sorted(self.by_type.items(), key=lambda x: x[1], reverse=True):
+            label = str(type_labels.get(asset_type, asset_type))
+            pct_q = self._pct(value).quantize(Decimal("0.1"))
+            val_q = value.quantize(Decimal("0.01"))
+            breakdown.append({"label": label, "value": val_q, "pct": pct_q, "display": f"{pct_q}% (${val_q})"})
+            labels.append(label)
+            values.append(float(pct_q))
+        chart_data = json.dumps({"labels": labels, "values": values, "colors": CHART_COLORS[: len(labels)]})
+        return {"breakdown": breakdown, "chart_data": chart_data}
+
+    @cached_property
+    def exposures(self):
+        def to_list(d):
+            return [
+                {"label": label, "pct": float(self._pct(value).quantize(Decimal("0.1")))}
+                for label, value in sorted(d.items(), key=lambda x: x[1], reverse=True)
+            ]
+
+        return {"geography": to_list(self.geography), "sectors": to_list(self.sectors)}
+
+    @cached_property
+    def holdings_table(self):
+        rows = []
+        for h, mv, tc in self._rows:
+            gl = mv - tc
+            gl_pct = (gl / tc * 100) if tc else Decimal("0")
+            rows.append(
+                {
+                    "ticker": h.asset.ticker,
+                    "name": h.asset.name,
+                    "quantity": h.quantity,
+                    "avg_cost": h.average_cost.quantize(Decimal("0.01")),
+                    "current_price": h.asset.current_price.quantize(Decimal("0.01")),
+                    "market_value": mv.quantize(Decimal("0.01")),
+                    "gain_loss": gl.quantize(Decimal("0.01")),
+                    "gain_loss_pct": gl_pct.quantize(Decimal("0.01")),
+                    "weight": self._pct(mv).quantize(Decimal("0.1")),
+                }
+            )
+        return sorted(rows, key=lambda r: r["market_value"], reverse=True)
+
+
+def figures(analytics):
+    return analytics.snapshot, analytics.allocation, analytics.exposures, analytics.holdings_table
+
+
+def single_currency(snapshot, allocation, exposures, holdings_table):
+    """Money figures without the currency breakdowns DecimalAnalytics predates."""
+    snapshot = {key: value for key, value in snapshot.items() if key != "rates_missing"}
+    exposures = {key: value for key, value in exposures.items() if key != "currencies"}
+    holdings_table = [{key: value for key, value in row.items() if key != "currency"} for row in holdings_table]
+    return snapshot, allocation, exposures, holdings_table
+
+
+def seed(portfolios, holdings):
+    """Portfolios of ``holdings`` random positions each, over a shared asset list."""
+    import numpy as np
+    from django.contrib.auth import get_user_model
+
+    from apps.market_data.models import Asset
+    from apps.portfolio.models import Holding, Portfolio
+
+    rng = np.random.default_rng(0)
+    types = ["stock", "etf", "bond", "gic", "cash"]
+    geographies = ["Canada", "United States", "Global", ""]
+    sectors = ["Financials", "Energy", "Technology", "Fixed income", ""]
+    assets = Asset.objects.bulk_create(
+        [
+            Asset(
+                ticker=f"MONEY{i}",
+                name=f"Asset {i}",
+                asset_type=types[i % len(types)],
+                geography=geographies[i % len(geographies)],
+                sector=sectors[i % len(sectors)],
+                current_price=Decimal(int(rng.integers(100, 50_000))) / 100,
+                previous_close=Decimal(int(rng.integers(0, 50_000))) / 100 if i % 7 else Decimal(0),
+            )
+            for i in range(holdings * 2)
+        ]
+    )
+    user = get_user_model().objects.create_user(username="money", email="money@example.com", password="x")
+    created = Portfolio.objects.bulk_create([Portfolio(user=user, name=f"Bench {n}") for n in range(portfolios)])
+    Holding.objects.bulk_create(
+        [
+            Holding(
+                portfolio=portfolio,
+                asset=asset,
+                quantity=Decimal(int(rng.integers(1, 5_000_000))) / 10_000,
+                average_cost=Decimal(int(rng.integers(100, 50_000))) / 100,
+            )
+            for portfolio in created
+            for asset in rng.choice(assets, holdings, replace=False)
+        ]
+    )
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holdings", type=int, default=100)
+    parser.add_argument("--portfolios", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    setup_django()
+
+    from unittest import mock
+
+    from apps.portfolio import services
+    from apps.portfolio.services import PortfolioAnalytics
+
+    portfolios = seed(args.portfolios, args.holdings)
+    for portfolio in portfolios:
+        before = figures(DecimalAnalytics(list(portfolio.holdings.select_related("asset"))))
+        if single_currency(*figures(PortfolioAnalytics(portfolio))) != before:
+            raise SystemExit(f"Portfolio {portfolio.pk}: Money figures differ from Decimal")
+    print(f"{args.portfolios} portfolios of {args.holdings} holdings: Money figures match Decimal")
+
+    portfolio = portfolios[0]
+    holdings = list(portfolio.holdings.select_related("asset"))
+    positions = services._load_positions(portfolio)
+
+    results = {
+        "load + figures, Decimal": timed(
+            lambda: figures(DecimalAnalytics(list(portfolio.holdings.select_related("asset")))), args.repeat
+        ),
+        "load + figures, Money": timed(lambda: figures(PortfolioAnalytics(portfolio)), args.repeat),
+        # Arithmetic and formatting only, from rows already in memory
+        "figures, Decimal": timed(lambda: figures(DecimalAnalytics(holdings)), args.repeat),
+    }
+    # Patched around the timing loop, not per call: patching costs more than the figures
+    with mock.patch.object(services, "_load_positions", return_value=positions):
+        results["figures, Money"] = timed(lambda: figures(PortfolioAnalytics(portfolio)), args.repeat)
+    results["figures, Money from Holdings"] = timed(
+        lambda: figures(PortfolioAnalytics(portfolio, holdings)), args.repeat
+    )
+    for name, (median, worst) in results.items():
+        print(f"  {name:<30} median {median:7.2f} ms   max {worst:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
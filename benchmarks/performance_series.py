@@ -0,0 +1,120 @@
+"""Benchmark the portfolio performance series.
+
+Seeds a 10-year, 50-asset portfolio (monthly buys, one sell per asset per
+year) and times the NumPy core, the full service and the cached endpoint
+path. The full service is timed twice: with the price series cache empty,
+which only happens before the first ingest warms it (warm_price_series),
+and after an ingest, which is the cost of the first chart once valuations
+move on and the cached endpoint misses.
+
+    python -m benchmarks.performance_series [--years 10] [--assets 50]
+"""
+
+import argparse
+import statistics
+import time
+from datetime import timedelta
+
+from benchmarks import setup_django
+
+BUDGET_MS = 50
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - started) * 1000)
+    return statistics.median(samples), max(samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, default=10)
+    parser.add_argument("--assets", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    import numpy as np
+    from django.contrib.auth import get_user_model
+    from django.core.cache import cache
+    from django.utils import timezone
+
+    from apps.market_data.models import Asset, PriceBar
+    from apps.market_data.services import ingest_price_bars, warm_price_series
+    from apps.portfolio.models import Portfolio, Transaction
+    from apps.portfolio.services import compute_value_series, get_cached_performance_series, get_performance_series
+
+    rng = np.random.default_rng(0)
+    today = timezone.localdate()
+    days = [today - timedelta(days=i) for i in range(args.years * 365, -1, -1)]
+    trading_days = [d for d in days if d.weekday() < 5]
+
+    assets = Asset.objects.bulk_create(
+        [Asset(ticker=f"BENCH{i}", name=f"Bench {i}", asset_type="stock") for i in range(args.assets)]
+    )
+    paths = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, (args.assets, len(trading_days))), axis=1))
+    ingest_price_bars(
+        PriceBar(asset=asset, date=d, close=float(paths[i, t]))
+        for i, asset in enumerate(assets)
+        for t, d in enumerate(trading_days)
+    )
+
+    user = get_user_model().objects.create_user(username="bench", email="bench@example.com", password="bench")
+    portfolio = Portfolio.objects.create(user=user, name="Bench")
+    txs = []
+    for month in range(args.years * 12):
+        executed_at = timezone.now() - timedelta(days=args.years * 365 - month * 30)
+        for asset in assets:
+            txs.append(
+                Transaction(
+                    portfolio=portfolio,
+                    asset=asset,
+                    transaction_type="buy",
+                    quantity=2,
+                    price=50,
+                    executed_at=executed_at,
+                )
+            )
+            if month % 12 == 11:
+                txs.append(
+                    Transaction(
+                        portfolio=portfolio,
+                        asset=asset,
+                        transaction_type="sell",
+                        quantity=1,
+                        price=50,
+                        executed_at=executed_at,
+                    )
+                )
+    Transaction.objects.bulk_create(txs)
+
+    n_assets, n_days = paths.shape
+    asset_index = rng.integers(0, n_assets, len(txs))
+    day_index = rng.integers(0, n_days, len(txs))
+    quantities = rng.normal(1, 0.5, len(txs))
+
+    print(f"{args.assets} assets x {n_days} trading days, {len(txs)} transactions")
+
+    def cold():
+        cache.clear()
+        get_performance_series(portfolio)
+
+    cache.clear()
+    warm_price_series([asset.pk for asset in assets])
+    results = {
+        "numpy core": timed(lambda: compute_value_series(asset_index, day_index, quantities, paths), args.repeat),
+        "full service (after ingest)": timed(lambda: get_performance_series(portfolio), args.repeat),
+        "cached endpoint path": timed(lambda: get_cached_performance_series(portfolio), args.repeat),
+        "full service (no cache)": timed(cold, max(1, args.repeat // 4)),
+    }
+    for name, (median, worst) in results.items():
+        flag = "" if median <= BUDGET_MS else f"  (over {BUDGET_MS} ms budget)"
+        print(f"  {name:<28} median {median:8.2f} ms   max {worst:8.2f} ms{flag}")
+
+
+if __name__ == "__main__":
+    main()
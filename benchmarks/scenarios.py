@@ -0,0 +1,49 @@
+"""Benchmark the Scenario Lab engine.
+
+Times a guided shock and the Monte Carlo fan on a synthetic portfolio,
+the work behind each HTMX slider move.
+
+    python -m benchmarks.scenarios [--holdings 50] [--paths 10000]
+"""
+
+import argparse
+
+from benchmarks import setup_django
+from benchmarks.performance_series import timed
+
+BUDGET_MS = 100
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--holdings", type=int, default=50)
+    parser.add_argument("--paths", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    setup_django()
+
+    import numpy as np
+
+    from apps.scenarios.services import FACTORS, run_monte_carlo, run_stress_test
+
+    rng = np.random.default_rng(0)
+    tickers = [f"BENCH{i}" for i in range(args.holdings)]
+    values = rng.uniform(100, 10_000, args.holdings)
+    sleeves = rng.dirichlet(np.ones(3), args.holdings)
+    exposures = np.column_stack([sleeves, rng.uniform(0, 1, args.holdings) * (1 - sleeves[:, 2])])
+    assert exposures.shape[1] == len(FACTORS)
+
+    print(f"{args.holdings} holdings, {args.paths} paths")
+    results = {
+        "stress test": timed(lambda: run_stress_test(tickers, values, exposures, "equity_crash", 30), args.repeat),
+        "monte carlo, 10 years": timed(lambda: run_monte_carlo(values, exposures, 10, paths=args.paths), args.repeat),
+        "monte carlo, 40 years": timed(lambda: run_monte_carlo(values, exposures, 40, paths=args.paths), args.repeat),
+    }
+    for name, (median, worst) in results.items():
+        flag = "" if median <= BUDGET_MS else f"  (over {BUDGET_MS} ms budget)"
+        print(f"  {name:<22} median {median:8.2f} ms   max {worst:8.2f} ms{flag}")
+
+
+if __name__ == "__main__":
+    main()
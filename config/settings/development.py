@@ -40,3 +40,6 @@ EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 
 # Use default secret key in dev
 SECRET_KEY = env("SECRET_KEY", default="django-insecure-dev-key-change-in-production")
+
+# Read lessons from source so edits show up without re-running compile_curriculum
+CURRICULUM_BUNDLE_DIR = env("CURRICULUM_BUNDLE_DIR", default=None)
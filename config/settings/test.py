@@ -16,6 +16,38 @@ PASSWORD_HASHERS = [
     "django.contrib.auth.hashers.MD5PasswordHasher",
 ]
 
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+    },
+    "curriculum": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "curriculum",
+        "TIMEOUT": None,
+    },
+    "quiz_attempts": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "quiz_attempts",
+    },
+    "template_fragments": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "template_fragments",
+    },
+}
+
+# Always read the curriculum from source; tests opt into bundles explicitly
+CURRICULUM_BUNDLE_DIR = None
+
+# Run jobs inline: pool processes can't see the in-memory test database
+JOBS_EAGER = True
+
+# Other threads' connections can't see data inside a test's transaction
+CONCURRENT_CARDS = False
+ROOT_URLCONF = "config.urls"
+
+# Time every request, so the metrics tests see them all
+METRICS_SAMPLE_RATE = 1.0
+
 EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
 
 # Disable Vite manifest check in tests
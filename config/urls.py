@@ -15,6 +15,8 @@ urlpatterns = [
     path("learn/", include("apps.education.urls")),
     path("scenarios/", include("apps.scenarios.urls")),
     path("impact/", include("apps.impact.urls")),
+    path("jobs/", include("apps.jobs.urls")),
+    path("metrics/", include("apps.metrics.urls")),
     path("", include("apps.accounts.urls_home")),
 ]
 
@@ -0,0 +1,13 @@
+"""URL configuration with CONCURRENT_CARDS: the async page variants ahead of config.urls."""
+
+from django.urls import path
+
+from apps.portfolio import views
+
+from .urls import urlpatterns as sync_urlpatterns
+
+urlpatterns = [
+    path("dashboard/", views.adashboard_view),
+    path("portfolio/<int:pk>/", views.aportfolio_detail),
+    *sync_urlpatterns,
+]
@@ -1,11 +1,24 @@
 import { createChart } from "lightweight-charts";
 
+const renderedContainers = new WeakSet();
+
+async function loadData(container) {
+  if (container.dataset.chartData) return JSON.parse(container.dataset.chartData);
+  if (!container.dataset.chartUrl) return null;
+
+  // Series are served as cached JSON so the page itself stays light
+  const response = await fetch(container.dataset.chartUrl, { credentials: "same-origin" });
+  return response.ok ? response.json() : null;
+}
+
 export function initPerformanceCharts() {
-  document.querySelectorAll("[data-chart='performance']").forEach((container) => {
-    const rawData = container.dataset.chartData;
-    if (!rawData) return;
+  document.querySelectorAll("[data-chart='performance']").forEach(async (container) => {
+    if (renderedContainers.has(container)) return;
+    renderedContainers.add(container);
+
+    const data = await loadData(container);
+    if (!data || !data.length) return;
 
-    const data = JSON.parse(rawData);
     const chart = createChart(container, {
       width: container.clientWidth,
       height: 300,
@@ -2,18 +2,36 @@ import {
   Chart,
   BarController,
   BarElement,
+  LineController,
+  LineElement,
+  PointElement,
   CategoryScale,
   LinearScale,
+  Filler,
   Tooltip,
   Legend,
 } from "chart.js";
 
-Chart.register(BarController, BarElement, CategoryScale, LinearScale, Tooltip, Legend);
+Chart.register(
+  BarController,
+  BarElement,
+  LineController,
+  LineElement,
+  PointElement,
+  CategoryScale,
+  LinearScale,
+  Filler,
+  Tooltip,
+  Legend,
+);
+
+const renderedCanvases = new WeakSet();
 
 export function initScenarioCharts() {
   document.querySelectorAll("canvas[data-chart='scenario']").forEach((canvas) => {
     const rawData = canvas.dataset.chartData;
-    if (!rawData) return;
+    if (!rawData || renderedCanvases.has(canvas)) return;
+    renderedCanvases.add(canvas);
 
     const data = JSON.parse(rawData);
 
@@ -46,3 +64,45 @@ export function initScenarioCharts() {
     });
   });
 }
+
+// Monte Carlo percentile fan: 5–95 and 25–75 bands around the median
+export function initFanCharts() {
+  document.querySelectorAll("canvas[data-chart='fan']").forEach((canvas) => {
+    const rawData = canvas.dataset.chartData;
+    if (!rawData || renderedCanvases.has(canvas)) return;
+    renderedCanvases.add(canvas);
+
+    const data = JSON.parse(rawData);
+    const band = (values, fill, color) => ({
+      data: values,
+      fill,
+      backgroundColor: color,
+      borderWidth: 0,
+      pointRadius: 0,
+    });
+
+    new Chart(canvas, {
+      type: "line",
+      data: {
+        labels: data.labels,
+        datasets: [
+          band(data.p5, false, "transparent"),
+          band(data.p95, "-1", "rgba(59, 130, 246, 0.15)"),
+          band(data.p25, false, "transparent"),
+          band(data.p75, "-1", "rgba(59, 130, 246, 0.3)"),
+          { data: data.p50, borderColor: "#3b82f6", borderWidth: 2, pointRadius: 0, fill: false },
+        ],
+      },
+      options: {
+        responsive: true,
+        animation: false,
+        plugins: {
+          legend: { display: false },
+        },
+        scales: {
+          y: { beginAtZero: true },
+        },
+      },
+    });
+  });
+}
@@ -9,12 +9,28 @@ import Alpine from "alpinejs";
 // Make HTMX available globally
 window.htmx = htmx;
 
+// Busy-pool responses (503) carry a partial that retries on its own
+document.addEventListener("htmx:beforeSwap", (event) => {
+  if (event.detail.xhr.status === 503) {
+    event.detail.shouldSwap = true;
+    event.detail.isError = false;
+  }
+});
+
 // Initialize Alpine.js
 Alpine.start();
 window.Alpine = Alpine;
 
 // Chart auto-initialization after HTMX swaps
 import { initCharts } from "./charts/allocation.js";
+import { initPerformanceCharts } from "./charts/performance.js";
+import { initFanCharts, initScenarioCharts } from "./charts/scenario.js";
 
 document.addEventListener("DOMContentLoaded", initCharts);
 document.addEventListener("htmx:afterSwap", initCharts);
+document.addEventListener("DOMContentLoaded", initPerformanceCharts);
+document.addEventListener("htmx:afterSwap", initPerformanceCharts);
+document.addEventListener("DOMContentLoaded", initScenarioCharts);
+document.addEventListener("htmx:afterSwap", initScenarioCharts);
+document.addEventListener("DOMContentLoaded", initFanCharts);
+document.addEventListener("htmx:afterSwap", initFanCharts);